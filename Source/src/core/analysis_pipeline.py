@@ -0,0 +1,65 @@
+"""One parse per document version, shared by every analysis consumer.
+
+``parse_document`` turns a source string into a ``ParsedDocument`` holding
+the AST (or the syntax error) and the source lines. The syntax indicator,
+pyflakes, the style checks and the outline all read from that one object
+instead of parsing the text again.
+"""
+import ast
+import io
+
+
+class ParsedDocument:
+    __slots__ = ('source', 'path', 'version', 'tree', 'syntax_error', 'lines')
+
+    def __init__(self, source: str, path: str = '', version: int = 0):
+        self.source = source
+        self.path = path
+        self.version = version
+        self.tree = None
+        self.syntax_error = None
+        # universal newlines, like the line numbers ast reports
+        self.lines = io.StringIO(source, newline='').readlines()
+        try:
+            self.tree = ast.parse(source, path or '<string>')
+        except SyntaxError as e:
+            self.syntax_error = syntax_issue(e)
+        except ValueError as e:
+            # e.g. null bytes in the source
+            self.syntax_error = {'line': 1, 'col': 0, 'type': 'error', 'code': 'E999',
+                                 'message': str(e), 'syntax': True}
+
+    @property
+    def ok(self) -> bool:
+        return self.tree is not None
+
+
+def syntax_issue(error: SyntaxError) -> dict:
+    return {'line': error.lineno or 1, 'col': error.offset or 0, 'type': 'error',
+            'code': 'E999', 'message': str(error), 'syntax': True}
+
+
+def parse_document(source: str, path: str = '', version: int = 0) -> ParsedDocument:
+    return ParsedDocument(source, path, version)
+
+
+_OUTLINE_KINDS = {ast.ClassDef: 'class', ast.FunctionDef: 'function',
+                  ast.AsyncFunctionDef: 'function'}
+
+
+def document_outline(doc: ParsedDocument):
+    """Classes and functions as ``[{'name', 'kind', 'line', 'depth'}]`` in source order."""
+    if doc.tree is None:
+        return []
+    outline = []
+    stack = [(node, 0, None) for node in reversed(doc.tree.body)]
+    while stack:
+        node, depth, parent = stack.pop()
+        kind = _OUTLINE_KINDS.get(type(node))
+        if kind is None:
+            continue
+        if kind == 'function' and parent == 'class':
+            kind = 'method'
+        outline.append({'name': node.name, 'kind': kind, 'line': node.lineno, 'depth': depth})
+        stack.extend((child, depth + 1, _OUTLINE_KINDS[type(node)]) for child in reversed(node.body))
+    return outline
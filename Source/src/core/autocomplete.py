@@ -1,8 +1,272 @@
-import jedi
-from PyQt6.QtCore import QTimer, QThreadPool, QObject, pyqtSignal
-from core.completion_worker import CompletionWorker
+from PyQt6.QtCore import QTimer, QThreadPool, QObject, QPoint, pyqtSignal
+from core.completion_worker import CompletionWorker, DocstringWorker, InfoWorker
+from core.completion_engine import shared_engine
+from core.word_index import shared_word_index, language_for, word_start
+from core.snippets import shared_snippets, parse_snippet, SnippetSession
+from core.completion_metrics import CompletionTrace, shared_recorder
 import os
-from pathlib import Path
+import re
+
+
+class CompletionJobManager(QObject):
+    """Schedules completion workers against a document generation counter.
+
+    The owner bumps the generation whenever earlier requests stop being
+    useful: on a buffer change, or once a completion session is in use, when
+    the completion anchor moves. Jobs are tagged with the generation they were
+    requested for; a newer request takes any queued job
+    back out of the pool before it runs, running jobs notice they are stale and
+    skip emitting, and results that still arrive late are dropped here so only
+    completions for the current buffer version ever reach the editor.
+    """
+    results_ready = pyqtSignal(int, list, dict)  # generation, results, stage stamps
+    docstring_ready = pyqtSignal(str, str, str)  # module, name, docstring
+    info_ready = pyqtSignal(str, object, object)  # kind, request key, result
+
+    def __init__(self, parent=None, server=None):
+        super().__init__(parent)
+        self._generation = 0
+        self._pending = None
+        self._pending_doc = None
+        # jedi is not thread-safe and only the newest job matters, so one
+        # worker thread is enough; extra requests wait (and get cancelled) here
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(1)
+        # optional out-of-process backend (core.completion_server)
+        self._server = server
+        self._requests = {}  # server request id -> generation
+        self._pending_req = None
+        self._doc_req = None
+        # signature / hover jobs not started yet, and server requests in flight
+        self._pending_info = {}
+        self._info_requests = {}  # server request id -> (kind, key)
+        if server is not None:
+            server.results_ready.connect(self._on_server_results)
+            server.docstring_ready.connect(self._on_server_docstring)
+            server.info_ready.connect(self._on_server_info)
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def bump(self) -> int:
+        """Advance the document generation and drop the queued job, if any."""
+        self._generation += 1
+        self.cancel_pending()
+        return self._generation
+
+    def is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def cancel_pending(self):
+        """Remove a job that has not started yet from the pool."""
+        if self._pending_req is not None:
+            self._requests.pop(self._pending_req, None)
+            self._server.cancel(self._pending_req)
+            self._pending_req = None
+        worker = self._pending
+        if worker is None:
+            return
+        try:
+            self._pool.tryTake(worker)
+        except Exception:
+            pass
+        self._pending = None
+
+    def submit(self, source: str, line: int, column: int, path: str = ''):
+        """Queue a completion job for the current generation."""
+        self.cancel_pending()
+        if self._server is not None:
+            req_id = self._server.complete(source, line, column, path)
+            self._requests[req_id] = self._generation
+            self._pending_req = req_id
+            return req_id
+        worker = CompletionWorker(source, line, column, path,
+                                  generation=self._generation,
+                                  is_stale=self.is_stale)
+        worker.signals.results_ready.connect(self._on_worker_results)
+        self._pending = worker
+        try:
+            self._pool.start(worker)
+        except Exception:
+            # fallback to running in the main thread
+            worker.run()
+        return worker
+
+    def submit_docstring(self, module: str, name: str):
+        """Resolve one docstring; replaces a docstring job that has not started."""
+        if self._server is not None:
+            self._doc_req = self._server.docstring(module, name)
+            return self._doc_req
+        if self._pending_doc is not None:
+            try:
+                self._pool.tryTake(self._pending_doc)
+            except Exception:
+                pass
+        worker = DocstringWorker(module, name)
+        worker.signals.docstring_ready.connect(self._on_docstring)
+        self._pending_doc = worker
+        try:
+            self._pool.start(worker)
+        except Exception:
+            worker.run()
+        return worker
+
+    def submit_info(self, kind: str, key, source: str, line: int, column: int, path: str = ''):
+        """Queue a 'signatures' or 'hover' job; replaces one of the same kind not started yet."""
+        if self._server is not None:
+            for req_id, (other, _) in list(self._info_requests.items()):
+                if other == kind:
+                    self._info_requests.pop(req_id)
+                    self._server.cancel(req_id)
+            req_id = self._server.info(kind, source, line, column, path)
+            self._info_requests[req_id] = (kind, key)
+            return req_id
+        previous = self._pending_info.pop(kind, None)
+        if previous is not None:
+            try:
+                self._pool.tryTake(previous)
+            except Exception:
+                pass
+        worker = InfoWorker(kind, key, source, line, column, path)
+        worker.signals.info_ready.connect(self._on_info)
+        self._pending_info[kind] = worker
+        try:
+            self._pool.start(worker)
+        except Exception:
+            worker.run()
+        return worker
+
+    def _on_info(self, kind, key, result):
+        worker = self._pending_info.get(kind)
+        if worker is not None and worker.key == key:
+            self._pending_info.pop(kind, None)
+        self.info_ready.emit(kind, key, result)
+
+    def _on_server_info(self, req_id, result):
+        request = self._info_requests.pop(req_id, None)
+        if request is not None:
+            self.info_ready.emit(request[0], request[1], result)
+
+    def _on_docstring(self, module, name, doc):
+        worker = self._pending_doc
+        if worker is not None and (worker.module, worker.name) == (module, name):
+            self._pending_doc = None
+        self.docstring_ready.emit(module, name, doc)
+
+    def _on_server_results(self, req_id, results, stamps):
+        generation = self._requests.pop(req_id, None)
+        if generation is None:
+            # another editor's request
+            return
+        if self._pending_req == req_id:
+            self._pending_req = None
+        if self.is_stale(generation):
+            return
+        self.results_ready.emit(generation, results, stamps)
+
+    def _on_server_docstring(self, req_id, module, name, doc):
+        if req_id != self._doc_req:
+            return
+        self._doc_req = None
+        self.docstring_ready.emit(module, name, doc)
+
+    def _on_worker_results(self, generation, results, stamps):
+        if self._pending is not None and self._pending.generation == generation:
+            self._pending = None
+        if self.is_stale(generation):
+            return
+        self.results_ready.emit(generation, results, stamps)
+
+
+def _subsequence(needle: str, haystack: str) -> bool:
+    pos = 0
+    for ch in needle:
+        pos = haystack.find(ch, pos) + 1
+        if not pos:
+            return False
+    return True
+
+
+def identifier_start(text: str, column: int) -> int:
+    """Return the column where the identifier ending at ``column`` begins."""
+    start = column
+    while start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+        start -= 1
+    return start
+
+
+class CompletionSession:
+    """The full candidate list for one completion anchor, refined locally.
+
+    The anchor is the place where the identifier being typed starts plus the
+    text before it. Jedi is asked once per anchor (at the identifier start, so
+    the list is not pre-filtered by a prefix); further typing only filters and
+    ranks that list here. Each candidate's lowercase key is computed once, and
+    when the prefix grows only the previous matches are searched again.
+    """
+
+    def __init__(self):
+        self.anchor = None
+        self.items = []
+        self._keys = []
+        self._last_prefix = None
+        self._last_matches = None
+
+    @property
+    def active(self) -> bool:
+        return self.anchor is not None
+
+    def begin(self, anchor):
+        """Start a new anchor whose candidates are still being fetched."""
+        self.anchor = anchor
+        self.items = []
+        self._keys = []
+        self._last_prefix = None
+        self._last_matches = None
+
+    def reset(self, anchor, items):
+        self.begin(anchor)
+        self.items = list(items)
+        self._keys = [item['name'].lower() for item in self.items]
+
+    def clear(self):
+        self.begin(None)
+
+    def filter(self, prefix: str, limit: int = 200):
+        """Return the candidates matching ``prefix``, best first."""
+        if not prefix:
+            candidates = range(len(self.items))
+            matched = list(candidates)
+        else:
+            low = prefix.lower()
+            last = self._last_prefix
+            if self._last_matches is not None and last and low.startswith(last.lower()):
+                candidates = self._last_matches
+            else:
+                candidates = range(len(self.items))
+            keys = self._keys
+            matched = [i for i in candidates if _subsequence(low, keys[i])]
+        self._last_prefix = prefix
+        self._last_matches = matched
+
+        def rank(i):
+            name = self.items[i]['name']
+            key = self._keys[i]
+            if not prefix:
+                tier = 0
+            elif name.startswith(prefix):
+                tier = 0
+            elif key.startswith(prefix.lower()):
+                tier = 1
+            elif prefix.lower() in key:
+                tier = 2
+            else:
+                tier = 3
+            private = 2 if name.startswith('__') else 1 if name.startswith('_') else 0
+            return (tier, private, len(name), i)
+
+        return [self.items[i] for i in sorted(matched, key=rank)[:limit]]
 
 
 class AutoCompleter:
@@ -12,26 +276,94 @@ class AutoCompleter:
         self._timer = QTimer()
         self._timer.setSingleShot(True)
         self._timer.timeout.connect(self._dispatch_complete)
-        self._worker = None
-        self._thread_pool = QThreadPool()
-        self._thread_pool.setMaxThreadCount(4)  # Limit concurrent completion threads
-        
-        # Initialize snippets
-        self.snippets = {
-            'def': 'def ${1:function_name}(${2:parameters}):\n\t${3:pass}',
-            'class': 'class ${1:ClassName}:\n\t${2:pass}',
-            'if': 'if ${1:condition}:\n\t${2:pass}',
-            'for': 'for ${1:item} in ${2:iterable}:\n\t${3:pass}',
-            'while': 'while ${1:condition}:\n\t${2:pass}',
-            'try': 'try:\n\t${1:pass}\nexcept ${2:Exception} as ${3:e}:\n\t${4:pass}',
-            'with': 'with ${1:expression} as ${2:target}:\n\t${3:pass}',
-            'import': 'import ${1:module}',
-            'from': 'from ${1:module} import ${2:name}',
-            'print': 'print(${1:object})',
-            'return': 'return ${1:object}',
-        }
+        self._server = self._start_server()
+        self._jobs = CompletionJobManager(server=self._server)
+        self._jobs.results_ready.connect(self._on_results)
+        self._jobs.docstring_ready.connect(self._on_docstring)
+        self._session = CompletionSession()
+        # name -> payload of the list currently shown
+        self._items = {}
+        self._highlighted = None
+        self._inserting = False
+        # non-Python buffers complete from the shared word index instead of jedi
+        self._language = None
+        self._snippet_language = 'python'
+        self._snippet_session = None
+        self._buffer_key = id(editor)
+        # latency trace of the newest keystroke and of the job in flight
+        self._trace = None
+        self._job_trace = None
+        try:
+            key = self._buffer_key
+            editor.destroyed.connect(lambda *_: shared_word_index().remove_buffer(key))
+        except Exception:
+            pass
+        # resolve the docstring only once the highlight settles
+        self._doc_timer = QTimer()
+        self._doc_timer.setSingleShot(True)
+        self._doc_timer.timeout.connect(self._request_docstring)
+        try:
+            editor.SCN_AUTOCSELECTIONCHANGE.connect(self._on_highlight_changed)
+        except Exception:
+            pass
+        try:
+            editor.userListActivated.connect(self._on_activated)
+        except Exception:
+            pass
+
+    @property
+    def jobs(self):
+        """The job manager; signature help and hover queue their jobs here too."""
+        return self._jobs
+
+    def _start_server(self):
+        """Use the shared completion process pool when settings ask for it."""
+        settings = getattr(getattr(self.editor, 'settings', None), 'completion', None) or {}
+        if settings.get('backend', 'thread') != 'process':
+            return None
+        try:
+            from core.completion_server import shared_server
+            return shared_server(int(settings.get('workers', 1)))
+        except Exception as e:
+            print(f"Completion server unavailable, using threads: {e}")
+            return None
+
+    def set_language(self, extension):
+        """Pick the completion source for the buffer's file type."""
+        language = language_for(extension)
+        # extension-less buffers go to jedi, so they get Python snippets too
+        self._snippet_language = language or 'python'
+        index = shared_word_index()
+        if language == self._language and (language is None or index.has_buffer(self._buffer_key)):
+            return
+        self._language = language
+        self._set_anchor(None)
+        if language is None:
+            index.remove_buffer(self._buffer_key)
+        else:
+            index.set_buffer(self._buffer_key, language, self.editor.text())
+
+    def detach(self):
+        """Forget this buffer's words, e.g. when its tab is closed."""
+        shared_word_index().remove_buffer(self._buffer_key)
+        self._language = None
 
     def update_completions(self, delay=150):
+        if self._inserting:
+            # our own insertion of an accepted item; don't pop the list again
+            self._set_anchor(None)
+            return
+        self._trace = CompletionTrace(self._file_type())
+        if self._language is not None:
+            # word lookups are a binary search; no need to debounce them
+            delay = 0
+        elif self._session.active:
+            # likely still narrowing the same identifier: filtering is cheap,
+            # and the running job (if any) stays valid for this anchor
+            delay = 0
+        else:
+            # the buffer changed: anything requested so far is now outdated
+            self._jobs.bump()
         # schedule completion after a short debounce interval
         try:
             self._timer.start(delay)
@@ -39,45 +371,160 @@ class AutoCompleter:
             # fallback: dispatch immediately
             self._dispatch_complete()
 
+    def _file_type(self):
+        path = getattr(self.editor, 'file_path', '') or ''
+        return os.path.splitext(path)[1].lower() or self._language or ''
+
+    def _mark(self, stage, source=None):
+        trace = self._trace
+        if trace is not None:
+            trace.mark(stage)
+            if source:
+                trace.source = source
+
+    def _finish_trace(self):
+        trace, self._trace = self._trace, None
+        if trace is not None and 'dispatch' in trace.stamps:
+            trace.mark('shown')
+            shared_recorder().record(trace)
+
+    def notify_edit(self, first_line, lines_added):
+        if self._language is not None:
+            # re-tokenize only the lines this edit touched
+            try:
+                last = first_line + max(0, lines_added)
+                lines = [self.editor.text(i) for i in range(first_line, last + 1)]
+                shared_word_index().update_lines(self._buffer_key, first_line, lines_added, lines)
+            except Exception as e:
+                print(f"Word index update failed: {e}")
+            return
+        # let the engine drop cached jedi state if an import line was edited
+        path = getattr(self.editor, 'file_path', '') or ''
+        if not path:
+            return
+        if self._server is not None:
+            self._server.notify_edit(path, first_line, lines_added)
+        else:
+            shared_engine().notify_edit(path, first_line, lines_added)
+
+    def _current_anchor(self):
+        """Return (anchor, prefix, line, start) for the cursor position."""
+        line, column = self.editor.getCursorPosition()
+        text = self.editor.text(line)
+        start = identifier_start(text, column)
+        prefix = text[start:column]
+        anchor = (line, start, text[:start])
+        return anchor, prefix, line, start
+
+    def _set_anchor(self, anchor):
+        """Switch the session to a new anchor; older jobs become stale."""
+        if self._session.anchor != anchor or anchor is None:
+            self._jobs.bump()
+        if anchor is None:
+            self._session.clear()
+        else:
+            self._session.begin(anchor)
+
     def _dispatch_complete(self):
+        self._mark('dispatch')
+        if self._language is not None:
+            self._complete_words()
+            return
         try:
             editor = self.editor
-            line, column = editor.getCursorPosition()
+            anchor, prefix, line, start = self._current_anchor()
+            before = anchor[2].rstrip()
+            if (not prefix and not before.endswith('.')) or prefix[:1].isdigit():
+                # nothing typed that is worth completing
+                self._set_anchor(None)
+                return
+            if self._session.anchor == anchor:
+                if self._session.items:
+                    self._mark('delivered', 'local')
+                    self._show(self._session.filter(prefix), prefix)
+                # otherwise the job for this anchor is still running
+                return
+            self._set_anchor(anchor)
             src = editor.text()
-            ln = line + 1
-            col = column
             path = getattr(editor, 'file_path', '') or ''
-            # if a previous worker is running, ignore it
-            try:
-                if self._worker is not None and self._worker.isRunning():
-                    # let it finish; start a new one
-                    pass
-            except Exception:
-                pass
-            worker = CompletionWorker(src, ln, col, path)
-            # connect results via signals object
-            try:
-                worker.signals.results_ready.connect(self._on_results)
-            except Exception:
-                try:
-                    worker.results_ready.connect(self._on_results)
-                except Exception:
-                    pass
-            # keep reference briefly
-            self._worker = worker
-            # submit to global thread pool
-            try:
-                QThreadPool.globalInstance().start(worker)
-            except Exception:
-                # fallback to starting in the main thread
-                worker.run()
+            # show the list persisted by the warm-up right away; jedi refines it
+            cached = self._persisted_items(before, src)
+            if cached:
+                self._session.reset(anchor, cached)
+                self._mark('delivered', 'cache')
+                self._show(self._session.filter(prefix), prefix)
+            # ask at the identifier start so the list covers any prefix typed later
+            self._job_trace = self._trace
+            self._jobs.submit(src, line + 1, start, path)
         except Exception:
             pass
 
-    def _on_results(self, names):
+    def _complete_words(self):
         try:
-            if not names:
+            editor = self.editor
+            line, column = editor.getCursorPosition()
+            text = editor.text(line)
+            prefix = text[word_start(self._language, text, column):column]
+            words = []
+            if prefix and not prefix[:1].isdigit():
+                words = shared_word_index().query(self._language, prefix, exclude=prefix)
+            items = [{'name': w, 'type': 'word', 'module': '', 'complete': w} for w in words]
+            self._mark('delivered', 'words')
+            if not self._show(items, prefix) and editor.isListActive():
+                editor.cancelList()
+        except Exception:
+            pass
+
+    def _persisted_items(self, before, source):
+        """Cached completions for ``module.`` when ``module`` is an import."""
+        match = re.search(r'([A-Za-z_][\w.]*)\.$', before)
+        if not match:
+            return None
+        try:
+            from core.completion_warmup import warm_cache, import_aliases
+            module = import_aliases(source).get(match.group(1))
+            return warm_cache().get(module) if module else None
+        except Exception:
+            return None
+
+    def _on_results(self, generation, results, stamps=None):
+        try:
+            anchor, prefix, _, _ = self._current_anchor()
+            if self._session.anchor != anchor:
                 return
+            trace = self._trace
+            if trace is not None:
+                if trace is self._job_trace:
+                    trace.merge(stamps)
+                else:
+                    # typed on while the job for this anchor was running
+                    trace.source = 'jedi-pending'
+                trace.mark('delivered')
+            self._session.reset(anchor, [r for r in results if isinstance(r, dict)])
+            self._show(self._session.filter(prefix), prefix)
+        except Exception:
+            pass
+
+    def _snippet_items(self, prefix):
+        items = []
+        for snippet in shared_snippets().find(self._snippet_language, prefix):
+            label = f'{snippet.prefix} (snippet)'
+            items.append({'name': label, 'type': 'snippet', 'module': '',
+                          'complete': snippet.prefix, 'snippet': snippet})
+        return items
+
+    def _show(self, results, prefix=''):
+        """Show ``results`` plus matching snippets; return False if there was nothing."""
+        try:
+            if prefix and not prefix[:1].isdigit():
+                snippets = self._snippet_items(prefix)
+                # a snippet whose trigger was typed in full goes on top
+                exact = [s for s in snippets if s['complete'] == prefix]
+                results = exact + list(results) + [s for s in snippets if s['complete'] != prefix]
+            if not results:
+                return False
+            self._items = {r['name']: r for r in results if isinstance(r, dict)}
+            names = [r['name'] if isinstance(r, dict) else str(r) for r in results]
             try:
                 self.editor.showUserList(1, names)
             except Exception:
@@ -85,5 +532,133 @@ class AutoCompleter:
                     self.editor.showUserList(1, '\n'.join(names))
                 except Exception:
                     pass
+            self._finish_trace()
+            return True
+        except Exception:
+            return False
+
+    # ----- docstrings for the highlighted item -----
+    def _on_highlight_changed(self, selection, *args):
+        try:
+            if isinstance(selection, bytes):
+                selection = selection.decode('utf-8', 'replace')
+            self._highlighted = self._items.get(selection)
+            if self._highlighted is not None:
+                self._doc_timer.start(80)
+        except Exception:
+            pass
+
+    def _request_docstring(self):
+        item = self._highlighted
+        if item is None or item.get('type') == 'word':
+            return
+        if item.get('type') == 'snippet':
+            snippet = item['snippet']
+            self._show_docstring(f"{snippet.description}\n\n{parse_snippet(snippet.body)[0]}")
+            return
+        module, name = item.get('module') or '', item['name']
+        doc = None if self._server is not None else shared_engine().cached_docstring(module, name)
+        if doc is not None:
+            self._show_docstring(doc)
+        else:
+            self._jobs.submit_docstring(module, name)
+
+    def _on_docstring(self, module, name, doc):
+        item = self._highlighted
+        if item is None or (item.get('module') or '', item['name']) != (module, name):
+            return
+        self._show_docstring(doc)
+
+    def _show_docstring(self, doc):
+        try:
+            from PyQt6.QtWidgets import QToolTip
+            if not doc or not self.editor.isListActive():
+                QToolTip.hideText()
+                return
+            pos = self.editor.SendScintilla(self.editor.SCI_GETCURRENTPOS)
+            x = self.editor.SendScintilla(self.editor.SCI_POINTXFROMPOSITION, 0, pos)
+            y = self.editor.SendScintilla(self.editor.SCI_POINTYFROMPOSITION, 0, pos)
+            point = self.editor.viewport().mapToGlobal(QPoint(x + 260, y))
+            QToolTip.showText(point, doc[:1500], self.editor)
+        except Exception:
+            pass
+
+    def _on_activated(self, list_id, text):
+        """Replace the identifier prefix before the cursor with the chosen name."""
+        try:
+            from PyQt6.QtWidgets import QToolTip
+            QToolTip.hideText()
+            if list_id != 1:
+                return
+            editor = self.editor
+            line, column = editor.getCursorPosition()
+            current = editor.text(line)[:column]
+            if self._language is not None:
+                start = word_start(self._language, current, column)
+            else:
+                start = identifier_start(current, column)
+            item = self._items.get(text)
+            if item is not None and item.get('type') == 'snippet':
+                self._expand_snippet(item['snippet'], line, start, column)
+                return
+            self._inserting = True
+            try:
+                editor.setSelection(line, start, line, column)
+                editor.replaceSelectedText(text)
+            finally:
+                self._inserting = False
         except Exception:
-            pass
\ No newline at end of file
+            pass
+
+    # ----- snippets -----
+    def _expand_snippet(self, snippet, line, start, column):
+        """Replace the typed trigger with the snippet body as one undo step."""
+        editor = self.editor
+        current = editor.text(line)
+        indent = current[:len(current) - len(current.lstrip())]
+        try:
+            unit = '\t' if editor.indentationsUseTabs() else ' ' * (editor.indentationWidth() or editor.tabWidth())
+        except Exception:
+            unit = '    '
+        body = snippet.body.replace('\t', unit).replace('\n', '\n' + indent)
+        text, stops = parse_snippet(body)
+        self.end_snippet()
+        self._inserting = True
+        editor.beginUndoAction()
+        try:
+            editor.setSelection(line, start, line, column)
+            editor.replaceSelectedText(text)
+        finally:
+            editor.endUndoAction()
+            self._inserting = False
+        # Scintilla positions are byte offsets; the caret now ends the inserted text
+        base = editor.SendScintilla(editor.SCI_GETCURRENTPOS) - len(text.encode('utf-8'))
+        offsets = [(base + len(text[:a].encode('utf-8')), base + len(text[:b].encode('utf-8')))
+                   for a, b in stops]
+        if len(offsets) == 1:
+            editor.SendScintilla(editor.SCI_SETSEL, offsets[0][0], offsets[0][1])
+            return
+        self._snippet_session = SnippetSession(editor, offsets)
+        self._snippet_session.next()
+
+    def end_snippet(self):
+        if self._snippet_session is not None:
+            self._snippet_session.finish()
+            self._snippet_session = None
+
+    def handle_snippet_key(self, key) -> bool:
+        """Tab / Shift+Tab move between tabstops; returns True if handled."""
+        from PyQt6.QtCore import Qt
+        session = self._snippet_session
+        if session is None or not session.active:
+            self._snippet_session = None
+            return False
+        if key == Qt.Key.Key_Tab:
+            session.next()
+            return True
+        if key == Qt.Key.Key_Backtab:
+            session.previous()
+            return True
+        if key == Qt.Key.Key_Escape:
+            self.end_snippet()
+        return False
@@ -0,0 +1,236 @@
+"""Runs the work that follows an edit, coalesced per document.
+
+A keystroke only calls ``ChangeScheduler.notify``: the document's version is
+bumped and every consumer's debounce is pushed back. Nothing else runs on the
+keystroke. Each consumer has its own debounce and a priority; consumers that
+fall due together run in priority order (lower first).
+
+A consumer either runs on the GUI thread, ``callback(version)``, or has a
+``job`` that runs on the shared executor (``MAX_JOBS`` threads for all
+editors) as ``job(snapshot)``, with ``snapshot()`` taken on the GUI thread
+when the job is queued. ``done(version, result)`` then gets the result back
+on the GUI thread. The jobs of one consumer never overlap, a job whose
+version went stale while it was queued is skipped, and a result for an old
+version is dropped, unless the consumer is not ``versioned`` (its job does
+not depend on the text).
+
+Consumers with no debounce are called straight from ``notify``; they must be
+cheap (the completer, for instance, only restarts its own timer).
+"""
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+MAX_JOBS = 2
+
+
+def _now_ms():
+    return time.monotonic() * 1000
+
+
+class _Consumer:
+    __slots__ = ('name', 'callback', 'delay', 'priority', 'job', 'done', 'snapshot', 'enabled',
+                 'versioned', 'due', 'running', 'pending')
+
+    def __init__(self, name, callback, delay, priority, job, done, snapshot, enabled, versioned):
+        self.name = name
+        self.callback = callback
+        self.delay = delay
+        self.priority = priority
+        self.job = job
+        self.done = done
+        self.snapshot = snapshot
+        self.enabled = enabled
+        self.versioned = versioned
+        self.due = None  # time (ms) the debounce runs out, None when idle
+        self.running = False
+        self.pending = False  # fell due while its job was running
+
+
+class JobSignals(QObject):
+    finished = pyqtSignal(str, int, bool, object)  # consumer, version, ran, result
+
+
+class _ConsumerJob(QRunnable):
+    def __init__(self, name, version, job, snapshot, current):
+        super().__init__()
+        self.name = name
+        self.version = version
+        self.job = job
+        self.snapshot = snapshot
+        self.current = current
+        self.signals = JobSignals()
+
+    def run(self):
+        if self.current() != self.version:
+            # the document changed while this waited for a thread
+            self.signals.finished.emit(self.name, self.version, False, None)
+            return
+        result = None
+        try:
+            result = self.job(self.snapshot)
+        except Exception as e:
+            print(f"Change job '{self.name}' failed: {e}")
+        self.signals.finished.emit(self.name, self.version, True, result)
+
+
+class ChangeScheduler(QObject):
+    """Versions one document and runs its change consumers."""
+
+    def __init__(self, parent=None, executor=None):
+        super().__init__(parent)
+        self.version = 0
+        self.executor = executor
+        self.stats = {'changes': 0, 'runs': {}, 'skipped': {}}
+        self._consumers = {}
+        self._inline = []
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._run_due)
+
+    def add(self, name, callback=None, delay=0, priority=0, job=None, done=None, snapshot=None,
+            enabled=None, versioned=True):
+        """Register a consumer; ``enabled()`` is asked when it falls due."""
+        consumer = _Consumer(name, callback, max(0, int(delay)), priority, job, done, snapshot, enabled,
+                             versioned)
+        self.remove(name)
+        self._consumers[name] = consumer
+        if consumer.delay == 0 and job is None:
+            self._inline.append(consumer)
+            self._inline.sort(key=lambda c: c.priority)
+
+    def remove(self, name):
+        consumer = self._consumers.pop(name, None)
+        if consumer in self._inline:
+            self._inline.remove(consumer)
+
+    def set_delay(self, name, delay):
+        consumer = self._consumers.get(name)
+        if consumer is not None:
+            consumer.delay = max(0, int(delay))
+
+    # ----- changes -----
+    def notify(self):
+        """The document changed."""
+        self.version += 1
+        self.stats['changes'] += 1
+        for consumer in self._inline:
+            self._call(consumer)
+        due = _now_ms()
+        for consumer in self._consumers.values():
+            if consumer.delay:
+                consumer.due = due + consumer.delay
+        # a running timer fires early at worst, and re-arms for what is not due yet
+        if not self._timer.isActive():
+            self._arm()
+
+    def run_now(self, name):
+        """Run a consumer at the next turn of the event loop, without waiting for its debounce."""
+        consumer = self._consumers.get(name)
+        if consumer is not None:
+            consumer.due = _now_ms()
+            self._timer.start(0)
+
+    def cancel(self):
+        """Drop everything that is armed; running jobs finish but their results are dropped."""
+        self._timer.stop()
+        self.version += 1
+        for consumer in self._consumers.values():
+            consumer.due = None
+            consumer.pending = False
+
+    def _arm(self):
+        dues = [c.due for c in self._consumers.values() if c.due is not None]
+        if dues:
+            self._timer.start(max(0, int(min(dues) - _now_ms()) + 1))
+
+    def _run_due(self):
+        now = _now_ms()
+        due = sorted((c for c in self._consumers.values() if c.due is not None and c.due <= now),
+                     key=lambda c: c.priority)
+        for consumer in due:
+            consumer.due = None
+            if consumer.job is not None:
+                self._start_job(consumer)
+            else:
+                self._call(consumer)
+        self._arm()
+
+    def _enabled(self, consumer):
+        try:
+            return consumer.enabled is None or bool(consumer.enabled())
+        except Exception as e:
+            print(f"Change consumer '{consumer.name}': {e}")
+            return False
+
+    def _call(self, consumer):
+        if not self._enabled(consumer):
+            return
+        runs = self.stats['runs']
+        runs[consumer.name] = runs.get(consumer.name, 0) + 1
+        try:
+            consumer.callback(self.version)
+        except Exception as e:
+            print(f"Change consumer '{consumer.name}' failed: {e}")
+
+    def _start_job(self, consumer):
+        if consumer.running:
+            consumer.pending = True
+            return
+        if not self._enabled(consumer):
+            return
+        try:
+            snapshot = consumer.snapshot() if consumer.snapshot is not None else None
+        except Exception as e:
+            print(f"Change consumer '{consumer.name}': {e}")
+            return
+        consumer.running = True
+        version = self.version
+        current = (lambda: self.version) if consumer.versioned else (lambda: version)
+        job = _ConsumerJob(consumer.name, version, consumer.job, snapshot, current)
+        job.signals.finished.connect(self._on_job_finished)
+        executor = self.executor or shared_change_executor()
+        # QThreadPool runs higher numbers first
+        executor.start(job, -consumer.priority)
+
+    def _on_job_finished(self, name, version, ran, result):
+        consumer = self._consumers.get(name)
+        if consumer is None:
+            return
+        consumer.running = False
+        counts = self.stats['runs' if ran else 'skipped']
+        counts[name] = counts.get(name, 0) + 1
+        fresh = version == self.version or not consumer.versioned
+        if ran and fresh and consumer.done is not None:
+            try:
+                consumer.done(version, result)
+            except Exception as e:
+                print(f"Change consumer '{name}' failed: {e}")
+        if consumer.pending:
+            consumer.pending = False
+            if consumer.due is None:
+                consumer.due = _now_ms()
+            self._arm()
+
+
+_executor = None
+
+
+def shared_change_executor() -> QThreadPool:
+    """Return the bounded thread pool that change jobs of all documents share."""
+    global _executor
+    if _executor is None:
+        _executor = QThreadPool()
+        _executor.setMaxThreadCount(MAX_JOBS)
+    return _executor
+
+
+def shutdown_change_executor(wait_ms: int = 2000):
+    global _executor
+    if _executor is not None:
+        try:
+            _executor.clear()
+            _executor.waitForDone(wait_ms)
+        except Exception:
+            pass
+        _executor = None
@@ -1,88 +1,44 @@
-import pyflakes.api
-import ast
-from pycodestyle import Checker, StyleGuide
-from io import StringIO
-from PyQt6.QtCore import QRunnable, pyqtSignal, QObject
-from typing import List, Dict
-
-
-class AnalyzerSignals(QObject):
-    issues_found = pyqtSignal(list)
-
-
-class Reporter:
-    def __init__(self):
-        self.errors = []
-
-    def unexpectedError(self, filename, msg):
-        self.errors.append({
-            'line': 0,
-            'col': 0,
-            'type': 'error',
-            'message': msg
-        })
-
-    def syntaxError(self, filename, msg, lineno, offset, text):
-        self.errors.append({
-            'line': lineno,
-            'col': offset,
-            'type': 'error',
-            'message': msg
-        })
-
-    def flake(self, message):
-        self.errors.append({
-            'line': message.lineno,
-            'col': message.col,
-            'type': 'warning',
-            'message': message.message % message.message_args
-        })
-
-
-class CodeAnalyzer(QRunnable):
-    """QRunnable-based worker for code analysis."""
-
-    def __init__(self, source: str, path: str = ''):
-        super().__init__()
-        self.source = source
-        self.path = path
-        self.signals = AnalyzerSignals()
-
-    def run(self):
-        issues = []
-
-        # Syntax check
+from pycodestyle import StyleGuide
+
+from core.analysis_pipeline import document_outline, parse_document
+from core.lint_engine import lint_document, style_config
+
+
+def analyze_source(source: str, path: str = '', analyzer=None, pool=None, persist: bool = False):
+    """Lint ``source`` on the calling thread (or in ``pool``), going through the cache.
+
+    Returns ``(issues, outline)``; the outline is None when the issues came
+    from the diagnostics cache.
+    """
+    from core.diagnostics_cache import shared_diagnostics_cache
+    cache = shared_diagnostics_cache()
+    if analyzer is not None:
+        config = analyzer.config
+    else:
+        config = style_config(StyleGuide(quiet=True).options)
+    cached = cache.get(source, config, path)
+    if cached is not None:
+        if persist:
+            cache.put(source, cached, config, persist=True, path=path)
+        return cached, None
+
+    if pool is not None:
         try:
-            ast.parse(self.source)
-        except SyntaxError as e:
-            issues.append({
-                'line': e.lineno,
-                'col': e.offset,
-                'type': 'error',
-                'message': str(e)
-            })
-            self.signals.issues_found.emit(issues)
-            return
-
-        # Pyflakes check
-        reporter = Reporter()
-        pyflakes.api.check(self.source, self.path or '<string>', reporter)
-        issues.extend(reporter.errors)
-
-        # PEP 8 style check
-        style_guide = StyleGuide(quiet=True)
-        checker = Checker(
-            lines=self.source.splitlines(True),
-            options=style_guide.options
-        )
-        
-        style_errors = checker.check_all()
-        for line_number, offset, code, text, doc in checker.errors:
-            issues.append({
-                'line': line_number,
-                'col': offset,
-                'type': 'style',
-                'message': f'{code}: {text}'
-            })
-
-        self.signals.issues_found.emit(issues)
\ No newline at end of file
+            issues, outline = pool.lint(source, path, incremental=analyzer is not None)
+        except Exception as e:
+            print(f"Lint pool error, analyzing in-process: {e}")
+        else:
+            cache.put(source, issues, config, persist, path)
+            return issues, outline
+
+    doc = parse_document(source, path)
+    try:
+        if analyzer is not None:
+            issues = analyzer.analyze_document(doc)
+        else:
+            issues = lint_document(doc, path)
+    except Exception as e:
+        print(f"Analysis error: {e}")
+        return [], None
+    cache.put(source, issues, config, persist, path)
+    return issues, document_outline(doc)
@@ -0,0 +1,164 @@
+"""Signature help and hover documentation for Python buffers.
+
+Both run through the editor's completion job manager, so they use the same
+worker (thread or process) and the same cached jedi state as completions.
+Answers are cached by (kind, document version, line, column): going back to a
+call or hovering the same name again is answered without touching jedi.
+
+Signature help is requested after ``(`` and ``,`` and shown as a Scintilla
+call tip with the current parameter highlighted. Hover uses Scintilla's
+dwell notifications, so nothing runs until the mouse rests on a word.
+"""
+from collections import OrderedDict
+
+from PyQt6.QtCore import QTimer, QPoint
+
+SIGNATURE_DELAY_MS = 60
+HOVER_DWELL_MS = 450
+
+
+def parameter_span(label: str, index: int):
+    """Character range of parameter ``index`` in a ``name(a, b=1)`` label, or None."""
+    open_at = label.find('(')
+    if open_at < 0 or index < 0:
+        return None
+    depth = 0
+    current = 0
+    start = open_at + 1
+    for pos in range(open_at + 1, len(label)):
+        ch = label[pos]
+        if ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            if depth == 0:
+                return (start, pos) if current == index else None
+            depth -= 1
+        elif ch == ',' and depth == 0:
+            if current == index:
+                return start, pos
+            current += 1
+            start = pos + 2 if label[pos + 1:pos + 2] == ' ' else pos + 1
+    return None
+
+
+class CodeInfo:
+    MAX_CACHED = 128
+
+    def __init__(self, editor, completer):
+        self.editor = editor
+        self.completer = completer
+        self.jobs = completer.jobs
+        self._version = 0
+        self._cache = OrderedDict()
+        self._wanted = {'signatures': None, 'hover': None}
+        self._hover_point = None
+        self._sig_timer = QTimer()
+        self._sig_timer.setSingleShot(True)
+        self._sig_timer.timeout.connect(self._request_signatures)
+        self.jobs.info_ready.connect(self._on_info)
+        try:
+            editor.textChanged.connect(self._bump_version)
+            editor.SCN_CHARADDED.connect(self._on_char_added)
+            editor.SendScintilla(editor.SCI_SETMOUSEDWELLTIME, HOVER_DWELL_MS)
+            editor.SCN_DWELLSTART.connect(self._on_dwell_start)
+            editor.SCN_DWELLEND.connect(self._on_dwell_end)
+        except Exception as e:
+            print(f"Code info unavailable: {e}")
+
+    def _enabled(self) -> bool:
+        # word-index buffers (non-Python) have nothing for jedi to say
+        return getattr(self.completer, '_language', None) is None
+
+    def _bump_version(self):
+        self._version += 1
+
+    def _request(self, kind, line, column):
+        key = (kind, self._version, line, column)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self._wanted[kind] = None
+            self._display(kind, self._cache[key])
+            return
+        self._wanted[kind] = key
+        path = getattr(self.editor, 'file_path', '') or ''
+        self.jobs.submit_info(kind, key, self.editor.text(), line + 1, column, path)
+
+    def _on_info(self, kind, key, result):
+        self._cache[key] = result
+        while len(self._cache) > self.MAX_CACHED:
+            self._cache.popitem(last=False)
+        if self._wanted.get(kind) == key:
+            self._wanted[kind] = None
+            self._display(kind, result)
+
+    def _display(self, kind, result):
+        if kind == 'signatures':
+            self._show_signatures(result)
+        else:
+            self._show_hover(result)
+
+    # ----- signature help -----
+    def _on_char_added(self, char):
+        if not self._enabled():
+            return
+        ch = chr(char) if isinstance(char, int) else str(char)
+        if ch in '(,':
+            self._sig_timer.start(SIGNATURE_DELAY_MS)
+        elif ch == ')':
+            self._sig_timer.stop()
+            self._wanted['signatures'] = None
+            self.editor.SendScintilla(self.editor.SCI_CALLTIPCANCEL)
+
+    def _request_signatures(self):
+        line, column = self.editor.getCursorPosition()
+        self._request('signatures', line, column)
+
+    def _show_signatures(self, signatures):
+        editor = self.editor
+        if not signatures:
+            editor.SendScintilla(editor.SCI_CALLTIPCANCEL)
+            return
+        label, index = signatures[0]
+        text = label if len(signatures) == 1 else f'{label}\n(+{len(signatures) - 1} more)'
+        pos = editor.SendScintilla(editor.SCI_GETCURRENTPOS)
+        editor.SendScintilla(editor.SCI_CALLTIPSHOW, pos, text.encode('utf-8'))
+        span = parameter_span(label, index)
+        if span:
+            # call tip highlight offsets are in bytes
+            start = len(label[:span[0]].encode('utf-8'))
+            end = len(label[:span[1]].encode('utf-8'))
+            editor.SendScintilla(editor.SCI_CALLTIPSETHLT, start, end)
+
+    # ----- hover -----
+    def _on_dwell_start(self, position, x, y):
+        if position < 0 or not self._enabled():
+            return
+        editor = self.editor
+        start = editor.SendScintilla(editor.SCI_WORDSTARTPOSITION, position, True)
+        end = editor.SendScintilla(editor.SCI_WORDENDPOSITION, position, True)
+        if start == end:
+            return
+        self._hover_point = QPoint(x, y)
+        line, column = editor.lineIndexFromPosition(start)
+        self._request('hover', line, column)
+
+    def _on_dwell_end(self, *args):
+        self._wanted['hover'] = None
+        self._hover_point = None
+        try:
+            from PyQt6.QtWidgets import QToolTip
+            QToolTip.hideText()
+        except Exception:
+            pass
+
+    def _show_hover(self, text):
+        if not text or self._hover_point is None:
+            return
+        try:
+            from PyQt6.QtWidgets import QToolTip
+            editor = self.editor
+            height = editor.SendScintilla(editor.SCI_TEXTHEIGHT, 0)
+            point = editor.viewport().mapToGlobal(self._hover_point + QPoint(0, height))
+            QToolTip.showText(point, text[:1500], editor)
+        except Exception:
+            pass
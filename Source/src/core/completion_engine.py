@@ -0,0 +1,287 @@
+"""Long-lived jedi state shared by completion requests.
+
+``jedi.Script`` normally builds a fresh ``InferenceState`` for every call, so
+imports, stubs and compiled modules are re-inferred on each keystroke. The
+engine keeps one ``jedi.Project`` per workspace root and a bounded LRU of
+per-file inference states that are handed to new scripts as long as the edits
+since the last request did not touch the file's import statements.
+
+This module does not depend on Qt so it can also run inside a completion
+server process.
+"""
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import jedi
+
+try:
+    import parso
+    from jedi import cache as _jedi_cache
+    from jedi import settings as _jedi_settings
+    from jedi.inference import InferenceState
+    _HAS_JEDI_INTERNALS = True
+except Exception:
+    _HAS_JEDI_INTERNALS = False
+
+
+ROOT_MARKERS = ('.git', 'pyproject.toml', 'setup.py', 'setup.cfg', '.hg')
+
+
+def find_workspace_root(path: str) -> str:
+    """Return the nearest parent directory that looks like a project root."""
+    if not path:
+        return os.getcwd()
+    start = os.path.dirname(os.path.abspath(path))
+    current = start
+    while True:
+        for marker in ROOT_MARKERS:
+            if os.path.exists(os.path.join(current, marker)):
+                return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return start
+        current = parent
+
+
+def import_lines(source: str) -> dict:
+    """Map 0-based line numbers to the stripped import statements they hold."""
+    found = {}
+    for i, line in enumerate(source.split('\n')):
+        stripped = line.lstrip()
+        if stripped.startswith('import ') or stripped.startswith('from '):
+            found[i] = stripped.rstrip()
+    return found
+
+
+if _HAS_JEDI_INTERNALS:
+    class _ReusedStateScript(jedi.Script):
+        """A ``jedi.Script`` that parses new code into an existing inference state."""
+
+        def __init__(self, code, path, project, inference_state):
+            self._orig_path = path
+            path = Path(path) if path else None
+            self.path = path.absolute() if path else None
+            inference_state.reset_recursion_limitations()
+            self._inference_state = inference_state
+            self._module_node, code = inference_state.parse_and_get_code(
+                code=code,
+                path=self.path,
+                use_latest_grammar=bool(path and path.suffix == '.pyi'),
+                cache=False,
+                diff_cache=_jedi_settings.fast_parser,
+                cache_path=_jedi_settings.cache_directory,
+            )
+            self._code_lines = parso.split_lines(code, keepends=True)
+            self._code = code
+            _jedi_cache.clear_time_caches()
+
+
+class _FileState:
+    __slots__ = ('state', 'imports', 'code', 'script', 'uses')
+
+    def __init__(self, state, imports):
+        self.state = state
+        self.imports = imports
+        self.code = None
+        self.script = None
+        self.uses = 0
+
+
+class CompletionEngine:
+    """Caches jedi projects and per-file inference state between requests.
+
+    Requests may come from a worker thread while invalidations arrive from the
+    UI thread, so invalidations are only queued (cheap, never blocks) and are
+    applied by the next request under the engine lock.
+    """
+
+    def __init__(self, max_files: int = 16, max_reuse: int = 500, max_docstrings: int = 512):
+        self.max_files = max_files
+        # memoized inference accumulates per script; start over now and then
+        self.max_reuse = max_reuse
+        self.max_docstrings = max_docstrings
+        self._last_completions = {}
+        self._last_path = ''
+        self._docstrings = OrderedDict()
+        self._projects = {}
+        self._files = OrderedDict()
+        self._lock = threading.RLock()
+        self._pending = []
+        self._pending_lock = threading.Lock()
+
+    # ----- invalidation (safe to call from any thread) -----
+    def notify_edit(self, path: str, first_line: int, lines_added: int = 0):
+        """Record an edit at ``first_line`` (0-based) of an open buffer."""
+        last_line = first_line + max(0, -lines_added)
+        with self._pending_lock:
+            self._pending.append(('edit', self._key(path), first_line, last_line))
+
+    def invalidate_path(self, path: str):
+        """A file changed on disk: forget state that may have imported it."""
+        with self._pending_lock:
+            self._pending.append(('file', os.path.abspath(path), 0, 0))
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._projects.clear()
+            self._last_completions = {}
+            self._docstrings.clear()
+
+    def _apply_pending(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for kind, key, first, last in pending:
+            if kind == 'edit':
+                entry = self._files.get(key)
+                if entry is None:
+                    continue
+                if any(first <= ln <= last for ln in entry.imports):
+                    self._files.pop(key, None)
+            else:
+                self._files.pop(key, None)
+                # any other file of the same project may import the changed one
+                for other in list(self._files):
+                    root = find_workspace_root(other)
+                    if key.startswith(root + os.sep):
+                        self._files.pop(other, None)
+
+    # ----- requests -----
+    @staticmethod
+    def _key(path: str) -> str:
+        return os.path.abspath(path) if path else ''
+
+    def project_for(self, path: str):
+        root = find_workspace_root(path)
+        project = self._projects.get(root)
+        if project is None:
+            project = jedi.Project(root)
+            self._projects[root] = project
+        return project
+
+    def script(self, source: str, path: str = ''):
+        """Return a jedi Script for ``source``, reusing cached state if possible."""
+        with self._lock:
+            self._apply_pending()
+            key = self._key(path)
+            project = self.project_for(path)
+            if not _HAS_JEDI_INTERNALS or not key:
+                return jedi.Script(code=source, path=path or None, project=project)
+
+            entry = self._files.get(key)
+            if entry is not None and entry.code == source and entry.script is not None:
+                self._files.move_to_end(key)
+                return entry.script
+
+            imports = import_lines(source)
+            if (entry is None
+                    or sorted(entry.imports.values()) != sorted(imports.values())
+                    or entry.uses >= self.max_reuse):
+                state = InferenceState(project, script_path=Path(key))
+                entry = _FileState(state, imports)
+            entry.imports = imports
+            try:
+                script = _ReusedStateScript(source, path, project, entry.state)
+            except Exception:
+                self._files.pop(key, None)
+                return jedi.Script(code=source, path=path, project=project)
+
+            entry.code = source
+            entry.script = script
+            entry.uses += 1
+            self._files[key] = entry
+            self._files.move_to_end(key)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+            return script
+
+    def complete(self, source: str, line: int, column: int, path: str = ''):
+        """Run jedi completion; ``line`` is 1-based, ``column`` 0-based."""
+        with self._lock:
+            completions = self.script(source, path).complete(line=line, column=column)
+            # keep the objects around so docstrings can be resolved on demand
+            self._last_completions = {(c.module_name, c.name): c for c in completions}
+            self._last_path = self._key(path)
+            return completions
+
+    def warm_up(self, modules, root: str = '') -> dict:
+        """Complete ``module.`` for each module so later requests find it cached.
+
+        Returns ``{module: [(name, type), ...]}`` for the persistent cache.
+        """
+        path = os.path.join(root or os.getcwd(), '.scriptly_warmup.py')
+        found = {}
+        for module in modules:
+            source = f'import {module}\n{module}.'
+            try:
+                # not through complete(): an open completion list keeps its docstrings
+                with self._lock:
+                    completions = self.script(source, path).complete(line=2, column=len(module) + 1)
+            except Exception:
+                continue
+            found[module] = [(c.name, c.type) for c in completions]
+        with self._lock:
+            self._files.pop(self._key(path), None)
+        return found
+
+    # ----- signatures and hover -----
+    def signatures(self, source: str, line: int, column: int, path: str = ''):
+        """Call signatures around the position as ``[(label, param index), ...]``."""
+        with self._lock:
+            found = self.script(source, path).get_signatures(line=line, column=column)
+            return [(s.to_string(), -1 if s.index is None else s.index) for s in found]
+
+    def hover(self, source: str, line: int, column: int, path: str = '') -> str:
+        """Description and docstring of the name at the position, or ''."""
+        with self._lock:
+            names = self.script(source, path).help(line=line, column=column)
+            for name in names:
+                try:
+                    doc = name.docstring()
+                except Exception:
+                    doc = ''
+                header = name.full_name or name.name
+                if name.type:
+                    header = f'{name.type} {header}'
+                return f'{header}\n\n{doc}'.strip() if doc else header
+            return ''
+
+    # ----- docstrings -----
+    def cached_docstring(self, module: str, name: str):
+        """Return a previously resolved docstring, or None. Does not block."""
+        return self._docstrings.get((module, name))
+
+    def docstring(self, module: str, name: str) -> str:
+        """Resolve the docstring of an item from the last completion list."""
+        key = (module, name)
+        doc = self._docstrings.get(key)
+        if doc is not None:
+            return doc
+        with self._lock:
+            completion = self._last_completions.get(key)
+            if completion is None:
+                return ''
+            try:
+                doc = completion.docstring()
+            except Exception:
+                doc = ''
+            # names from the buffer being edited change too often to cache
+            if str(completion.module_path or '') == self._last_path:
+                return doc
+            self._docstrings[key] = doc
+            while len(self._docstrings) > self.max_docstrings:
+                self._docstrings.popitem(last=False)
+            return doc
+
+
+_shared_engine = None
+
+
+def shared_engine() -> CompletionEngine:
+    """Process-wide engine shared by all editors."""
+    global _shared_engine
+    if _shared_engine is None:
+        _shared_engine = CompletionEngine()
+    return _shared_engine
@@ -0,0 +1,110 @@
+"""Entry point of the completion worker processes (see core.completion_server).
+
+Spawned workers import only this module, jedi and the engine. ``start``
+makes this module the ``__main__`` a spawned child re-imports, instead of
+the application's main script and the GUI stack it pulls in.
+"""
+import sys
+import time
+
+
+def start(process):
+    """Start a spawn-context ``process`` whose target lives in this module."""
+    if getattr(sys, 'frozen', False):
+        # a frozen app re-runs its own executable; freeze_support takes over there
+        process.start()
+        return
+    main = sys.modules['__main__']
+    sys.modules['__main__'] = sys.modules[__name__]
+    try:
+        process.start()
+    finally:
+        sys.modules['__main__'] = main
+
+
+def serve(conn):
+    """Entry point of a worker process: answer requests on ``conn`` until 'stop'."""
+    from core.completion_engine import CompletionEngine
+    engine = CompletionEngine()
+    queue = []
+    cancelled = set()
+
+    while True:
+        try:
+            if not queue:
+                queue.append(conn.recv())
+            while conn.poll():
+                queue.append(conn.recv())
+        except (EOFError, OSError):
+            return
+
+        # apply cheap messages right away and keep only the jobs still wanted
+        jobs = []
+        latest = {}
+        for msg in queue:
+            op, req_id, payload = msg
+            if op == 'stop':
+                return
+            if op == 'cancel':
+                if len(cancelled) > 1000:
+                    cancelled.clear()
+                cancelled.add(payload)
+            elif op == 'edit':
+                engine.notify_edit(*payload)
+            elif op == 'invalidate':
+                engine.invalidate_path(*payload)
+            else:
+                jobs.append(msg)
+                if op == 'complete':
+                    latest[payload[3]] = req_id
+        queue = []
+        deferred = []
+
+        for index, (op, req_id, payload) in enumerate(jobs):
+            if conn.poll():
+                # more messages arrived (maybe cancellations); re-plan first
+                queue = jobs[index:]
+                break
+            if req_id in cancelled:
+                cancelled.discard(req_id)
+                continue
+            try:
+                if op == 'complete':
+                    if latest.get(payload[3]) != req_id:
+                        # superseded by a newer request for the same file
+                        conn.send((req_id, ([], {})))
+                        continue
+                    source, line, column, path = payload
+                    # perf_counter is system-wide, so the GUI can compare these stamps
+                    stamps = {'job_start': time.perf_counter()}
+                    names = [(c.name, c.type, c.module_name, c.complete)
+                             for c in engine.complete(source, line, column, path)]
+                    stamps['jedi_done'] = time.perf_counter()
+                    result = (names, stamps)
+                elif op == 'docstring':
+                    module, name = payload
+                    result = (module, name, engine.docstring(module, name))
+                elif op == 'signatures':
+                    result = engine.signatures(*payload)
+                elif op == 'hover':
+                    result = engine.hover(*payload)
+                elif op == 'warmup':
+                    modules, root = payload[0], payload[1]
+                    found = payload[2] if len(payload) > 2 else {}
+                    found.update(engine.warm_up(modules[:1], root))
+                    if modules[1:]:
+                        # one module at a time so completion requests can cut in
+                        deferred.append(('warmup', req_id, (modules[1:], root, found)))
+                        continue
+                    result = found
+                else:
+                    continue
+            except Exception as e:
+                print(f"Completion server error: {e}")
+                result = {'complete': ([], {}), 'docstring': (payload[0], payload[1], ''),
+                          'signatures': [], 'hover': ''}.get(op, {})
+            try:
+                conn.send((req_id, result))
+            except (EOFError, OSError):
+                return
+        queue.extend(deferred)
@@ -0,0 +1,128 @@
+"""Keystroke-to-popup latency of completions.
+
+Each completion request carries a ``CompletionTrace`` that collects
+``time.perf_counter()`` stamps for its stages:
+
+    keystroke  the buffer changed (``AutoCompleter.update_completions``)
+    dispatch   the debounce timer fired
+    job_start  a worker thread / process picked the job up
+    jedi_done  jedi returned
+    delivered  the results reached the GUI thread
+    shown      the popup was shown
+
+``perf_counter`` is a system-wide monotonic clock on the platforms we ship
+for, so stamps taken in completion worker processes line up with the GUI's.
+Finished traces go into a ring buffer; ``LatencyRecorder.summary`` reports
+p50/p95/p99 of every span per file type.
+"""
+import json
+import math
+import time
+from collections import deque
+
+STAGES = ('keystroke', 'dispatch', 'job_start', 'jedi_done', 'delivered', 'shown')
+
+# reported spans: name -> (from stage, to stage)
+SPANS = {
+    'debounce': ('keystroke', 'dispatch'),
+    'queue': ('dispatch', 'job_start'),
+    'jedi': ('job_start', 'jedi_done'),
+    'signal': ('jedi_done', 'delivered'),
+    'popup': ('delivered', 'shown'),
+    'total': ('keystroke', 'shown'),
+}
+
+
+class CompletionTrace:
+    __slots__ = ('file_type', 'source', 'stamps')
+
+    def __init__(self, file_type: str):
+        self.file_type = file_type or '(none)'
+        self.source = 'jedi'  # or 'local' (session filter) / 'words'
+        self.stamps = {'keystroke': time.perf_counter()}
+
+    def mark(self, stage: str, when: float = None):
+        self.stamps[stage] = time.perf_counter() if when is None else when
+
+    def merge(self, stamps: dict):
+        for stage, when in (stamps or {}).items():
+            if stage in STAGES:
+                self.stamps.setdefault(stage, when)
+
+    def spans(self) -> dict:
+        """Milliseconds per span, for the spans whose two stages were stamped."""
+        out = {}
+        for name, (start, end) in SPANS.items():
+            if start in self.stamps and end in self.stamps:
+                out[name] = (self.stamps[end] - self.stamps[start]) * 1000.0
+        return out
+
+
+def percentile(sorted_values, fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values), max(1, math.ceil(fraction * len(sorted_values)))) - 1
+    return sorted_values[rank]
+
+
+class LatencyRecorder:
+    """Ring buffer of finished completion traces."""
+
+    def __init__(self, capacity: int = 2000):
+        self._samples = deque(maxlen=capacity)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def record(self, trace: CompletionTrace):
+        self._samples.append((trace.file_type, trace.source, time.time(), trace.spans()))
+
+    def clear(self):
+        self._samples.clear()
+
+    def summary(self) -> dict:
+        """{file type: {source: {span: {'p50', 'p95', 'p99', 'count'}}}}"""
+        grouped = {}
+        for file_type, source, _, spans in self._samples:
+            per_source = grouped.setdefault(file_type, {}).setdefault(source, {})
+            for name, ms in spans.items():
+                per_source.setdefault(name, []).append(ms)
+        result = {}
+        for file_type, sources in grouped.items():
+            for source, spans in sources.items():
+                stats = {}
+                for name in SPANS:
+                    values = sorted(spans.get(name, ()))
+                    if values:
+                        stats[name] = {'p50': percentile(values, 0.50),
+                                       'p95': percentile(values, 0.95),
+                                       'p99': percentile(values, 0.99),
+                                       'count': len(values)}
+                result.setdefault(file_type, {})[source] = stats
+        return result
+
+    def export(self, path: str):
+        """Write the summary and the raw samples to ``path`` as JSON."""
+        data = {
+            'summary': self.summary(),
+            'samples': [{'file_type': f, 'source': s, 'time': t, 'spans_ms': spans}
+                        for f, s, t, spans in self._samples],
+        }
+        try:
+            import jedi
+            data['jedi_version'] = jedi.__version__
+        except Exception:
+            pass
+        with open(path, 'w', encoding='utf-8') as fh:
+            json.dump(data, fh, indent=2)
+
+
+_recorder = None
+
+
+def shared_recorder() -> LatencyRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = LatencyRecorder()
+    return _recorder
@@ -0,0 +1,254 @@
+"""Runs jedi in long-lived worker processes so inference never holds the GUI's GIL.
+
+Protocol (tuples over a ``multiprocessing`` pipe, one pipe per worker):
+
+    client -> worker   (op, request_id, payload)
+        'complete'   (source, line, column, path)
+        'docstring'  (module, name)
+        'signatures' (source, line, column, path)
+        'hover'      (source, line, column, path)
+        'edit'       (path, first_line, lines_added)   no reply
+        'invalidate' (path,)                           no reply
+        'warmup'     (modules, root)
+        'cancel'     request_id to drop                no reply
+        'stop'       None                              no reply
+
+    worker -> client   (request_id, payload)
+        'complete'  -> ([(name, type, module, complete), ...], stage stamps)
+        'docstring' -> (module, name, docstring)
+        'signatures' -> [(label, param index), ...]
+        'hover'     -> text
+        'warmup'    -> {module: [(name, type), ...]}
+
+Before starting a job the worker drains everything already queued on its
+pipe, so cancelled requests and completions superseded by a newer one for the
+same path are skipped without running jedi. The worker side lives in
+core.completion_host, so a worker process never imports Qt.
+"""
+import itertools
+import multiprocessing
+import threading
+import time
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from core.completion_host import serve, start
+
+
+class _WorkerHandle:
+    def __init__(self, index):
+        self.index = index
+        self.process = None
+        self.conn = None
+        self.reader = None
+        self.pending = {}  # request id -> op
+        # the reader thread takes answered requests, the GUI thread adds and cancels them
+        self.pending_lock = threading.Lock()
+        self.send_lock = threading.Lock()
+        self.alive = False
+
+    def add(self, req_id, op):
+        with self.pending_lock:
+            self.pending[req_id] = op
+
+    def take(self, req_id):
+        with self.pending_lock:
+            return self.pending.pop(req_id, None)
+
+    def take_all(self):
+        with self.pending_lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+
+class CompletionServer(QObject):
+    """Client for a pool of jedi worker processes.
+
+    Requests for a file always go to the same worker so its cached inference
+    state is reused. A worker that dies is restarted and its outstanding
+    requests are answered with empty results.
+    """
+    results_ready = pyqtSignal(int, list, dict)  # request id, results, stage stamps
+    docstring_ready = pyqtSignal(int, str, str, str)  # request id, module, name, docstring
+    warmup_ready = pyqtSignal(dict)  # module -> [(name, type), ...]
+    info_ready = pyqtSignal(int, object)  # request id, signatures or hover text
+    _worker_died = pyqtSignal(int)
+
+    MAX_RESTARTS_PER_MINUTE = 5
+
+    def __init__(self, workers: int = 1, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        self._ctx = multiprocessing.get_context('spawn')
+        self._workers = [_WorkerHandle(i) for i in range(max(1, int(workers)))]
+        self._restarts = []
+        self._closing = False
+        self._doc_worker = 0
+        self._worker_died.connect(self._restart)
+        for handle in self._workers:
+            self._spawn(handle)
+
+    @property
+    def worker_count(self) -> int:
+        return len(self._workers)
+
+    def _spawn(self, handle):
+        parent_conn, child_conn = self._ctx.Pipe()
+        process = self._ctx.Process(target=serve, args=(child_conn,),
+                                    name=f'scriptly-completion-{handle.index}', daemon=True)
+        start(process)
+        child_conn.close()
+        handle.process = process
+        handle.conn = parent_conn
+        handle.alive = True
+        handle.reader = threading.Thread(target=self._read_loop, args=(handle, parent_conn),
+                                         daemon=True)
+        handle.reader.start()
+
+    def _read_loop(self, handle, conn):
+        while True:
+            try:
+                req_id, payload = conn.recv()
+            except (EOFError, OSError):
+                if not self._closing:
+                    self._worker_died.emit(handle.index)
+                return
+            op = handle.take(req_id)
+            if op == 'complete':
+                names, stamps = payload
+                results = [{'name': n, 'type': t, 'module': m, 'complete': c}
+                           for n, t, m, c in names]
+                self.results_ready.emit(req_id, results, stamps)
+            elif op == 'docstring':
+                self.docstring_ready.emit(req_id, *payload)
+            elif op == 'warmup':
+                self.warmup_ready.emit(payload)
+            elif op in ('signatures', 'hover'):
+                self.info_ready.emit(req_id, payload)
+
+    def _restart(self, index):
+        handle = self._workers[index]
+        handle.alive = False
+        for req_id, op in handle.take_all().items():
+            self._answer_empty(req_id, op)
+        now = time.monotonic()
+        self._restarts = [t for t in self._restarts if now - t < 60] + [now]
+        if len(self._restarts) > self.MAX_RESTARTS_PER_MINUTE:
+            print("Completion server: too many worker crashes, not restarting")
+            return
+        try:
+            self._spawn(handle)
+        except Exception as e:
+            print(f"Completion server: could not restart worker: {e}")
+
+    def _answer_empty(self, req_id, op):
+        # the module and name of a docstring request are not kept, the client matches on the id
+        if op == 'complete':
+            self.results_ready.emit(req_id, [], {})
+        elif op == 'docstring':
+            self.docstring_ready.emit(req_id, '', '', '')
+        elif op == 'warmup':
+            self.warmup_ready.emit({})
+        elif op == 'signatures':
+            self.info_ready.emit(req_id, [])
+        elif op == 'hover':
+            self.info_ready.emit(req_id, '')
+
+    def _send(self, handle, op, req_id, payload):
+        """Send a request; one that cannot be sent is answered with an empty result."""
+        if handle.alive:
+            try:
+                with handle.send_lock:
+                    handle.conn.send((op, req_id, payload))
+                return True
+            except Exception:
+                pass
+        self._answer_empty(req_id, handle.take(req_id))
+        return False
+
+    def _broadcast(self, op, payload):
+        for handle in self._workers:
+            self._send(handle, op, 0, payload)
+
+    def _handle_for(self, path: str):
+        return self._workers[hash(path) % len(self._workers)]
+
+    # ----- requests -----
+    def complete(self, source: str, line: int, column: int, path: str = '') -> int:
+        """Send a completion request; the answer arrives through ``results_ready``."""
+        req_id = next(self._ids)
+        handle = self._handle_for(path)
+        handle.add(req_id, 'complete')
+        self._doc_worker = handle.index
+        self._send(handle, 'complete', req_id, (source, line, column, path))
+        return req_id
+
+    def docstring(self, module: str, name: str) -> int:
+        # the worker that produced the last list still holds its completions
+        req_id = next(self._ids)
+        handle = self._workers[self._doc_worker]
+        handle.add(req_id, 'docstring')
+        self._send(handle, 'docstring', req_id, (module, name))
+        return req_id
+
+    def info(self, kind: str, source: str, line: int, column: int, path: str = '') -> int:
+        """Ask for 'signatures' or 'hover'; the answer arrives through ``info_ready``."""
+        req_id = next(self._ids)
+        handle = self._handle_for(path)
+        handle.add(req_id, kind)
+        self._send(handle, kind, req_id, (source, line, column, path))
+        return req_id
+
+    def cancel(self, req_id: int):
+        for handle in self._workers:
+            if handle.take(req_id) is not None:
+                self._send(handle, 'cancel', 0, req_id)
+
+    def notify_edit(self, path: str, first_line: int, lines_added: int = 0):
+        self._send(self._handle_for(path), 'edit', 0, (path, first_line, lines_added))
+
+    def invalidate_path(self, path: str):
+        self._broadcast('invalidate', (path,))
+
+    def warm_up(self, modules, root: str = ''):
+        """Warm every worker; worker 0 reports the names through ``warmup_ready``."""
+        for handle in self._workers:
+            req_id = next(self._ids)
+            if handle.index == 0:
+                handle.add(req_id, 'warmup')
+            self._send(handle, 'warmup', req_id, (list(modules), root))
+
+    def shutdown(self):
+        self._closing = True
+        for handle in self._workers:
+            self._send(handle, 'stop', 0, None)
+        for handle in self._workers:
+            try:
+                handle.process.join(1.0)
+                if handle.process.is_alive():
+                    handle.process.terminate()
+            except Exception:
+                pass
+
+
+_shared_server = None
+
+
+def shared_server(workers: int = 1):
+    """Return the process-wide server, starting it on first use."""
+    global _shared_server
+    if _shared_server is None:
+        _shared_server = CompletionServer(workers)
+    return _shared_server
+
+
+def running_server():
+    """Return the server if it was started, without starting it."""
+    return _shared_server
+
+
+def shutdown_shared_server():
+    global _shared_server
+    if _shared_server is not None:
+        _shared_server.shutdown()
+        _shared_server = None
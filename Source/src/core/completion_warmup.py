@@ -0,0 +1,243 @@
+"""Background jedi warm-up and a persistent cache of module completions.
+
+After the main window is shown, a low-priority job imports jedi, collects the
+modules most often imported by the workspace and completes ``module.`` for
+each of them. That fills jedi's per-process caches, and the resulting name
+lists are stored under ``~/.scriptly/cache`` so that the next session can
+show the first popup for those modules before jedi has answered at all.
+
+Cache files are per interpreter (path, version and jedi version). Each module
+entry records the version of the package that provided it and is ignored once
+that version changes.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+from PyQt6.QtCore import QRunnable, QThread, QThreadPool, QObject, pyqtSignal
+
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.scriptly', 'cache')
+SKIP_DIRS = {'.git', '.hg', 'node_modules', '__pycache__', '.venv', 'venv', '.tox', 'build', 'dist'}
+
+_IMPORT_RE = re.compile(r'^\s*(?:import\s+([\w.]+(?:\s*,\s*[\w.]+)*)|from\s+([\w.]+)\s+import\b)', re.M)
+
+
+def scan_workspace_imports(root: str, max_files: int = 400) -> Counter:
+    """Count top-level modules imported by Python files under ``root``."""
+    counts = Counter()
+    seen = 0
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in SKIP_DIRS and not d.startswith('.')]
+        for name in filenames:
+            if not name.endswith('.py'):
+                continue
+            seen += 1
+            if seen > max_files:
+                return counts
+            try:
+                with open(os.path.join(dirpath, name), 'r', encoding='utf-8', errors='ignore') as fh:
+                    text = fh.read(200_000)
+            except Exception:
+                continue
+            for plain, source in _IMPORT_RE.findall(text):
+                if source:
+                    modules = [source]
+                else:
+                    modules = [m.strip() for m in plain.split(',')]
+                for module in modules:
+                    top = module.split('.')[0]
+                    if top and not module.startswith('.'):
+                        counts[top] += 1
+    return counts
+
+
+def import_aliases(source: str) -> dict:
+    """Map names bound by import statements in ``source`` to module paths."""
+    aliases = {}
+    for match in re.finditer(r'^\s*import\s+(.+)$', source, re.M):
+        for part in match.group(1).split(','):
+            bits = part.split()
+            if not bits:
+                continue
+            module = bits[0]
+            if len(bits) == 3 and bits[1] == 'as':
+                aliases[bits[2]] = module
+            else:
+                aliases[module] = module
+                aliases.setdefault(module.split('.')[0], module.split('.')[0])
+    for match in re.finditer(r'^\s*from\s+([\w.]+)\s+import\s+([^(\\\n]+)$', source, re.M):
+        for part in match.group(2).split(','):
+            bits = part.split()
+            if not bits:
+                continue
+            name = bits[2] if len(bits) == 3 and bits[1] == 'as' else bits[0]
+            aliases[name] = f'{match.group(1)}.{bits[0]}'
+    return aliases
+
+
+_distributions = None
+
+
+def module_version(module: str) -> str:
+    """Version of whatever provides ``module`` in this interpreter."""
+    global _distributions
+    top = module.split('.')[0]
+    if top in getattr(sys, 'stdlib_module_names', ()) or top in sys.builtin_module_names:
+        return 'stdlib-' + sys.version.split()[0]
+    try:
+        from importlib import metadata
+        if _distributions is None:
+            _distributions = metadata.packages_distributions()
+        dists = _distributions.get(top) or []
+        if dists:
+            return f'{dists[0]}-{metadata.version(dists[0])}'
+    except Exception:
+        pass
+    return 'unknown'
+
+
+def interpreter_key() -> str:
+    try:
+        import jedi
+        jedi_version = jedi.__version__
+    except Exception:
+        jedi_version = '?'
+    raw = f'{sys.executable}|{sys.version}|{jedi_version}'
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:16]
+
+
+class WarmCompletionCache:
+    """Module completion lists persisted between sessions."""
+
+    def __init__(self, directory: str = CACHE_DIR):
+        self.path = os.path.join(directory, f'completions-{interpreter_key()}.json')
+        self.modules = {}
+        self._loaded = False
+
+    def load(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                modules = json.load(fh).get('modules', {})
+        except Exception:
+            modules = {}
+        # drop entries whose package was upgraded or removed since they were stored
+        self.modules = {m: e for m, e in modules.items()
+                        if e.get('version') == module_version(m)}
+
+    def get(self, module: str):
+        """Return completion payloads for ``module`` or None if not cached."""
+        self.load()
+        entry = self.modules.get(module)
+        if not entry:
+            return None
+        return [{'name': name, 'type': kind, 'module': module, 'complete': name}
+                for name, kind in entry.get('names', [])]
+
+    def update(self, found: dict):
+        self.load()
+        for module, names in found.items():
+            self.modules[module] = {'version': module_version(module),
+                                    'names': [list(n) for n in names]}
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump({'modules': self.modules}, fh)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"Could not save completion cache: {e}")
+
+
+_warm_cache = None
+
+
+def warm_cache() -> WarmCompletionCache:
+    global _warm_cache
+    if _warm_cache is None:
+        _warm_cache = WarmCompletionCache()
+    return _warm_cache
+
+
+class WarmupSignals(QObject):
+    modules_found = pyqtSignal(list)
+    finished = pyqtSignal(dict)
+
+
+class CompletionWarmup(QRunnable):
+    """Low-priority job that pre-imports jedi and warms the workspace's imports.
+
+    With ``in_process`` set the shared completion engine is warmed here;
+    otherwise only the module list is computed and the caller forwards it to
+    the completion server.
+    """
+
+    def __init__(self, root: str, max_modules: int = 20, in_process: bool = True):
+        super().__init__()
+        self.root = root
+        self.max_modules = max_modules
+        self.in_process = in_process
+        self.signals = WarmupSignals()
+
+    def run(self):
+        thread = QThread.currentThread()
+        previous = thread.priority()
+        try:
+            thread.setPriority(QThread.Priority.LowestPriority)
+        except Exception:
+            pass
+        try:
+            cache = warm_cache()
+            cache.load()
+            counts = scan_workspace_imports(self.root) if self.root else Counter()
+            modules = [m for m, _ in counts.most_common(self.max_modules)]
+            self.signals.modules_found.emit(modules)
+            if not self.in_process:
+                return
+            from core.completion_engine import shared_engine
+            found = shared_engine().warm_up(modules, self.root)
+            cache.update(found)
+            cache.save()
+            self.signals.finished.emit(found)
+        except Exception as e:
+            print(f"Completion warm-up failed: {e}")
+        finally:
+            try:
+                thread.setPriority(previous)
+            except Exception:
+                pass
+
+
+def start_warmup(root: str, settings=None):
+    """Schedule the warm-up on the global thread pool at low priority."""
+    completion = getattr(settings, 'completion', None) or {}
+    server = None
+    if completion.get('backend', 'thread') == 'process':
+        try:
+            from core.completion_server import shared_server
+            server = shared_server(int(completion.get('workers', 1)))
+        except Exception as e:
+            print(f"Completion server unavailable, warming up in-process: {e}")
+    job = CompletionWarmup(root, in_process=server is None)
+    if server is not None:
+        job.signals.modules_found.connect(lambda modules: server.warm_up(modules, root))
+        try:
+            server.warmup_ready.disconnect(_store_found)
+        except Exception:
+            pass
+        server.warmup_ready.connect(_store_found)
+    QThreadPool.globalInstance().start(job, -1)
+    return job
+
+
+def _store_found(found):
+    cache = warm_cache()
+    cache.update(found)
+    cache.save()
@@ -1,46 +1,115 @@
+import time
+
 from PyQt6.QtCore import QRunnable, pyqtSignal, QObject, QThreadPool
-import jedi
+from core.completion_engine import shared_engine
 
 
 class CompletionSignals(QObject):
-    results_ready = pyqtSignal(list)
+    results_ready = pyqtSignal(int, list, dict)  # generation, results, stage stamps
+    docstring_ready = pyqtSignal(str, str, str)  # module, name, docstring
+    info_ready = pyqtSignal(str, object, object)  # kind, request key, result
 
 
 class CompletionWorker(QRunnable):
     """QRunnable-based worker for jedi completions. Uses QThreadPool so we don't
-    have to manage QThread lifecycles manually (avoids 'QThread destroyed' issues)."""
+    have to manage QThread lifecycles manually (avoids 'QThread destroyed' issues).
+
+    Each worker is tagged with the document generation it was created for. The
+    optional ``is_stale`` callable is polled before and after the jedi call so a
+    superseded job can bail out without doing (or publishing) any work.
+    """
 
-    def __init__(self, source: str, line: int, column: int, path: str = ''):
+    def __init__(self, source: str, line: int, column: int, path: str = '',
+                 generation: int = 0, is_stale=None):
         super().__init__()
         self.source = source
         self.line = line
         self.column = column
         self.path = path
+        self.generation = generation
+        self.is_stale = is_stale
         self.signals = CompletionSignals()
 
+    def _stale(self) -> bool:
+        try:
+            return bool(self.is_stale and self.is_stale(self.generation))
+        except Exception:
+            return False
+
     def run(self):
+        # The buffer already moved on while we were queued; skip jedi entirely
+        if self._stale():
+            return
+        # perf_counter stamps for core.completion_metrics
+        stamps = {'job_start': time.perf_counter()}
         try:
-            # Create Jedi Script object
-            script = jedi.Script(code=self.source, path=self.path)
-            
-            # Get completions
-            completions = script.complete(line=self.line, column=self.column)
-            
-            # Convert to simplified format
+            # Get completions through the shared engine so the jedi project
+            # and inference state survive between keystrokes
+            completions = shared_engine().complete(
+                self.source, self.line, self.column, self.path)
+            stamps['jedi_done'] = time.perf_counter()
+
+            # Convert to simplified format; docstrings are resolved later,
+            # only for the item the user highlights (see DocstringWorker)
             results = []
             for c in completions:
                 result = {
                     'name': c.name,
                     'type': c.type,
                     'module': c.module_name,
-                    'description': c.description,
-                    'docstring': c.docstring(),
                     'complete': c.complete
                 }
                 results.append(result)
-                
+
+            if self._stale():
+                return
             # Emit results
-            self.signals.results_ready.emit(results)
+            self.signals.results_ready.emit(self.generation, results, stamps)
         except Exception as e:
             print(f"Completion error: {e}")
-            self.signals.results_ready.emit([])
+            self.signals.results_ready.emit(self.generation, [], stamps)
+
+
+class DocstringWorker(QRunnable):
+    """Resolves the docstring of one completion item in the background."""
+
+    def __init__(self, module: str, name: str):
+        super().__init__()
+        self.module = module
+        self.name = name
+        self.signals = CompletionSignals()
+
+    def run(self):
+        try:
+            doc = shared_engine().docstring(self.module, self.name)
+        except Exception as e:
+            print(f"Docstring error: {e}")
+            doc = ''
+        self.signals.docstring_ready.emit(self.module, self.name, doc)
+
+
+class InfoWorker(QRunnable):
+    """Signature help ('signatures') or hover text ('hover') for one position."""
+
+    def __init__(self, kind: str, key, source: str, line: int, column: int, path: str = ''):
+        super().__init__()
+        self.kind = kind
+        self.key = key
+        self.source = source
+        self.line = line
+        self.column = column
+        self.path = path
+        self.signals = CompletionSignals()
+
+    def run(self):
+        engine = shared_engine()
+        try:
+            if self.kind == 'signatures':
+                result = engine.signatures(self.source, self.line, self.column, self.path)
+            else:
+                result = engine.hover(self.source, self.line, self.column, self.path)
+        except Exception as e:
+            print(f"Code info error: {e}")
+            result = [] if self.kind == 'signatures' else ''
+        self.signals.info_ready.emit(self.kind, self.key, result)
+
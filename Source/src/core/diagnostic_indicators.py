@@ -0,0 +1,162 @@
+"""Squiggles for analysis issues, redrawn only where they changed.
+
+Issues are grouped per line. A new analysis result is diffed line by line
+against what is drawn, and only the lines whose issues differ are cleared
+and filled again. Only the visible lines plus a page above and below are
+drawn; the rest is drawn on scrolling. Scintilla calls are batched: one
+``SCI_SETINDICATORCURRENT`` per indicator and one clear per run of
+consecutive lines.
+
+Scintilla moves indicators along with the text, so edits only shift the
+line numbers recorded here. The edited line itself is marked unknown and
+redrawn with the next result.
+"""
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.Qsci import QsciScintilla
+
+KINDS = {'error': 0, 'warning': 1, 'style': 2}
+COLORS = ('#ff0000', '#ffaa00', '#00aa00')
+
+_UNKNOWN = None  # drawn state of an edited line: clear it before drawing
+
+
+class DiagnosticIndicators:
+    def __init__(self, editor, margin_pages: int = 1):
+        self.editor = editor
+        self.margin_pages = margin_pages
+        self.indicators = []
+        for color in COLORS:
+            number = editor.indicatorDefine(QsciScintilla.IndicatorStyle.SquiggleIndicator)
+            editor.setIndicatorForegroundColor(QColor(color), number)
+            self.indicators.append(number)
+        self._wanted = {}  # line -> ((kind, col), ...) from the last analysis
+        self._drawn = {}  # line -> spans drawn now, or _UNKNOWN
+        self.last_stats = {}
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.draw_visible)
+        try:
+            editor.verticalScrollBar().valueChanged.connect(lambda _value: self._timer.start(0))
+            editor.lines_changed.connect(self.shift)
+        except Exception as e:
+            print(f"Diagnostic indicators will not follow scrolling: {e}")
+
+    # ----- input -----
+    def set_issues(self, issues):
+        wanted = {}
+        for issue in issues:
+            line = int(issue.get('line') or 1) - 1
+            span = (KINDS.get(issue.get('type'), 0), int(issue.get('col') or 0))
+            wanted.setdefault(line, set()).add(span)
+        self._wanted = {line: tuple(sorted(spans)) for line, spans in wanted.items()}
+        first, last = self._window()
+        # drawn lines outside the window that are now wrong are only cleared
+        stale = [line for line, spans in self._drawn.items()
+                 if not first <= line <= last and spans != self._wanted.get(line, ())]
+        self._update(stale, draw=False)
+        self.draw_visible()
+
+    def clear(self):
+        self._wanted = {}
+        self._update(list(self._drawn), draw=False)
+
+    def shift(self, first_line: int, lines_added: int):
+        """Follow an edit at ``first_line`` that added (or removed) lines."""
+        if lines_added:
+            self._wanted = self._shifted(self._wanted, first_line, lines_added)
+            self._drawn = self._shifted(self._drawn, first_line, lines_added)
+            if lines_added > 0 and first_line in self._drawn:
+                # the rest of the split line, with its squiggles, moved down
+                self._drawn[first_line + lines_added] = _UNKNOWN
+        if first_line in self._drawn or first_line in self._wanted:
+            self._drawn[first_line] = _UNKNOWN
+
+    @staticmethod
+    def _shifted(lines, first_line, lines_added):
+        removed_to = first_line - lines_added if lines_added < 0 else first_line
+        shifted = {}
+        for line, spans in lines.items():
+            if line <= first_line:
+                shifted[line] = spans
+            elif line > removed_to:
+                shifted[line + lines_added] = spans
+        return shifted
+
+    # ----- drawing -----
+    def _window(self):
+        editor = self.editor
+        try:
+            top = editor.SendScintilla(QsciScintilla.SCI_GETFIRSTVISIBLELINE)
+            first = editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, top)
+            page = editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN)
+        except Exception:
+            return 0, editor.lines()
+        margin = page * self.margin_pages
+        return max(0, first - margin), first + page + margin
+
+    def draw_visible(self):
+        first, last = self._window()
+        last = min(last, self.editor.lines() - 1)
+        if len(self._wanted) + len(self._drawn) < last - first:
+            # fewer lines with issues than lines on screen: walk those instead
+            lines = {line for line in self._wanted if first <= line <= last}
+            lines.update(line for line in self._drawn if first <= line <= last)
+        else:
+            lines = range(first, last + 1)
+        self._update([line for line in lines
+                      if self._drawn.get(line, ()) != self._wanted.get(line, ())])
+
+    def _update(self, lines, draw=True):
+        """Clear ``lines`` and, when ``draw``, fill their wanted spans."""
+        if not lines:
+            self.last_stats = {'lines': 0, 'spans': 0}
+            return
+        editor = self.editor
+        send = editor.SendScintilla
+        line_count = editor.lines()
+        lines = sorted(line for line in set(lines) if 0 <= line < line_count)
+        for line in [line for line in self._drawn if line >= line_count]:
+            del self._drawn[line]
+
+        # runs of consecutive lines, cleared with one call per indicator
+        runs = []
+        for line in lines:
+            if runs and runs[-1][1] == line - 1:
+                runs[-1][1] = line
+            else:
+                runs.append([line, line])
+        ranges = []
+        length = send(QsciScintilla.SCI_GETLENGTH)
+        for start, end in runs:
+            begin = send(QsciScintilla.SCI_POSITIONFROMLINE, start)
+            # up to and including the end of line, where past-the-end issues are drawn
+            finish = min(send(QsciScintilla.SCI_GETLINEENDPOSITION, end) + 1, length)
+            ranges.append((begin, max(0, finish - begin)))
+        for number in self.indicators:
+            send(QsciScintilla.SCI_SETINDICATORCURRENT, number)
+            for begin, length in ranges:
+                send(QsciScintilla.SCI_INDICATORCLEARRANGE, begin, length)
+
+        fills = [[] for _ in self.indicators]
+        for line in lines:
+            spans = self._wanted.get(line, ()) if draw else ()
+            if spans:
+                self._drawn[line] = spans
+            else:
+                self._drawn.pop(line, None)
+            if not spans:
+                continue
+            end = send(QsciScintilla.SCI_GETLINEENDPOSITION, line)
+            for kind, col in spans:
+                position = editor.positionFromLineIndex(line, col)
+                if position < 0 or position > end:
+                    # past the end of the line (e.g. W391): mark the line end
+                    position = end
+                fills[kind].append(position)
+        for number, positions in zip(self.indicators, fills):
+            if positions:
+                send(QsciScintilla.SCI_SETINDICATORCURRENT, number)
+                for position in positions:
+                    send(QsciScintilla.SCI_INDICATORFILLRANGE, position, 1)
+        self.last_stats = {'lines': len(lines), 'spans': sum(len(f) for f in fills)}
@@ -0,0 +1,136 @@
+"""Diagnostics keyed by source content, shared by all tabs and sessions.
+
+The key is a hash of the source, the analyzer configuration, whether the
+file is a package ``__init__.py`` (pyflakes reports ``__all__`` and
+``__path__`` differently there) and the versions of the tools that produced
+the issues, so reopening a file, switching branches back and forth or opening
+the same file in two tabs reuses earlier results. Entries live in an
+in-memory LRU and, optionally, as small JSON files under
+``~/.scriptly/cache/diagnostics``. Only results the caller marks as
+persistent (a buffer that matches the file on disk) are written there, so
+typing does not turn into a stream of cache files. A disk hit touches its
+file, so pruning drops the least recently used entries.
+"""
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+DIAGNOSTICS_DIR = os.path.join(os.path.expanduser('~'), '.scriptly', 'cache', 'diagnostics')
+
+
+def tool_versions() -> str:
+    versions = [sys.version.split()[0]]
+    for module in ('pyflakes', 'pycodestyle'):
+        try:
+            versions.append(f"{module}-{__import__(module).__version__}")
+        except Exception:
+            versions.append(f"{module}-?")
+    return '|'.join(versions)
+
+
+class DiagnosticsCache:
+    """LRU of issue lists with an optional on-disk tier."""
+
+    def __init__(self, max_entries: int = 256, directory: str = DIAGNOSTICS_DIR,
+                 disk: bool = True, max_disk_entries: int = 2000):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.disk = disk
+        self.max_disk_entries = max_disk_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._versions = None
+        self._writes = 0
+
+    def key(self, source: str, config: str = '', path: str = '') -> str:
+        if self._versions is None:
+            self._versions = tool_versions()
+        package = os.path.basename(path) == '__init__.py'
+        digest = hashlib.sha1()
+        digest.update(f'{self._versions}\0{config}\0{package:d}\0'.encode('utf-8'))
+        digest.update(source.encode('utf-8', 'surrogatepass'))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def get(self, source: str, config: str = '', path: str = ''):
+        """Return the cached issues for ``source`` or None."""
+        key = self.key(source, config, path)
+        with self._lock:
+            issues = self._entries.get(key)
+            if issues is not None:
+                self._entries.move_to_end(key)
+                return list(issues)
+        if not self.disk:
+            return None
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as fh:
+                issues = json.load(fh)
+            os.utime(self._path(key))
+        except Exception:
+            return None
+        self._remember(key, issues)
+        return list(issues)
+
+    def put(self, source: str, issues, config: str = '', persist: bool = False, path: str = ''):
+        key = self.key(source, config, path)
+        issues = list(issues)
+        self._remember(key, issues)
+        if not (persist and self.disk):
+            return
+        try:
+            os.utime(self._path(key))
+        except OSError:
+            self._write(key, issues)
+
+    def _remember(self, key, issues):
+        with self._lock:
+            self._entries[key] = issues
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _write(self, key, issues):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(key)
+            tmp = f'{path}.{threading.get_ident()}.tmp'
+            with open(tmp, 'w', encoding='utf-8') as fh:
+                json.dump(issues, fh)
+            os.replace(tmp, path)
+        except Exception as e:
+            print(f"Could not write diagnostics cache: {e}")
+            return
+        self._writes += 1
+        if self._writes % 100 == 0:
+            self.prune_disk()
+
+    def prune_disk(self):
+        """Delete the least recently used files once the disk tier grows past its limit."""
+        try:
+            names = [n for n in os.listdir(self.directory) if n.endswith('.json')]
+            if len(names) <= self.max_disk_entries:
+                return
+            paths = sorted((os.path.join(self.directory, n) for n in names), key=os.path.getmtime)
+            for path in paths[:len(paths) - self.max_disk_entries]:
+                os.remove(path)
+        except Exception as e:
+            print(f"Could not prune diagnostics cache: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_shared_cache = None
+
+
+def shared_diagnostics_cache() -> DiagnosticsCache:
+    global _shared_cache
+    if _shared_cache is None:
+        _shared_cache = DiagnosticsCache()
+    return _shared_cache
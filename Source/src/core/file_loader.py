@@ -0,0 +1,245 @@
+"""Reads files into the editor in the background.
+
+A worker thread reads the file in blocks and decodes them; the GUI thread
+appends the decoded text to the document from a zero-interval timer, a few
+blocks per turn of the event loop within ``APPEND_BUDGET_MS``, so the window
+keeps painting and taking input while a large file (or a slow network mount)
+opens. The reader stops when ``MAX_QUEUED`` blocks wait for the GUI, so a
+huge file is never held twice in memory.
+
+The encoding comes from the first block: a BOM, else UTF-8 when the block
+decodes as such, else the Windows ANSI code page. Decoding is strict, since
+the text is saved back in the same encoding: when a later block does not
+decode, the document is cleared and the file read again with the next
+candidate, ending with latin-1, which maps every byte. A first block with
+NUL bytes or mostly control characters is reported as binary before anything
+is appended. ``FileLoad.cancel`` stops both sides at any time.
+"""
+import codecs
+import os
+import threading
+import time
+from collections import deque
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+BLOCK_SIZE = 256 * 1024
+HEAD_SIZE = 64 * 1024
+MAX_QUEUED = 16
+APPEND_BUDGET_MS = 12
+IDLE_POLL_MS = 15
+FALLBACK_ENCODING = 'cp1252'
+
+_BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def detect_encoding(head: bytes) -> str:
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    try:
+        # not final: the block may end inside a character
+        codecs.getincrementaldecoder('utf-8')().decode(head, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return FALLBACK_ENCODING
+
+
+def looks_binary(head: bytes, encoding: str) -> bool:
+    if not head or encoding.startswith(('utf-16', 'utf-32')):
+        return False
+    if b'\0' in head:
+        return True
+    control = sum(1 for byte in head if byte < 32 and byte not in b'\t\n\r\f\b\x1b')
+    return control * 10 > len(head)
+
+
+_RESTART = object()  # queued before the file is read again in another encoding
+
+
+def _candidates(encoding):
+    """``encoding``, then the fallbacks; latin-1 decodes any bytes, so it always ends the list."""
+    if encoding.startswith(('utf-16', 'utf-32')):
+        fallbacks = ('latin-1',)
+    else:
+        fallbacks = (FALLBACK_ENCODING, 'latin-1')
+    return [encoding] + [e for e in fallbacks if e != encoding]
+
+
+class LoadSignals(QObject):
+    progress = pyqtSignal(int, int)  # bytes appended, file size
+    finished = pyqtSignal(str)  # '' when loaded, else why not ('binary', 'cancelled' or an error)
+
+
+class _ReadJob(QRunnable):
+    def __init__(self, load):
+        super().__init__()
+        self.load = load
+
+    def run(self):
+        self.load._read()
+
+
+class FileLoad:
+    """One file being read into ``append(text)``; create it on the GUI thread.
+
+    ``clear()`` drops what was appended when decoding has to start over in
+    another encoding. ``encoding`` skips detection (and the binary check),
+    e.g. to open a file reported as binary anyway.
+    """
+
+    def __init__(self, path, append, clear, encoding=None, pool=None):
+        self.path = path
+        self.append = append
+        self.clear = clear
+        self.encoding = encoding
+        self.newline = ''  # '\r\n' or '\n' once seen, for the editor's EOL mode
+        self.size = 0
+        self.loaded = 0
+        self.signals = LoadSignals()
+        self._forced = encoding is not None
+        self._queue = deque()  # (text, bytes read), then None at the end
+        self._ready = threading.Condition()
+        self._cancelled = False
+        self._error = ''
+        self._done = False
+        self._pool = pool
+        self._timer = QTimer()
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._drain)
+
+    @property
+    def active(self):
+        return not self._done
+
+    def start(self):
+        (self._pool or shared_load_pool()).start(_ReadJob(self))
+        self._timer.start()
+
+    def cancel(self):
+        self._stop('cancelled')
+
+    def _stop(self, error):
+        with self._ready:
+            self._cancelled = True
+            self._queue.clear()
+            self._ready.notify_all()
+        self._finish(error)
+
+    # ----- worker thread -----
+    def _put(self, item):
+        with self._ready:
+            while len(self._queue) >= MAX_QUEUED and not self._cancelled:
+                self._ready.wait()
+            if self._cancelled:
+                return False
+            self._queue.append(item)
+            return True
+
+    def _read(self):
+        try:
+            with open(self.path, 'rb') as file:
+                self.size = os.fstat(file.fileno()).st_size
+                head = file.read(HEAD_SIZE)
+            if not self._forced:
+                self.encoding = detect_encoding(head)
+                if looks_binary(head, self.encoding):
+                    self._error = 'binary'
+                    self._put(None)
+                    return
+            for encoding in _candidates(self.encoding):
+                self.encoding = encoding
+                try:
+                    if not self._read_as(encoding):
+                        return  # cancelled
+                    break
+                except UnicodeDecodeError:
+                    # the first block fooled detection: start over with the next candidate
+                    if not self._put(_RESTART):
+                        return
+        except Exception as e:
+            self._error = str(e) or e.__class__.__name__
+        self._put(None)
+
+    def _read_as(self, encoding):
+        """Queue the decoded file; raises on the first byte ``encoding`` cannot decode."""
+        # strict: text that was decoded with replacements would be saved with them
+        decoder = codecs.getincrementaldecoder(encoding)()
+        with open(self.path, 'rb') as file:
+            data = file.read(HEAD_SIZE)
+            while data and not self._cancelled:
+                if not self._put((decoder.decode(data), len(data))):
+                    return False
+                data = file.read(BLOCK_SIZE)
+            return self._put((decoder.decode(b'', final=True), 0))
+
+    # ----- GUI thread -----
+    def _drain(self):
+        deadline = time.monotonic() + APPEND_BUDGET_MS / 1000
+        appended = False
+        while not self._done and time.monotonic() < deadline:
+            with self._ready:
+                if not self._queue:
+                    break
+                item = self._queue.popleft()
+                self._ready.notify_all()
+            if item is None:
+                self._finish(self._error)
+                return
+            if item is _RESTART:
+                self.loaded = 0
+                self.newline = ''
+                self.clear()
+                continue
+            text, read = item
+            if not self.newline and '\n' in text:
+                index = text.index('\n')
+                self.newline = '\r\n' if index and text[index - 1] == '\r' else '\n'
+            try:
+                if text:
+                    self.append(text)
+            except Exception as e:
+                self._stop(str(e))
+                return
+            self.loaded += read
+            appended = True
+        # poll slower while the reader is waiting on the disk
+        self._timer.setInterval(0 if appended else IDLE_POLL_MS)
+        if appended:
+            self.signals.progress.emit(self.loaded, self.size)
+
+    def _finish(self, error):
+        if self._done:
+            return
+        self._done = True
+        self._timer.stop()
+        self.signals.finished.emit(error)
+
+
+_pool = None
+
+
+def shared_load_pool() -> QThreadPool:
+    """Return the thread pool file loads share (two files read at a time)."""
+    global _pool
+    if _pool is None:
+        _pool = QThreadPool()
+        _pool.setMaxThreadCount(2)
+    return _pool
+
+
+def shutdown_load_pool(wait_ms: int = 2000):
+    global _pool
+    if _pool is not None:
+        try:
+            _pool.clear()
+            _pool.waitForDone(wait_ms)
+        except Exception:
+            pass
+        _pool = None
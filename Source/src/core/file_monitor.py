@@ -39,6 +39,11 @@ class FileMonitor(QObject):
             self.watcher.addPath(file_path)
             self.monitored_files[file_path] = os.path.getmtime(file_path)
             
+    def add_directory(self, path):
+        if path not in self.monitored_dirs and os.path.isdir(path):
+            self.watcher.addPath(path)
+            self.monitored_dirs.add(path)
+
     def remove_file(self, file_path):
         if file_path in self.monitored_files:
             self.watcher.removePath(file_path)
@@ -0,0 +1,233 @@
+"""Who last changed each line, from ``git blame --porcelain``.
+
+Blame runs in the background once per revision of a file (HEAD commit plus
+index blob, as for the gutter) on the index version of the file, and is
+cached on the shared ``Repository``. The result is compact: a table of the
+commits seen and an ``array`` with the commit index of every line.
+
+Blame lines are lines of the index version, which is the base the gutter
+diffs the buffer against, so after local edits ``LineDiff.base_lines_of``
+maps buffer lines to blame lines: nothing is blamed again while typing.
+Lines added or modified in the buffer show as uncommitted.
+
+``BlameView`` shows it either for the caret line at the end of the line
+('inline') or for every visible line in a text margin ('gutter').
+"""
+from array import array
+import time
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtGui import QColor
+from PyQt6.Qsci import QsciScintilla, QsciStyle
+
+NOT_COMMITTED = '0' * 40
+UNCOMMITTED = (NOT_COMMITTED, '', 0, '')  # lines added or changed in the buffer
+MODES = ('off', 'inline', 'gutter')
+
+
+class Blame:
+    __slots__ = ('revision', 'commits', 'lines')
+
+    def __init__(self, revision=None):
+        self.revision = revision
+        self.commits = []  # (sha, author, author time, summary)
+        self.lines = array('i')  # line -> index in commits
+
+    def __len__(self):
+        return len(self.lines)
+
+    def commit(self, line: int):
+        if 0 <= line < len(self.lines):
+            return self.commits[self.lines[line]]
+        return None
+
+
+def parse_blame_porcelain(data) -> Blame:
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', 'replace')
+    blame = Blame()
+    index = {}  # sha -> position in blame.commits
+    details = {}  # sha -> headers, for commits seen for the first time
+    current = None
+    final_lines = []
+    for line in data.split('\n'):
+        if line.startswith('\t'):
+            final_lines.append(index[current])
+            continue
+        parts = line.split(' ', 1)
+        key = parts[0]
+        if len(key) == 40 and len(parts) == 2 and parts[1][:1].isdigit():
+            # <sha> <original line> <final line> [<lines in group>]
+            current = key
+            if current not in index:
+                index[current] = len(blame.commits)
+                blame.commits.append((current, '', 0, ''))
+                details[current] = {}
+        elif current is not None and current in details and len(parts) == 2:
+            details[current][key] = parts[1]
+    for sha, headers in details.items():
+        try:
+            author_time = int(headers.get('author-time', 0))
+        except ValueError:
+            author_time = 0
+        blame.commits[index[sha]] = (sha, headers.get('author', ''), author_time,
+                                     headers.get('summary', ''))
+    blame.lines = array('i', final_lines)
+    return blame
+
+
+def read_blame(root: str, relative: str, contents: bytes):
+    """Blame ``contents`` as the text of ``relative`` (blocking); None when git cannot."""
+    from core.git_status import run_git
+    try:
+        data = run_git(root, 'blame', '--porcelain', '--contents', '-', '--', relative,
+                       input=contents)
+    except Exception:
+        return None  # e.g. not in HEAD yet
+    return parse_blame_porcelain(data)
+
+
+def age(timestamp: int, now=None) -> str:
+    seconds = max(0, (now or time.time()) - timestamp)
+    for unit, size in (('year', 31536000), ('month', 2592000), ('day', 86400), ('hour', 3600),
+                       ('minute', 60)):
+        if seconds >= size:
+            count = int(seconds // size)
+            return f"{count} {unit}{'s' if count != 1 else ''} ago"
+    return 'just now'
+
+
+def describe(commit, short=False) -> str:
+    if commit[0] == NOT_COMMITTED:
+        return 'Not committed' if short else 'Uncommitted changes'
+    sha, author, author_time, summary = commit
+    if short:
+        return f"{sha[:7]} {author[:14]} {age(author_time).replace(' ago', '')}"
+    return f"{author}, {age(author_time)} • {summary}"
+
+
+class BlameView:
+    MARGIN = 4
+    COLOR = '#7A8594'
+
+    def __init__(self, editor, gutter, mode='inline'):
+        self.editor = editor
+        self.gutter = gutter
+        self.blame = None
+        self.mode = 'off'
+        self._line = -1  # caret line with an inline annotation
+        self._eol = hasattr(QsciScintilla, 'SCI_EOLANNOTATIONSETTEXT')
+        self._style = 0
+        try:
+            self._style = QsciStyle(-1, 'Blame', QColor(self.COLOR), editor.paper(), editor.font()).style()
+        except Exception:
+            pass
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.refresh)
+        try:
+            editor.cursorPositionChanged.connect(self._on_cursor)
+            editor.verticalScrollBar().valueChanged.connect(lambda _value: self._on_scroll())
+        except Exception as e:
+            print(f"Blame will not follow the caret: {e}")
+        self.set_mode(mode)
+
+    @property
+    def revision(self):
+        return self.blame.revision if self.blame is not None else None
+
+    def set_mode(self, mode):
+        mode = mode if mode in MODES else 'off'
+        if mode == self.mode:
+            return
+        self._clear()
+        self.mode = mode
+        if mode == 'gutter':
+            self.editor.setMarginType(self.MARGIN, QsciScintilla.MarginType.TextMargin)
+            self.editor.setMarginWidth(self.MARGIN, 'a1b2c3d Abcdefghijklmn 10 months')
+        self.refresh()
+
+    def set_blame(self, blame):
+        self.blame = blame
+        self.refresh()
+
+    def _on_cursor(self, line, _index):
+        if self.mode == 'inline' and line != self._line:
+            self._timer.start(0)
+
+    def _on_scroll(self):
+        if self.mode == 'gutter':
+            self._timer.start(0)
+
+    # ----- drawing -----
+    def refresh(self):
+        if self.mode == 'inline':
+            self._show_inline()
+        elif self.mode == 'gutter':
+            self._show_margin()
+
+    def _commit_at(self, first, last):
+        """Commits of buffer lines ``[first, last)``, through the gutter's diff."""
+        diff = self.gutter.diff
+        if self.blame is None or diff is None or self.gutter.revision != self.blame.revision:
+            return [None] * (last - first), False
+        return [self.blame.commit(base) if base >= 0 else UNCOMMITTED
+                for base in diff.base_lines_of(first, last)], True
+
+    def _show_inline(self):
+        editor = self.editor
+        line, _ = editor.getCursorPosition()
+        commits, known = self._commit_at(line, line + 1)
+        self._clear_inline()
+        if not known or not commits or commits[0] is None:
+            return
+        text = '    ' + describe(commits[0])
+        self._line = line
+        if self._eol:
+            editor.SendScintilla(QsciScintilla.SCI_EOLANNOTATIONSETVISIBLE, 1)
+            editor.SendScintilla(QsciScintilla.SCI_EOLANNOTATIONSETTEXT, line, text.encode('utf-8'))
+            editor.SendScintilla(QsciScintilla.SCI_EOLANNOTATIONSETSTYLE, line, self._style)
+        else:
+            editor.annotate(line, text.strip(), self._style)
+
+    def _clear_inline(self):
+        if self._line < 0:
+            return
+        editor = self.editor
+        try:
+            # edits may have moved the annotated line; there is only ever one
+            if self._eol:
+                editor.SendScintilla(QsciScintilla.SCI_EOLANNOTATIONCLEARALL)
+            else:
+                editor.clearAnnotations(-1)
+        except Exception:
+            pass
+        self._line = -1
+
+    def _show_margin(self):
+        editor = self.editor
+        try:
+            top = editor.SendScintilla(QsciScintilla.SCI_GETFIRSTVISIBLELINE)
+            first = editor.SendScintilla(QsciScintilla.SCI_DOCLINEFROMVISIBLE, top)
+            last = min(editor.lines(), first + editor.SendScintilla(QsciScintilla.SCI_LINESONSCREEN) + 1)
+        except Exception:
+            first, last = 0, editor.lines()
+        commits, known = self._commit_at(first, last)
+        if not known:
+            editor.clearMarginText()
+            return
+        previous = object()
+        for line, commit in zip(range(first, last), commits):
+            # like git blame in most viewers: only the first line of a run is labelled
+            text = '' if commit is previous or commit is None else describe(commit, short=True)
+            editor.setMarginText(line, text, self._style)
+            previous = commit
+
+    def _clear(self):
+        self._clear_inline()
+        if self.mode == 'gutter':
+            try:
+                self.editor.clearMarginText()
+                self.editor.setMarginWidth(self.MARGIN, 0)
+            except Exception:
+                pass
@@ -0,0 +1,358 @@
+"""Added / modified / deleted markers for the lines of a buffer, against git's index.
+
+``LineDiff`` keeps the alignment of the index version (the base) with the
+buffer as ``difflib`` opcodes. The first alignment is computed in a worker
+from the whole text; after that, edits only mark a window of lines dirty and
+``LineDiff.update`` re-diffs that window (widened to the hunks it touches)
+and splices the result in, so the cost follows the size of the edit rather
+than of the file. Both sides are diffed with the common prefix and suffix
+stripped first, and large blocks are split at lines that occur once on each
+side (as patience diff does), so difflib only matches small gaps.
+
+``GitGutter`` draws the markers. Like the diagnostic squiggles it only
+touches the lines whose marker changed; Scintilla moves markers along with
+the text, and edits only shift the line numbers recorded here.
+"""
+import difflib
+from bisect import bisect_left
+
+from PyQt6.QtGui import QColor
+from PyQt6.Qsci import QsciScintilla
+
+ADDED = 'added'
+MODIFIED = 'modified'
+DELETED = 'deleted'
+
+MAX_WINDOW = 2000  # dirty lines past which the whole text is diffed again in a worker
+MATCHER_LIMIT = 250000  # larger blocks are split at unique lines before difflib sees them
+
+_UNKNOWN = None  # drawn state of an edited line: clear it before drawing
+
+
+def split_lines(text: str):
+    """Lines as Scintilla counts them: a text ending with a newline has an empty last line."""
+    return text.replace('\r\n', '\n').split('\n')
+
+
+def diff_lines(base, current, base_offset=0, offset=0):
+    """Opcodes aligning ``base`` with ``current`` (lists of lines), shifted by the offsets."""
+    ops = []
+    _diff(base, 0, len(base), current, 0, len(current), ops)
+    for op in ops:
+        op[1] += base_offset
+        op[2] += base_offset
+        op[3] += offset
+        op[4] += offset
+    return _merged(ops)
+
+
+def _diff(a, alo, ahi, b, blo, bhi, ops):
+    # the common prefix and suffix need no matching
+    start = 0
+    while alo + start < ahi and blo + start < bhi and a[alo + start] == b[blo + start]:
+        start += 1
+    end = 0
+    while ahi - end > alo + start and bhi - end > blo + start and a[ahi - end - 1] == b[bhi - end - 1]:
+        end += 1
+    if start:
+        ops.append(['equal', alo, alo + start, blo, blo + start])
+    i1, i2, j1, j2 = alo + start, ahi - end, blo + start, bhi - end
+    if i1 == i2 and j1 < j2:
+        ops.append(['insert', i1, i1, j1, j2])
+    elif j1 == j2 and i1 < i2:
+        ops.append(['delete', i1, i2, j1, j1])
+    elif i1 < i2:
+        anchors = None
+        if (i2 - i1) * (j2 - j1) > MATCHER_LIMIT:
+            anchors = _unique_anchors(a, i1, i2, b, j1, j2)
+        if anchors:
+            # split at lines found once on both sides, in order (as patience diff does)
+            for i, j in anchors:
+                _diff(a, i1, i, b, j1, j, ops)
+                ops.append(['equal', i, i + 1, j, j + 1])
+                i1, j1 = i + 1, j + 1
+            _diff(a, i1, i2, b, j1, j2, ops)
+        else:
+            matcher = difflib.SequenceMatcher(None, a[i1:i2], b[j1:j2], autojunk=False)
+            for tag, k1, k2, l1, l2 in matcher.get_opcodes():
+                ops.append([tag, k1 + i1, k2 + i1, l1 + j1, l2 + j1])
+    if end:
+        ops.append(['equal', ahi - end, ahi, bhi - end, bhi])
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Longest increasing run of ``(i, j)`` where ``a[i] == b[j]`` occurs once in each range."""
+    counts = {}
+    for i in range(alo, ahi):
+        line = a[i]
+        counts[line] = i if line not in counts else -1
+    in_b = {}
+    for j in range(blo, bhi):
+        line = b[j]
+        if counts.get(line, -1) >= 0:
+            in_b[line] = j if line not in in_b else -1
+    pairs = [(counts[line], j) for line, j in in_b.items() if j >= 0]
+    pairs.sort()
+    # patience sorting on j, keeping back links to rebuild the run
+    tops, top_index, links = [], [], []
+    for index, (_, j) in enumerate(pairs):
+        pile = bisect_left(tops, j)
+        links.append(top_index[pile - 1] if pile else -1)
+        if pile == len(tops):
+            tops.append(j)
+            top_index.append(index)
+        else:
+            tops[pile] = j
+            top_index[pile] = index
+    run = []
+    index = top_index[-1] if top_index else -1
+    while index >= 0:
+        run.append(pairs[index])
+        index = links[index]
+    run.reverse()
+    return run
+
+
+def _merged(ops):
+    merged = []
+    for op in ops:
+        if merged and merged[-1][0] == op[0] == 'equal':
+            merged[-1][2] = op[2]
+            merged[-1][4] = op[4]
+        elif op[1] != op[2] or op[3] != op[4]:
+            merged.append(op)
+    return merged
+
+
+class LineDiff:
+    """The alignment of a base text with a buffer that is being edited."""
+
+    def __init__(self, base, current):
+        self.base = base
+        self.ops = diff_lines(base, current)
+        self.line_count = len(current)
+
+    def update(self, start, old_end, new_end, line_at):
+        """Lines ``[start, old_end)`` of the previous buffer are now ``[start, new_end)``.
+
+        ``line_at(i)`` returns line ``i`` of the buffer as it is now.
+        """
+        delta = new_end - old_end
+        # widen the window to the changed blocks it touches
+        first, last = start, old_end
+        changed = True
+        while changed:
+            changed = False
+            for tag, _, _, j1, j2 in self.ops:
+                if tag != 'equal' and j1 <= last and j2 >= first and (j1 < first or j2 > last):
+                    first, last = min(first, j1), max(last, j2)
+                    changed = True
+        before, after = [], []
+        for tag, i1, i2, j1, j2 in self.ops:
+            if tag == 'equal':
+                if j1 < first:
+                    cut = min(j2, first)
+                    before.append(['equal', i1, i1 + cut - j1, j1, cut])
+                if j2 > last:
+                    cut = max(j1, last)
+                    after.append(['equal', i1 + cut - j1, i2, cut + delta, j2 + delta])
+            elif j2 < first:
+                before.append([tag, i1, i2, j1, j2])
+            elif j1 > last:
+                after.append([tag, i1, i2, j1 + delta, j2 + delta])
+            # changed blocks touching the window were widened into it and are diffed again
+        base_first = before[-1][2] if before else 0
+        base_last = after[0][1] if after else len(self.base)
+        window = [line_at(i) for i in range(first, last + delta)]
+        ops = diff_lines(self.base[base_first:base_last], window, base_first, first)
+        self.ops = _merged(before + ops + after)
+        self.line_count += delta
+        return last - first
+
+    def base_lines_of(self, first, last):
+        """Base line of each buffer line in ``[first, last)``; -1 for added or modified lines."""
+        found = []
+        for tag, i1, _, j1, j2 in self.ops:
+            if j2 <= first:
+                continue
+            if j1 >= last:
+                break
+            for line in range(max(j1, first), min(j2, last)):
+                found.append(i1 + line - j1 if tag == 'equal' else -1)
+        return found
+
+    def markers(self):
+        """``{line: ADDED | MODIFIED | DELETED}`` of the buffer."""
+        markers = {}
+        last_line = max(0, self.line_count - 1)
+        for tag, _, _, j1, j2 in self.ops:
+            if tag == 'insert':
+                for line in range(j1, j2):
+                    markers[line] = ADDED
+            elif tag == 'replace':
+                for line in range(j1, j2):
+                    markers[line] = MODIFIED
+            elif tag == 'delete':
+                markers.setdefault(min(j1, last_line), DELETED)
+        return markers
+
+    def hunks(self):
+        """``[(kind, first line, end line)]``; a deletion is an empty range where the lines were."""
+        kinds = {'insert': ADDED, 'replace': MODIFIED, 'delete': DELETED}
+        return [(kinds[tag], j1, j2) for tag, _, _, j1, j2 in self.ops if tag != 'equal']
+
+    def with_hunks(self, current, first, last):
+        """The base with the hunks touching buffer lines ``[first, last)`` applied from ``current``.
+
+        ``current`` are the buffer's lines; a deletion touches the line its
+        marker is on. Returns None when no hunk is in the range.
+        """
+        last_line = max(0, self.line_count - 1)
+        lines = []
+        applied = False
+        for tag, i1, i2, j1, j2 in self.ops:
+            if tag == 'equal':
+                touched = False
+            elif j1 == j2:
+                touched = first <= min(j1, last_line) < last
+            else:
+                touched = j1 < last and j2 > first
+            if touched:
+                lines.extend(current[j1:j2])
+                applied = True
+            else:
+                lines.extend(self.base[i1:i2])
+        return lines if applied else None
+
+
+def diff_against_base(snapshot):
+    """Worker entry point: ``(revision, LineDiff or None)`` for ``(repository, path, revision, text, encoding)``."""
+    repository, relative, revision, text, encoding = snapshot
+    base = repository.base_lines(relative, revision, encoding)
+    if base is None:
+        return revision, None
+    return revision, LineDiff(base, split_lines(text))
+
+
+class GitGutter:
+    COLORS = {ADDED: '#2EA043', MODIFIED: '#0C7DD9', DELETED: '#F14C4C'}
+    MARGIN = 3
+
+    def __init__(self, editor):
+        self.editor = editor
+        self.diff = None
+        self.revision = None
+        self._dirty = None  # [first, end) of edited lines, and the line delta since the last update
+        self._delta = 0
+        self._drawn = {}  # line -> kind, or _UNKNOWN
+        self.last_stats = {}
+        symbols = {ADDED: QsciScintilla.MarkerSymbol.LeftRectangle,
+                   MODIFIED: QsciScintilla.MarkerSymbol.LeftRectangle,
+                   DELETED: QsciScintilla.MarkerSymbol.RightTriangle}
+        self.markers = {}
+        for kind, symbol in symbols.items():
+            number = editor.markerDefine(symbol)
+            editor.setMarkerBackgroundColor(QColor(self.COLORS[kind]), number)
+            editor.setMarkerForegroundColor(QColor(self.COLORS[kind]), number)
+            self.markers[kind] = number
+        self.mask = sum(1 << n for n in self.markers.values())
+        try:
+            editor.lines_changed.connect(self.shift)
+        except Exception as e:
+            print(f"Git gutter will not follow edits: {e}")
+
+    def show_margin(self):
+        editor = self.editor
+        editor.setMarginType(self.MARGIN, QsciScintilla.MarginType.SymbolMargin)
+        editor.setMarginWidth(self.MARGIN, 6)
+        editor.setMarginMarkerMask(self.MARGIN, self.mask)
+
+    # ----- input -----
+    def set_diff(self, revision, diff):
+        """A full diff computed from the buffer as it is now."""
+        self.revision = revision
+        self.diff = diff
+        self._dirty = None
+        self._delta = 0
+        self.redraw()
+
+    def update(self):
+        """Re-diff the lines edited since the last update.
+
+        Returns False when the edit is too large for a window and the whole
+        text should be diffed again.
+        """
+        if self.diff is None or self._dirty is None:
+            return True
+        first, end = self._dirty
+        delta = self._delta
+        self._dirty = None
+        self._delta = 0
+        editor = self.editor
+        if end - first > MAX_WINDOW or end > editor.lines():
+            return False
+        self.diff.update(first, end - delta, end, lambda i: editor.text(i).rstrip('\r\n'))
+        self.redraw()
+        return True
+
+    def clear(self):
+        self.diff = None
+        self.revision = None
+        self._dirty = None
+        self._delta = 0
+        self._apply(list(self._drawn), {})
+
+    def shift(self, first_line: int, lines_added: int):
+        """Follow an edit at ``first_line`` that added (or removed) lines."""
+        end = first_line + max(lines_added, 0) + 1
+        if self._dirty is None:
+            self._dirty = [first_line, end]
+        else:
+            start, stop = self._dirty
+            if stop > first_line:
+                stop = max(first_line + 1, stop + lines_added)
+            self._dirty = [min(start, first_line), max(stop, end)]
+        self._delta += lines_added
+        if lines_added:
+            shifted = {}
+            removed_to = first_line - lines_added if lines_added < 0 else first_line
+            for line, kind in self._drawn.items():
+                if line <= first_line:
+                    shifted[line] = kind
+                elif line > removed_to:
+                    shifted[line + lines_added] = kind
+                else:
+                    # Scintilla moved the markers of deleted lines onto the edited one
+                    shifted[first_line] = _UNKNOWN
+            self._drawn = shifted
+        if first_line in self._drawn:
+            self._drawn[first_line] = _UNKNOWN
+
+    # ----- drawing -----
+    def redraw(self):
+        wanted = self.diff.markers() if self.diff is not None else {}
+        lines = [line for line in set(wanted) | set(self._drawn)
+                 if self._drawn.get(line, ()) != wanted.get(line, ())]
+        self._apply(lines, wanted)
+
+    def _apply(self, lines, wanted):
+        editor = self.editor
+        line_count = editor.lines()
+        for line in [line for line in self._drawn if line >= line_count]:
+            del self._drawn[line]
+        for line in lines:
+            if not 0 <= line < line_count:
+                continue
+            drawn = self._drawn.get(line, ())
+            kind = wanted.get(line)
+            if drawn is _UNKNOWN:
+                for number in self.markers.values():
+                    editor.markerDelete(line, number)
+            elif drawn:
+                editor.markerDelete(line, self.markers[drawn])
+            if kind:
+                editor.markerAdd(line, self.markers[kind])
+                self._drawn[line] = kind
+            else:
+                self._drawn.pop(line, None)
+        self.last_stats = {'lines': len(lines)}
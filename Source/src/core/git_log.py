@@ -0,0 +1,272 @@
+"""History of a repository or of one file, read from ``git log`` in pages.
+
+``LogStream`` starts one ``git log`` process and reads its output a page at a
+time as the view asks for more rows: git walks the history once, however far
+the user scrolls, and a repository with a long history shows its first page
+as soon as git prints it. Commits are kept as small tuples; the message body,
+the changed files and the diff of a commit are only read (``read_details``)
+when it is selected.
+
+Per-file history is the same stream with ``--follow -- <path>``; each commit
+also records the file's path(s) in it, so the details of a commit from
+before a rename show the file under its old name. Its length is not
+counted: ``rev-list`` cannot follow renames, so the count would not match
+what the stream lists.
+"""
+import os
+import subprocess
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+FIRST_PAGE = 200
+PAGE_SIZE = 2000
+MAX_DETAILS = 512 * 1024  # bytes of `git show` output shown for a commit
+
+# sha, parents, author, email, author time, subject, then (per-file history)
+# the --name-status of the file; one record per commit, each starting with \x1e
+_FORMAT = '%x1e%H%x1f%P%x1f%an%x1f%ae%x1f%at%x1f%s%x1f'
+SHA, PARENTS, AUTHOR, EMAIL, TIME, SUBJECT, PATHS = range(7)
+
+
+def parse_log_record(record: bytes):
+    fields = record.decode('utf-8', 'replace').strip('\n').split('\x1f', 6)
+    if len(fields) < 6:
+        return None
+    try:
+        author_time = int(fields[TIME])
+    except ValueError:
+        author_time = 0
+    # with -z: status, then the path (two for a rename or copy: old, new)
+    status = [field.strip('\n') for field in fields[PATHS].split('\0')] if len(fields) > 6 else []
+    paths = tuple([field for field in status if field][1:])
+    return (fields[SHA], fields[PARENTS], fields[AUTHOR], fields[EMAIL], author_time,
+            fields[SUBJECT], paths)
+
+
+class LogStream:
+    """One running ``git log``, read page by page (blocking; call off the GUI thread)."""
+
+    def __init__(self, root: str, path: str = '', rev: str = 'HEAD'):
+        self.root = root
+        self.path = path
+        self.rev = rev
+        self.complete = False
+        self._process = None
+        self._buffer = b''
+
+    def _start(self):
+        args = ['git', '--no-optional-locks', '--literal-pathspecs', 'log', f'--format={_FORMAT}',
+                '--no-color', self.rev]
+        if self.path:
+            args += ['-z', '--name-status', '--follow', '--', self.path]
+        kwargs = {}
+        if os.name == 'nt':
+            kwargs['creationflags'] = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        self._process = subprocess.Popen(args, cwd=self.root, stdin=subprocess.DEVNULL,
+                                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **kwargs)
+
+    def read_page(self, size: int):
+        """The next ``size`` commits, fewer at the end of the history."""
+        if self.complete:
+            return []
+        if self._process is None:
+            self._start()
+        commits = []
+        stdout = self._process.stdout
+        while len(commits) < size:
+            # a record ends where the next one starts
+            end = self._buffer.find(b'\x1e', 1)
+            if end < 0:
+                chunk = stdout.read1(65536)
+                if chunk:
+                    self._buffer += chunk
+                    continue
+                end = len(self._buffer)
+            record, self._buffer = self._buffer[1:end], self._buffer[end:]
+            commit = parse_log_record(record)
+            if commit is not None:
+                commits.append(commit)
+            if not self._buffer:
+                self.close()
+                break
+        return commits
+
+    def close(self):
+        """Stop git; the stream is complete from then on."""
+        self.complete = True
+        self._buffer = b''
+        process, self._process = self._process, None
+        if process is not None:
+            try:
+                if process.poll() is None:
+                    process.kill()
+                process.stdout.close()
+                process.wait(timeout=5)
+            except Exception:
+                pass
+
+
+def read_details(root: str, sha: str, paths=()) -> str:
+    """Message, changed files and diff of a commit (blocking), limited to ``paths``
+    when given, and to ``MAX_DETAILS``."""
+    from core.git_status import run_git
+    args = ['--literal-pathspecs', 'show', '--no-color', '-M', '--format=fuller', '--stat', '--patch',
+            sha]
+    if paths:
+        args += ['--', *paths]
+    try:
+        data = run_git(root, *args)
+    except Exception as e:
+        return f"Could not read {sha[:10]}: {e}"
+    text = data[:MAX_DETAILS].decode('utf-8', 'replace')
+    if len(data) > MAX_DETAILS:
+        text += f"\n\n... diff truncated ({len(data) // 1024} KB)"
+    return text
+
+
+def count_commits(root: str, rev: str = 'HEAD') -> int:
+    """Number of commits in the history of ``rev`` (blocking); -1 when git cannot tell."""
+    from core.git_status import run_git
+    try:
+        return int(run_git(root, 'rev-list', '--count', rev).strip() or 0)
+    except Exception:
+        return -1
+
+
+class LogSignals(QObject):
+    page = pyqtSignal(object, list)  # stream, commits
+    details = pyqtSignal(str, str)  # sha, text
+    count = pyqtSignal(object, int)  # stream, number of commits
+
+
+class _PageJob(QRunnable):
+    def __init__(self, stream, size, signals):
+        super().__init__()
+        self.stream = stream
+        self.size = size
+        self.signals = signals
+
+    def run(self):
+        commits = []
+        try:
+            commits = self.stream.read_page(self.size)
+        except Exception as e:
+            print(f"Git log failed in {self.stream.root}: {e}")
+            self.stream.close()
+        self.signals.page.emit(self.stream, commits)
+
+
+class _DetailsJob(QRunnable):
+    def __init__(self, root, sha, paths, signals):
+        super().__init__()
+        self.root = root
+        self.sha = sha
+        self.paths = paths
+        self.signals = signals
+
+    def run(self):
+        self.signals.details.emit(self.sha, read_details(self.root, self.sha, self.paths))
+
+
+class _CountJob(QRunnable):
+    def __init__(self, stream, signals):
+        super().__init__()
+        self.stream = stream
+        self.signals = signals
+
+    def run(self):
+        self.signals.count.emit(self.stream, count_commits(self.stream.root, self.stream.rev))
+
+
+class CommitLog(QObject):
+    """Commits of one ``LogStream`` as they come in; pages are read in the background.
+
+    Only one page is read at a time. ``commits_added`` carries the rows
+    appended; ``reset`` follows ``open`` of another history.
+    """
+
+    commits_added = pyqtSignal(int, int)  # first, last row appended
+    reset = pyqtSignal()
+    count_known = pyqtSignal(int)
+    details_ready = pyqtSignal(str, str)  # sha, text
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.commits = []
+        self.stream = None
+        self.total = -1
+        self._fetching = False
+        self._signals = LogSignals()
+        self._signals.page.connect(self._on_page)
+        self._signals.count.connect(self._on_count)
+        self._signals.details.connect(self.details_ready)
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(2)
+
+    @property
+    def root(self):
+        return self.stream.root if self.stream is not None else ''
+
+    @property
+    def path(self):
+        return self.stream.path if self.stream is not None else ''
+
+    def open(self, root: str, path: str = ''):
+        """Show the history of ``root``, or of ``path`` (relative to it) alone."""
+        self.close()
+        self.stream = LogStream(root, path)
+        self.reset.emit()
+        if not path:
+            # a file's history follows renames, which a count cannot; total stays -1
+            self._pool.start(_CountJob(self.stream, self._signals))
+        self.fetch_more(FIRST_PAGE)
+
+    def can_fetch_more(self) -> bool:
+        return self.stream is not None and not self.stream.complete
+
+    def fetch_more(self, size=PAGE_SIZE):
+        if self._fetching or not self.can_fetch_more():
+            return
+        self._fetching = True
+        self._pool.start(_PageJob(self.stream, size, self._signals))
+
+    def _on_page(self, stream, commits):
+        if stream is not self.stream:
+            stream.close()  # a page of a history that was closed meanwhile
+            return
+        self._fetching = False
+        if commits:
+            first = len(self.commits)
+            self.commits.extend(commits)
+            self.commits_added.emit(first, len(self.commits) - 1)
+
+    def _on_count(self, stream, total):
+        if stream is self.stream:
+            self.total = total
+            self.count_known.emit(total)
+
+    def request_details(self, sha: str, paths=()):
+        """Read a commit's details; ``paths`` are the file's names in it (``commit[PATHS]``)."""
+        if self.stream is not None:
+            if self.stream.path and not paths:
+                paths = (self.stream.path,)  # e.g. a merge, which lists no changes
+            self._pool.start(_DetailsJob(self.stream.root, sha, paths, self._signals))
+
+    def close(self):
+        stream, self.stream = self.stream, None
+        if stream is not None and not self._fetching:
+            stream.close()  # a stream with a page in flight is closed when the page is back
+        self._fetching = False
+        self.commits = []
+        self.total = -1
+
+    def shutdown(self):
+        stream = self.stream
+        self.close()
+        try:
+            self._pool.clear()
+            self._pool.waitForDone(2000)
+        except Exception:
+            pass
+        if stream is not None:
+            stream.close()
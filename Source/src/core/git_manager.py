@@ -15,6 +15,7 @@ class GitManager(QObject):
             self.repo = Repo(workspace_path)
         except:
             self.repo = None
+        self._subscribed = False
 
     def is_git_repo(self) -> bool:
         """Check if the workspace is a git repository."""
@@ -30,60 +31,143 @@ class GitManager(QObject):
             return False
 
     def get_status(self) -> dict:
-        """Get the current git status."""
+        """Get the current git status.
+
+        The status comes from the shared status service: it is cached and
+        refreshed in the background, so this never scans the work tree.
+        ``status_changed`` is emitted again whenever a refresh comes back.
+        """
         if not self.is_git_repo():
             return {}
 
         try:
-            status = {
-                'branch': self.repo.active_branch.name,
-                'modified': [],
-                'untracked': [],
-                'staged': []
-            }
-
-            # Get file statuses
-            for item in self.repo.index.diff(None):
-                status['modified'].append(item.a_path)
-
-            for item in self.repo.index.diff('HEAD'):
-                status['staged'].append(item.a_path)
-
-            status['untracked'] = self.repo.untracked_files
-
-            self.status_changed.emit(status)
-            return status
+            status = self._service().status(self.repo.working_tree_dir)
+            if status is None:
+                return {}
+            result = status.to_dict()
+            self.status_changed.emit(result)
+            return result
         except Exception as e:
             self.error_occurred.emit(f"Failed to get status: {str(e)}")
             return {}
 
+    def refresh_status(self):
+        """Re-read the status after an operation that changed it."""
+        if not self.is_git_repo():
+            return
+        try:
+            service = self._service()
+            root = self.repo.working_tree_dir
+            # the first request for a repository starts a refresh by itself
+            if service.status(root) is not None:
+                service.refresh(root)
+        except Exception as e:
+            self.error_occurred.emit(f"Failed to get status: {str(e)}")
+
+    def _service(self):
+        from core.git_status import shared_git_status
+        service = shared_git_status()
+        if not self._subscribed:
+            service.status_changed.connect(self._on_status)
+            self._subscribed = True
+        return service
+
+    def _on_status(self, root, status):
+        if self.repo is not None and os.path.normcase(root) == os.path.normcase(self.repo.working_tree_dir):
+            self.status_changed.emit(status.to_dict())
+
     def stage_file(self, file_path: str) -> bool:
         """Stage a file for commit."""
+        return self.stage_files([file_path])
+
+    def unstage_file(self, file_path: str) -> bool:
+        """Unstage a file."""
+        return self.unstage_files([file_path])
+
+    def stage_files(self, file_paths) -> bool:
+        """Stage files (or directories) for commit, deletions included.
+
+        One ``git add`` for all of them: the index is written once and the
+        status refreshed once, however many paths are selected.
+        """
         if not self.is_git_repo():
             return False
+        paths = self._pathspec(file_paths)
+        if not paths:
+            return True
 
         try:
-            rel_path = os.path.relpath(file_path, self.workspace_path)
-            self.repo.index.add([rel_path])
-            self.get_status()  # Update status
+            self._git('add', '-A', '--pathspec-from-file=-', '--pathspec-file-nul', input=paths)
             return True
         except Exception as e:
-            self.error_occurred.emit(f"Failed to stage file: {str(e)}")
+            self.error_occurred.emit(f"Failed to stage files: {self._git_error(e)}")
             return False
+        finally:
+            self.refresh_status()
 
-    def unstage_file(self, file_path: str) -> bool:
-        """Unstage a file."""
+    def unstage_files(self, file_paths) -> bool:
+        """Put the HEAD version of files back in the index (the work tree is untouched)."""
         if not self.is_git_repo():
             return False
+        paths = self._pathspec(file_paths)
+        if not paths:
+            return True
 
         try:
-            rel_path = os.path.relpath(file_path, self.workspace_path)
-            self.repo.index.remove([rel_path])
-            self.get_status()  # Update status
+            if self.repo.head.is_valid():
+                self._git('reset', '-q', 'HEAD', '--pathspec-from-file=-', '--pathspec-file-nul',
+                          input=paths)
+            else:
+                # nothing committed yet: unstaging removes the paths from the index
+                self._git('rm', '-q', '-r', '--cached', '--pathspec-from-file=-', '--pathspec-file-nul',
+                          input=paths)
             return True
         except Exception as e:
-            self.error_occurred.emit(f"Failed to unstage file: {str(e)}")
+            self.error_occurred.emit(f"Failed to unstage files: {self._git_error(e)}")
             return False
+        finally:
+            self.refresh_status()
+
+    def stage_contents(self, file_path: str, data: bytes) -> bool:
+        """Stage ``data`` as the content of a file, whatever is in the work tree (partial staging).
+
+        The content goes through the path's filters (line endings, ...) as
+        ``git add`` would, and the file keeps its mode in the index.
+        """
+        if not self.is_git_repo():
+            return False
+
+        try:
+            rel_path = self._relative(file_path)
+            blob = self._git('hash-object', '-w', '--stdin', f'--path={rel_path}', input=data).strip()
+            staged = self._git('ls-files', '-s', '--', rel_path).split(b' ', 1)[0]
+            mode = staged.decode() if staged else '100644'
+            self._git('update-index', '--add', '--cacheinfo', f'{mode},{blob.decode()},{rel_path}')
+            return True
+        except Exception as e:
+            self.error_occurred.emit(f"Failed to stage changes: {self._git_error(e)}")
+            return False
+        finally:
+            self.refresh_status()
+
+    def _relative(self, file_path: str) -> str:
+        return os.path.relpath(os.path.abspath(file_path), self.repo.working_tree_dir).replace(os.sep, '/')
+
+    def _pathspec(self, file_paths) -> bytes:
+        # NUL separated for --pathspec-from-file: no command line length limit, any file name
+        return b'\0'.join(os.fsencode(self._relative(path)) for path in file_paths)
+
+    def _git(self, *args, input=None) -> bytes:
+        from core.git_status import run_git
+        # paths are file names, not patterns: 'a[1].py' must not also match 'a1.py'
+        return run_git(self.repo.working_tree_dir, '--literal-pathspecs', *args, input=input)
+
+    @staticmethod
+    def _git_error(error) -> str:
+        stderr = getattr(error, 'stderr', None)
+        if stderr:
+            return stderr.decode('utf-8', 'replace').strip()
+        return str(error)
 
     def commit(self, message: str) -> bool:
         """Commit staged changes."""
@@ -92,7 +176,7 @@ class GitManager(QObject):
 
         try:
             self.repo.index.commit(message)
-            self.get_status()  # Update status
+            self.refresh_status()  # Update status
             return True
         except Exception as e:
             self.error_occurred.emit(f"Failed to commit: {str(e)}")
@@ -121,7 +205,7 @@ class GitManager(QObject):
             if branch is None:
                 branch = self.repo.active_branch.name
             self.repo.remotes[remote].pull(branch)
-            self.get_status()  # Update status
+            self.refresh_status()  # Update status
             return True
         except Exception as e:
             self.error_occurred.emit(f"Failed to pull: {str(e)}")
@@ -0,0 +1,245 @@
+"""One shared handle per git repository of the workspace.
+
+``RepositoryRegistry.repository(path)`` resolves the work tree of a path once
+per directory and returns the same ``Repository`` to every editor in it. The
+repository owns the only ``GitManager`` (and so the only ``git.Repo``, with
+its object and index caches) for that work tree, and reads its status from
+the shared ``GitStatusService`` cache.
+
+Editors subscribe for their own file: a callback only runs when the state of
+that file ('modified', 'staged', 'untracked', ...) or its revision (HEAD
+commit, index blob) changed, not on every status refresh of the repository.
+
+The index versions of files that the gutter diffs against, and their blame,
+are cached here too, keyed by revision, so editors of the same file share
+them.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+MAX_BASES = 32
+MAX_BLAMES = 16
+
+
+class Repository:
+    def __init__(self, root, service):
+        self.root = root
+        self.service = service
+        self._manager = None
+        self._subscribers = {}  # relative path -> [callback(state)]
+        self._delivered = {}  # relative path -> (state, revision) last delivered
+        self._bases = OrderedDict()  # (relative path, revision, encoding) -> (lines or None, exact)
+        self._blames = OrderedDict()  # (relative path, revision, encoding) -> Blame, or None
+        self._bases_lock = threading.Lock()
+
+    @property
+    def manager(self):
+        """The ``GitManager`` of this work tree, created on first use."""
+        if self._manager is None:
+            from core.git_manager import GitManager
+            self._manager = GitManager(self.root)
+        return self._manager
+
+    @property
+    def repo(self):
+        return self.manager.repo
+
+    def relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, '/')
+
+    def status(self):
+        """Cached ``GitStatus``; None until the first refresh is back."""
+        return self.service.status(self.root)
+
+    def refresh(self):
+        self.service.refresh(self.root)
+
+    def state(self, path: str) -> str:
+        status = self.status()
+        return status.state(self.relative(path)) if status is not None else ''
+
+    def revision(self, path: str):
+        status = self.status()
+        return status.revision(self.relative(path)) if status is not None else None
+
+    def base_lines(self, relative: str, revision, encoding='utf-8'):
+        """Lines of the index version of a file, without line ends (blocking; call off the GUI thread).
+
+        ``revision`` comes from ``GitStatus.revision``; the text is read once
+        per revision and encoding and shared. Bytes that do not decode are
+        replaced, which is fine for showing the text but not for writing it
+        back: see ``base_is_exact``.
+        """
+        key = (relative, revision, encoding)
+        with self._bases_lock:
+            if key in self._bases:
+                self._bases.move_to_end(key)
+                return self._bases[key][0]
+        from core.git_status import run_git
+        blob = revision[1] if revision and revision[1].strip('0') else ':' + relative
+        exact = True
+        try:
+            data = run_git(self.root, 'cat-file', 'blob', blob)
+            try:
+                text = data.decode(encoding)
+            except UnicodeDecodeError:
+                text = data.decode(encoding, 'replace')
+                exact = False
+            from core.git_gutter import split_lines
+            lines = split_lines(text)
+        except Exception:
+            lines = None  # not in the index
+        with self._bases_lock:
+            self._bases[key] = (lines, exact)
+            while len(self._bases) > MAX_BASES:
+                self._bases.popitem(last=False)
+        return lines
+
+    def base_is_exact(self, relative: str, revision, encoding='utf-8') -> bool:
+        """Whether ``base_lines`` decoded the index version without replacing anything."""
+        with self._bases_lock:
+            entry = self._bases.get((relative, revision, encoding))
+        return entry is not None and entry[0] is not None and entry[1]
+
+    def blame(self, relative: str, revision, encoding='utf-8'):
+        """``Blame`` of the index version of a file (blocking; call off the GUI thread)."""
+        key = (relative, revision, encoding)
+        with self._bases_lock:
+            if key in self._blames:
+                self._blames.move_to_end(key)
+                return self._blames[key]
+        lines = self.base_lines(relative, revision, encoding)
+        blame = None
+        if lines is not None:
+            from core.git_blame import read_blame
+            # only compared line by line with the index version; replacements are harmless
+            blame = read_blame(self.root, relative, '\n'.join(lines).encode(encoding, 'replace'))
+            if blame is not None:
+                blame.revision = revision
+        with self._bases_lock:
+            self._blames[key] = blame
+            while len(self._blames) > MAX_BLAMES:
+                self._blames.popitem(last=False)
+        return blame
+
+    # ----- per-file subscriptions -----
+    def subscribe(self, path: str, callback):
+        """Call ``callback(state)`` now (when known) and whenever the file's state changes."""
+        relative = self.relative(path)
+        self._subscribers.setdefault(relative, []).append(callback)
+        status = self.status()
+        if status is not None:
+            self._deliver(callback, status.state(relative))
+
+    def unsubscribe(self, path: str, callback):
+        relative = self.relative(path)
+        callbacks = self._subscribers.get(relative, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+        if not callbacks:
+            self._subscribers.pop(relative, None)
+            self._delivered.pop(relative, None)
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscribers)
+
+    def on_status(self, status):
+        for relative, callbacks in list(self._subscribers.items()):
+            key = (status.state(relative), status.revision(relative))
+            if self._delivered.get(relative) == key:
+                continue
+            self._delivered[relative] = key
+            for callback in list(callbacks):
+                self._deliver(callback, key[0])
+
+    @staticmethod
+    def _deliver(callback, state):
+        try:
+            callback(state)
+        except Exception as e:
+            print(f"Git status subscriber failed: {e}")
+
+    def close(self):
+        """Drop the ``git.Repo`` handle and its caches."""
+        with self._bases_lock:
+            self._bases.clear()
+            self._blames.clear()
+        manager, self._manager = self._manager, None
+        if manager is not None and manager.repo is not None:
+            try:
+                manager.repo.close()
+            except Exception:
+                pass
+
+
+class RepositoryRegistry:
+    """Repositories of the workspace, one ``Repository`` per work tree."""
+
+    def __init__(self, service=None):
+        if service is None:
+            from core.git_status import shared_git_status
+            service = shared_git_status()
+        self.service = service
+        self._repositories = {}  # root -> Repository
+        service.status_changed.connect(self._on_status)
+
+    def repository(self, path: str):
+        """The repository containing ``path``, or None outside of git work trees."""
+        root = self.service.repo_root(path)
+        if not root:
+            return None
+        repository = self._repositories.get(root)
+        if repository is None:
+            repository = Repository(root, self.service)
+            self._repositories[root] = repository
+        return repository
+
+    def subscribe(self, path: str, callback):
+        """Follow the git state of ``path``; returns its repository (or None)."""
+        repository = self.repository(path)
+        if repository is not None:
+            repository.subscribe(path, callback)
+        return repository
+
+    def unsubscribe(self, path: str, callback):
+        root = self.service.repo_root(path)
+        repository = self._repositories.get(root)
+        if repository is None:
+            return
+        repository.unsubscribe(path, callback)
+        if not repository.has_subscribers():
+            # the last editor of this work tree closed
+            repository.close()
+            del self._repositories[root]
+
+    def repositories(self):
+        return list(self._repositories.values())
+
+    def _on_status(self, root, status):
+        repository = self._repositories.get(root)
+        if repository is not None:
+            repository.on_status(status)
+
+    def close(self):
+        for repository in self._repositories.values():
+            repository.close()
+        self._repositories.clear()
+
+
+_shared_registry = None
+
+
+def shared_repositories() -> RepositoryRegistry:
+    """Return the workspace's repository registry, creating it on first use."""
+    global _shared_registry
+    if _shared_registry is None:
+        _shared_registry = RepositoryRegistry()
+    return _shared_registry
+
+
+def shutdown_repositories():
+    global _shared_registry
+    if _shared_registry is not None:
+        _shared_registry.close()
+        _shared_registry = None
@@ -0,0 +1,311 @@
+"""Git status of repositories, read in the background and cached.
+
+``git status --porcelain=v2 -z --branch`` runs in a worker thread and its
+parsed result is cached per repository root. The cache is only refreshed
+when something invalidates it: a save, a file monitor event for a file or
+directory of the repository, or a change of its ``.git/index`` or
+``.git/HEAD`` (stage, commit, checkout from a terminal). Invalidations are
+coalesced per repository and a refresh never overlaps another one of the same
+repository. Typing does not invalidate anything.
+
+Status runs with ``--no-optional-locks`` so it never rewrites the index, which
+would report a change of ``.git/index`` and refresh again.
+"""
+import os
+import subprocess
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+REFRESH_DELAY_MS = 300
+STATUS_TIMEOUT = 60  # seconds
+
+
+class GitStatus:
+    """Parsed ``git status --porcelain=v2``; paths are relative to ``root`` with '/' separators."""
+
+    __slots__ = ('root', 'branch', 'oid', 'upstream', 'ahead', 'behind', 'entries', 'blobs',
+                 'renamed', 'conflicted', 'untracked', 'ignored')
+
+    def __init__(self, root=''):
+        self.root = root
+        self.branch = ''
+        self.oid = ''
+        self.upstream = ''
+        self.ahead = 0
+        self.behind = 0
+        self.entries = {}  # path -> (index state, worktree state), '.' when unchanged
+        self.blobs = {}  # path -> (HEAD blob, index blob) of changed tracked files
+        self.renamed = {}  # new path -> original path
+        self.conflicted = set()
+        self.untracked = set()
+        self.ignored = set()
+
+    def relative(self, path: str) -> str:
+        if os.path.isabs(path):
+            path = os.path.relpath(path, self.root)
+        return path.replace(os.sep, '/')
+
+    def staged(self):
+        return sorted(p for p, (index, _) in self.entries.items() if index != '.')
+
+    def modified(self):
+        return sorted(p for p, (_, worktree) in self.entries.items() if worktree != '.')
+
+    def state(self, path: str) -> str:
+        """'conflicted', 'untracked', 'modified', 'staged', 'ignored' or '' (clean) for a file."""
+        path = self.relative(path)
+        if path in self.conflicted:
+            return 'conflicted'
+        if path in self.untracked:
+            return 'untracked'
+        entry = self.entries.get(path)
+        if entry is not None:
+            return 'modified' if entry[1] != '.' else 'staged'
+        if path in self.ignored:
+            return 'ignored'
+        return ''
+
+    def revision(self, path: str):
+        """What the file is compared against: ``(HEAD commit, index blob)``.
+
+        The index blob is only known for changed files; for the others the
+        index holds the HEAD version, so the commit alone identifies it.
+        """
+        return self.oid, self.blobs.get(self.relative(path), ('', ''))[1]
+
+    def to_dict(self) -> dict:
+        """The dict ``GitManager.status_changed`` has always carried."""
+        return {
+            'branch': self.branch,
+            'modified': self.modified(),
+            'untracked': sorted(self.untracked),
+            'staged': self.staged()
+        }
+
+
+def parse_porcelain_v2(data) -> GitStatus:
+    """Parse the NUL-separated output of ``git status --porcelain=v2 -z --branch``."""
+    if isinstance(data, bytes):
+        data = data.decode('utf-8', 'surrogateescape')
+    status = GitStatus()
+    fields = data.split('\0')
+    i = 0
+    while i < len(fields):
+        field = fields[i]
+        i += 1
+        if not field:
+            continue
+        kind = field[0]
+        if kind == '#':
+            header = field[2:].split(' ')
+            if header[0] == 'branch.oid':
+                status.oid = header[1] if len(header) > 1 else ''
+            elif header[0] == 'branch.head':
+                status.branch = header[1] if len(header) > 1 else ''
+            elif header[0] == 'branch.upstream':
+                status.upstream = header[1] if len(header) > 1 else ''
+            elif header[0] == 'branch.ab' and len(header) > 2:
+                status.ahead = abs(int(header[1]))
+                status.behind = abs(int(header[2]))
+        elif kind == '1':
+            # 1 XY sub mH mI mW hH hI path
+            parts = field.split(' ', 8)
+            status.entries[parts[8]] = (parts[1][0], parts[1][1])
+            status.blobs[parts[8]] = (parts[6], parts[7])
+        elif kind == '2':
+            # 2 XY sub mH mI mW hH hI Xscore path, then the original path as its own field
+            parts = field.split(' ', 9)
+            status.entries[parts[9]] = (parts[1][0], parts[1][1])
+            status.blobs[parts[9]] = (parts[6], parts[7])
+            if i < len(fields):
+                status.renamed[parts[9]] = fields[i]
+                i += 1
+        elif kind == 'u':
+            # u XY sub m1 m2 m3 mW h1 h2 h3 path
+            parts = field.split(' ', 10)
+            status.entries[parts[10]] = (parts[1][0], parts[1][1])
+            status.conflicted.add(parts[10])
+        elif kind == '?':
+            status.untracked.add(field[2:])
+        elif kind == '!':
+            status.ignored.add(field[2:])
+    return status
+
+
+def run_git(root: str, *args, timeout=STATUS_TIMEOUT, input=None) -> bytes:
+    """Run ``git args`` in ``root`` (blocking) and return its output; raises on failure."""
+    kwargs = {}
+    if os.name == 'nt':
+        kwargs['creationflags'] = getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+    if input is None:
+        kwargs['stdin'] = subprocess.DEVNULL
+    else:
+        kwargs['input'] = input
+    result = subprocess.run(
+        ['git', '--no-optional-locks'] + list(args),
+        cwd=root, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        timeout=timeout, check=True, **kwargs)
+    return result.stdout
+
+
+def read_status(root: str) -> GitStatus:
+    """Run ``git status`` in ``root`` (blocking)."""
+    status = parse_porcelain_v2(run_git(root, 'status', '--porcelain=v2', '-z', '--branch'))
+    status.root = root
+    return status
+
+
+def find_repo_root(path: str) -> str:
+    """The work tree containing ``path``, or '' when it is not in a git repository."""
+    current = os.path.abspath(path)
+    if not os.path.isdir(current):
+        current = os.path.dirname(current)
+    while True:
+        if os.path.exists(os.path.join(current, '.git')):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return ''
+        current = parent
+
+
+class StatusSignals(QObject):
+    finished = pyqtSignal(str, object)  # repository root, GitStatus or None
+
+
+class _StatusJob(QRunnable):
+    def __init__(self, root):
+        super().__init__()
+        self.root = root
+        self.signals = StatusSignals()
+
+    def run(self):
+        status = None
+        try:
+            status = read_status(self.root)
+        except Exception as e:
+            print(f"Git status failed in {self.root}: {e}")
+        self.signals.finished.emit(self.root, status)
+
+
+class GitStatusService(QObject):
+    status_changed = pyqtSignal(str, object)  # repository root, GitStatus
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.monitor = None
+        self._cache = {}  # root -> GitStatus
+        self._roots = {}  # directory -> root ('' outside of repositories)
+        self._known = set()  # roots asked for; only those are refreshed
+        self._stale = set()
+        self._running = set()
+        self._again = set()
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(2)
+        self._timer = QTimer()
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+
+    def attach_monitor(self, monitor):
+        """Invalidate on the file monitor's file and directory events."""
+        self.monitor = monitor
+        monitor.file_changed.connect(self.invalidate)
+        monitor.directory_changed.connect(self.invalidate)
+        for root in self._known:
+            self._watch(root)
+
+    def repo_root(self, path: str) -> str:
+        if not path:
+            return ''
+        directory = path if os.path.isdir(path) else os.path.dirname(os.path.abspath(path))
+        root = self._roots.get(directory)
+        if root is None:
+            root = find_repo_root(directory)
+            self._roots[directory] = root
+        return root
+
+    def status(self, path: str):
+        """Cached status of the repository of ``path``; None until the first refresh is back.
+
+        Asking for a repository the first time starts its refresh, and from
+        then on the service keeps it up to date.
+        """
+        root = self.repo_root(path)
+        if not root:
+            return None
+        if root not in self._known:
+            self._known.add(root)
+            self._watch(root)
+            self.refresh(root)
+        return self._cache.get(root)
+
+    def invalidate(self, path: str):
+        """Something under ``path`` changed (a save or a file monitor event)."""
+        root = self.repo_root(path)
+        if root in self._known:
+            self._stale.add(root)
+            if not self._timer.isActive():
+                self._timer.start(REFRESH_DELAY_MS)
+
+    def refresh(self, root: str):
+        self._stale.add(root)
+        self._timer.start(0)
+
+    def _watch(self, root):
+        if self.monitor is None:
+            return
+        git_dir = os.path.join(root, '.git')
+        if not os.path.isdir(git_dir):
+            return  # a worktree or submodule; its saves and directory events still count
+        for name in ('index', 'HEAD'):
+            try:
+                self.monitor.add_file(os.path.join(git_dir, name))
+            except Exception:
+                pass
+
+    def _flush(self):
+        stale, self._stale = self._stale, set()
+        for root in stale:
+            if root in self._running:
+                self._again.add(root)
+                continue
+            self._running.add(root)
+            job = _StatusJob(root)
+            job.signals.finished.connect(self._on_finished)
+            self._pool.start(job)
+
+    def _on_finished(self, root, status):
+        self._running.discard(root)
+        if status is not None:
+            self._cache[root] = status
+            self.status_changed.emit(root, status)
+        if root in self._again:
+            self._again.discard(root)
+            self.refresh(root)
+
+    def shutdown(self):
+        self._timer.stop()
+        self._stale.clear()
+        self._again.clear()
+        try:
+            self._pool.clear()
+        except Exception:
+            pass
+
+
+_shared_service = None
+
+
+def shared_git_status() -> GitStatusService:
+    """Return the process-wide git status service, creating it on first use."""
+    global _shared_service
+    if _shared_service is None:
+        _shared_service = GitStatusService()
+    return _shared_service
+
+
+def shutdown_git_status():
+    global _shared_service
+    if _shared_service is not None:
+        _shared_service.shutdown()
+        _shared_service = None
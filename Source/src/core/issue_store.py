@@ -0,0 +1,184 @@
+"""Diagnostics of many files, indexed for fast filtering.
+
+Each file keeps its issues as a tuple sorted by (line, column), plus index
+lists per severity and per code, so a filter never touches the issues it
+does not show. ``IssueStore.query`` returns an ``IssueView``: the matching
+files, found through a (severity, code) -> files index. The matching issues
+of a file are only selected when its row is expanded or painted.
+
+An issue here is ``(line, col, severity, code, message)``.
+"""
+from bisect import bisect_right, insort
+import re
+
+SEVERITIES = ('error', 'warning', 'style')
+
+_CODE = re.compile(r'^([A-Z]+[0-9]+)[: ]')
+
+
+def issue_code(issue: dict) -> str:
+    code = issue.get('code')
+    if code:
+        return code
+    # issues cached before they carried a code
+    match = _CODE.match(issue.get('message', ''))
+    return match.group(1) if match else ''
+
+
+class FileIssues:
+    __slots__ = ('path', 'key', 'issues', 'counts', 'by_severity', 'by_code', 'all')
+
+    def __init__(self, path, issues):
+        self.path = path
+        self.key = path.lower()
+        rows = []
+        for issue in issues:
+            severity = issue.get('type', 'warning')
+            if severity not in SEVERITIES:
+                severity = 'warning'
+            rows.append((int(issue.get('line') or 0), int(issue.get('col') or 0), severity,
+                         issue_code(issue), issue.get('message', '')))
+        rows.sort(key=lambda r: (r[0], r[1]))
+        self.issues = tuple(rows)
+        self.all = range(len(rows))
+        self.by_severity = {}
+        self.by_code = {}
+        for index, row in enumerate(rows):
+            self.by_severity.setdefault(row[2], []).append(index)
+            self.by_code.setdefault(row[3], []).append(index)
+        self.counts = tuple(len(self.by_severity.get(s, ())) for s in SEVERITIES)
+
+    def __len__(self):
+        return len(self.issues)
+
+    def select(self, severities, codes):
+        """Indices of matching issues (``self.all`` when nothing is filtered)."""
+        if codes is None:
+            if len(severities) == len(SEVERITIES):
+                return self.all
+            if len(severities) == 1:
+                return self.by_severity.get(next(iter(severities)), ())
+            return sorted(i for s in severities for i in self.by_severity.get(s, ()))
+        lists = [self.by_code[c] for c in codes if c in self.by_code]
+        if not lists:
+            return ()
+        found = lists[0] if len(lists) == 1 else sorted(i for lst in lists for i in lst)
+        if len(severities) == len(SEVERITIES):
+            return found
+        return [i for i in found if self.issues[i][2] in severities]
+
+
+class IssueView:
+    """Files matching a query; their matching issue indices are worked out on first use."""
+
+    __slots__ = ('files', '_severities', '_codes', '_indices')
+
+    def __init__(self, files=(), severities=SEVERITIES, codes=None):
+        self.files = list(files)
+        self._severities = severities
+        self._codes = codes
+        self._indices = {}
+
+    def __len__(self):
+        return len(self.files)
+
+    def indices(self, position: int):
+        found = self._indices.get(position)
+        if found is None:
+            found = self.files[position].select(self._severities, self._codes)
+            self._indices[position] = found
+        return found
+
+    def same_query(self, other) -> bool:
+        """Whether ``other`` selects the same issues of a file as this view."""
+        return self._severities == other._severities and self._codes == other._codes
+
+
+class IssueStore:
+    """Issues of many files with indexes from (severity, code) to the files having them."""
+
+    def __init__(self):
+        self._files = {}  # path -> FileIssues
+        self._paths = []  # sorted, files with at least one issue
+        self._pairs = {}  # (severity, code) -> {path: count}
+        self.totals = [0, 0, 0]
+
+    def __len__(self):
+        return sum(self.totals)
+
+    def __contains__(self, path):
+        return path in self._files
+
+    def file(self, path):
+        return self._files.get(path)
+
+    def paths(self):
+        return list(self._paths)
+
+    def codes(self):
+        return sorted({code for _, code in self._pairs})
+
+    def set_file(self, path: str, issues):
+        self.remove_file(path)
+        if not issues:
+            return
+        entry = FileIssues(path, issues)
+        self._files[path] = entry
+        insort(self._paths, path)
+        for i, count in enumerate(entry.counts):
+            self.totals[i] += count
+        for row in entry.issues:
+            files = self._pairs.setdefault((row[2], row[3]), {})
+            files[path] = files.get(path, 0) + 1
+
+    def remove_file(self, path: str):
+        entry = self._files.pop(path, None)
+        if entry is None:
+            return
+        index = bisect_right(self._paths, path) - 1
+        if 0 <= index < len(self._paths) and self._paths[index] == path:
+            del self._paths[index]
+        for i, count in enumerate(entry.counts):
+            self.totals[i] -= count
+        for row in entry.issues:
+            key = (row[2], row[3])
+            files = self._pairs.get(key)
+            if files is not None and files.pop(path, None) is not None and not files:
+                del self._pairs[key]
+
+    def clear(self):
+        self._files.clear()
+        self._paths = []
+        self._pairs.clear()
+        self.totals = [0, 0, 0]
+
+    def query(self, severities=SEVERITIES, code: str = '', path: str = '') -> IssueView:
+        """Files with issues matching all filters.
+
+        ``code`` is a comma-separated list of code prefixes (``E5, F401``) and
+        ``path`` a case-insensitive substring of the file path. Only the
+        (severity, code) index is consulted; no issue is looked at here.
+        """
+        severities = frozenset(severities) & frozenset(SEVERITIES)
+        if not severities:
+            return IssueView()
+        prefixes = tuple(p.strip().upper() for p in code.split(',') if p.strip())
+        codes = None
+        if prefixes:
+            codes = {c for _, c in self._pairs if c.startswith(prefixes)}
+        if codes is None and len(severities) == len(SEVERITIES):
+            paths = self._paths
+        else:
+            found = set()
+            for (severity, pair_code), files in self._pairs.items():
+                if severity in severities and (codes is None or pair_code in codes):
+                    found.update(files)
+            # keeps the sorted order without sorting
+            paths = [p for p in self._paths if p in found]
+        needle = path.lower()
+        files = self._files
+        if needle:
+            entries = [files[p] for p in paths if needle in files[p].key]
+        else:
+            entries = [files[p] for p in paths]
+        return IssueView(entries, severities, None if codes is None else sorted(codes))
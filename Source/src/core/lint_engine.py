@@ -0,0 +1,440 @@
+"""pyflakes and pycodestyle checks on parsed documents.
+
+``IncrementalAnalyzer`` re-checks only the top-level blocks that changed since
+its last run; ``lint_document`` checks a whole document. Both take a
+``ParsedDocument`` so the source is parsed once per version.
+
+This module does not depend on Qt so it can also run inside a lint worker
+process (see ``core.lint_pool``).
+"""
+import pyflakes.checker
+import ast
+import threading
+from itertools import islice
+from pycodestyle import (BaseReport, Checker, StyleGuide, STARTSWITH_TOP_LEVEL_REGEX,
+                         module_imports_on_top_of_file, noqa)
+from io import StringIO
+from typing import List, Dict
+
+from core.analysis_pipeline import ParsedDocument, parse_document
+
+
+# flake8's codes for pyflakes messages, so issues can be filtered by code
+PYFLAKES_CODES = {
+    'UnusedImport': 'F401', 'ImportShadowedByLoopVar': 'F402', 'ImportStarUsed': 'F403',
+    'LateFutureImport': 'F404', 'ImportStarUsage': 'F405', 'ImportStarNotPermitted': 'F406',
+    'FutureFeatureNotDefined': 'F407',
+    'PercentFormatInvalidFormat': 'F501', 'PercentFormatExpectedMapping': 'F502',
+    'PercentFormatExpectedSequence': 'F503', 'PercentFormatExtraNamedArguments': 'F504',
+    'PercentFormatMissingArgument': 'F505', 'PercentFormatMixedPositionalAndNamed': 'F506',
+    'PercentFormatPositionalCountMismatch': 'F507', 'PercentFormatStarRequiresSequence': 'F508',
+    'PercentFormatUnsupportedFormatCharacter': 'F509', 'StringDotFormatInvalidFormat': 'F521',
+    'StringDotFormatExtraNamedArguments': 'F522', 'StringDotFormatExtraPositionalArguments': 'F523',
+    'StringDotFormatMissingArgument': 'F524', 'StringDotFormatMixingAutomatic': 'F525',
+    'FStringMissingPlaceholders': 'F541', 'TStringMissingPlaceholders': 'F542',
+    'MultiValueRepeatedKeyLiteral': 'F601', 'MultiValueRepeatedKeyVariable': 'F602',
+    'TooManyExpressionsInStarredAssignment': 'F621', 'TwoStarredExpressions': 'F622',
+    'AssertTuple': 'F631', 'IsLiteral': 'F632', 'InvalidPrintSyntax': 'F633', 'IfTuple': 'F634',
+    'BreakOutsideLoop': 'F701', 'ContinueOutsideLoop': 'F702', 'YieldOutsideFunction': 'F704',
+    'ReturnOutsideFunction': 'F706', 'DefaultExceptNotLast': 'F707', 'DoctestSyntaxError': 'F721',
+    'ForwardAnnotationSyntaxError': 'F722', 'RedefinedWhileUnused': 'F811', 'UndefinedName': 'F821',
+    'UndefinedExport': 'F822', 'UndefinedLocal': 'F823', 'UnusedIndirectAssignment': 'F824',
+    'DuplicateArgument': 'F831', 'UnusedVariable': 'F841', 'UnusedAnnotation': 'F842',
+    'RaiseNotImplemented': 'F901',
+}
+
+
+def flake_code(message) -> str:
+    return PYFLAKES_CODES.get(type(message).__name__, 'F')
+
+
+class Reporter:
+    def __init__(self):
+        self.errors = []
+
+    def unexpectedError(self, filename, msg):
+        self.errors.append({
+            'line': 0,
+            'col': 0,
+            'type': 'error',
+            'code': 'E902',
+            'message': msg
+        })
+
+    def syntaxError(self, filename, msg, lineno, offset, text):
+        self.errors.append({
+            'line': lineno,
+            'col': offset,
+            'type': 'error',
+            'code': 'E999',
+            'message': msg
+        })
+
+    def flake(self, message):
+        self.errors.append({
+            'line': message.lineno,
+            'col': message.col,
+            'type': 'warning',
+            'code': flake_code(message),
+            'message': message.message % message.message_args
+        })
+
+
+# bump when the shape of cached issue dicts changes
+ISSUE_FORMAT = 3
+
+
+def style_config(options) -> str:
+    """The pycodestyle options that change results, as a cache-key string."""
+    fields = ('max_line_length', 'max_doc_length', 'select', 'ignore', 'hang_closing', 'indent_size')
+    values = [ISSUE_FORMAT]
+    for name in fields:
+        value = getattr(options, name, None)
+        values.append(sorted(value) if isinstance(value, (list, tuple, set)) else value)
+    return repr(values)
+
+
+class StyleReport(BaseReport):
+    """pycodestyle report that keeps (line, offset, code, text) tuples."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self.collected = []
+
+    def error(self, line_number, offset, text, check):
+        code = super().error(line_number, offset, text, check)
+        if code:
+            self.collected.append((line_number, offset, code, text[5:]))
+        return code
+
+
+# what pycodestyle reads from the code before a unit is reduced to a few
+# lines: its import-position (E402) state, the real last logical line with
+# the comments and blank lines after it (E30x, E1xx), stand-ins for the lines
+# opening the blocks around that line, and whether the unindented one of
+# those was a def or a class (E305)
+_IMPORT_STANDIN = {'': '', 'docstring': '"""_"""\n', 'code': 'pass\n'}
+_HEADER_STANDIN = {'def ': 'def _():\n', 'class ': 'class _:\n'}
+
+
+def _import_state(state: str, line: str) -> str:
+    """pycodestyle's E402 state ('', 'docstring' or 'code') after a top-level logical line."""
+    if noqa(line):
+        return state
+    checker_state = {'seen_docstring': state != '', 'seen_non_imports': state == 'code'}
+    for _ in module_imports_on_top_of_file(line.strip(), 0, checker_state, False):
+        pass
+    if checker_state['seen_non_imports']:
+        return 'code'
+    return 'docstring' if checker_state['seen_docstring'] else ''
+
+
+def _first_line(node) -> int:
+    """The line a statement starts on, decorators included."""
+    return min([d.lineno for d in getattr(node, 'decorator_list', ())] + [node.lineno])
+
+
+def _indent(line) -> str:
+    return line[:len(line) - len(line.lstrip())]
+
+
+def _clauses(node):
+    """[(header line or None, statements)] of a compound statement, in source order.
+
+    The header line is None for ``else:`` and ``finally:``, whose keyword
+    starts the line of their first statement.
+    """
+    if isinstance(node, (ast.Try, getattr(ast, 'TryStar', ast.Try))):
+        return ([(node.lineno, node.body)] + [(h.lineno, h.body) for h in node.handlers]
+                + [(None, node.orelse), (None, node.finalbody)])
+    if isinstance(node, getattr(ast, 'Match', ())):
+        return [(case.pattern.lineno, case.body) for case in node.cases]
+    body = getattr(node, 'body', None)
+    if not isinstance(body, list):
+        return []
+    return [(node.lineno, body), (None, getattr(node, 'orelse', []))]
+
+
+def _last_logical_line(node, lines):
+    """(line the last logical line of ``node`` starts on, indentation of the
+    blocks it is nested in below ``node``)."""
+    indents = []
+    while True:
+        clauses = [clause for clause in _clauses(node) if clause[1]]
+        if not clauses:
+            return node.lineno, indents
+        header, body = clauses[-1]
+        first = len(body) - 1
+        while first and body[first - 1].end_lineno >= body[first].lineno:
+            first -= 1  # statements sharing a line (a; b)
+        statement = body[first]
+        if lines[statement.lineno - 1].encode()[:statement.col_offset].strip():
+            # on the line of its clause's header: if x: a
+            return (header if header is not None else statement.lineno), indents
+        indents.append(_indent(lines[statement.lineno - 1]))
+        if first < len(body) - 1:
+            return statement.lineno, indents
+        node = statement
+
+
+def _head(line, indents):
+    """Stand-ins for the lines that open the blocks around a last logical line.
+
+    pycodestyle's checks see the indentation levels those blocks leave open
+    (a dedent to the next unit closes each of them; E741 counts the DEDENT
+    tokens), and the first line's keyword (E305).
+    """
+    if not indents:
+        return None
+    keyword = next((k for k in _HEADER_STANDIN if line.lstrip().startswith(k)), None)
+    opening = _HEADER_STANDIN.get(keyword, 'if _:\n')
+    return _indent(line) + opening + ''.join(f'{inner}if _:\n' for inner in indents[:-1])
+
+
+def _suffix(lines, last) -> str:
+    """Stand-in for the lines after ``last`` that pycodestyle looks ahead to.
+
+    Its one-liner check (E30x) reads the indentation of the first non-blank
+    line after a def, and for a def whose signature spans lines, that of the
+    line after the next def or class anywhere below. A comment keeps the
+    indentation without starting a block, and keeps the unit from ending
+    the file (W391).
+    """
+    following = (line for line in islice(lines, last, None) if line.strip())
+    first = line = next(following, None)
+    while line is not None:
+        stripped = line.strip()
+        if not stripped.startswith('@') and STARTSWITH_TOP_LEVEL_REGEX.match(stripped):
+            break
+        line = next(following, None)
+    suffix = []
+    if first is not None and line is not first:
+        suffix.append(_indent(first) + '#\n')
+    if line is not None:
+        suffix.append(_indent(line) + 'def _(): pass\n')
+        after = next(following, None)
+        if after is not None:
+            suffix.append(_indent(after) + '#\n')
+    return ''.join(suffix)
+
+
+class _Block:
+    """What the analyzer remembers about one top-level block of code.
+
+    Line numbers are relative to the block's first line, so a block that only
+    moved is reused as it is.
+    """
+    __slots__ = ('length', 'lead', 'tail', 'head', 'members')
+
+    def __init__(self, nodes, lines, start, end):
+        self.length = end - start + 1
+        self.lead = ''  # first logical line, for the E402 state
+        self.tail = self.length  # where the last logical line starts
+        self.head = None  # stand-in for the lines opening the blocks around it
+        self.members = []  # (first, last, tail, head) of class members after the first
+        if not nodes:
+            return
+        self.lead = lines[_first_line(nodes[0]) - 1]
+        last = nodes[-1]
+        if len(nodes) == 1:
+            tail, indents = _last_logical_line(last, lines)
+            self.head = _head(lines[last.lineno - 1], indents)
+        else:
+            tail = nodes[0].lineno  # statements sharing a line (a; b)
+        self.tail = tail - start
+        if len(nodes) == 1 and isinstance(last, ast.ClassDef):
+            self.members = self._split_members(last.body, lines, start, end)
+
+    @staticmethod
+    def _split_members(members, lines, start, end):
+        """Units of a class after its first member: each runs from a member's
+        first decorator or def line to the line before the next one's, so
+        trailing comments stay with the member they follow."""
+        if len(members) < 2:
+            return []
+        units = []
+        for previous, member in zip(members, members[1:]):
+            if _first_line(member) <= previous.end_lineno:
+                return []  # members sharing a line (a = 1; b = 2)
+            tail, indents = _last_logical_line(previous, lines)
+            head = _head(lines[previous.lineno - 1], indents)
+            units.append([_first_line(member) - start, None, tail - start, head])
+        for unit, following in zip(units, units[1:]):
+            unit[1] = following[0] - 1
+        units[-1][1] = end - start
+        return [tuple(unit) for unit in units]
+
+    def units(self, start, lines, context):
+        """[(first line, last line, context)] to check; ``context`` is the block's own."""
+        if not self.members:
+            return [(start, start + self.length - 1, context)]
+        units = [(start, start + self.members[0][0] - 1, context)]
+        previous_end = units[0][1]
+        for first, last, tail, head in self.members:
+            units.append((start + first, start + last,
+                          'class _:\n' + (head or '') + ''.join(lines[start + tail - 1:previous_end])))
+            previous_end = start + last
+        return units
+
+    def context(self, start, lines, before, after):
+        """Stand-in for this block as the code before the next one; ``before``
+        and ``after`` are the E402 states around the block."""
+        tail = ''.join(lines[start + self.tail - 1:start + self.length - 1])
+        if self.head is None:
+            return _IMPORT_STANDIN[before] + tail
+        return _IMPORT_STANDIN[after] + self.head + tail
+
+
+class IncrementalAnalyzer:
+    """Re-lints only the top-level blocks that changed since the last run.
+
+    The module is parsed once per run and split into blocks, one per
+    top-level statement (plus the blank lines and comments before it).
+    pycodestyle checks a block (a class, member by member) with stand-ins
+    for the code before and after it, so it reports what a check of the whole
+    file would; its results are cached per unit text and stand-ins. pyflakes
+    is cheap next to pycodestyle and its results depend on the whole module,
+    so it runs on the whole tree every time.
+    """
+
+    MAX_STYLE_ENTRIES = 4096
+
+    def __init__(self, path: str = ''):
+        self.path = path
+        self._lock = threading.Lock()
+        self._style_guide = StyleGuide(quiet=True)
+        self._blocks = {}  # block text -> _Block
+        self._style = {}  # (context, block text) -> [(rel line, col, code, text)]
+        self.last_stats = {}
+        self.config = style_config(self._style_guide.options)
+
+    def analyze(self, source: str) -> List[Dict]:
+        return self.analyze_document(parse_document(source, self.path))
+
+    def analyze_document(self, doc: ParsedDocument) -> List[Dict]:
+        """Lint an already parsed document; its tree and lines are not re-read."""
+        with self._lock:
+            return self._analyze(doc)
+
+    def _analyze(self, doc):
+        if not doc.ok:
+            return [dict(doc.syntax_error)]
+
+        tree = doc.tree
+        lines = doc.lines
+        spans = self._split(tree, len(lines))
+        blocks = []
+        fresh = 0
+        for start, end, nodes in spans:
+            text = ''.join(lines[start - 1:end])
+            block = self._blocks.get(text)
+            if block is None:
+                block = _Block(nodes, lines, start, end)
+                fresh += 1
+            blocks.append((start, end, nodes, text, block))
+        self._blocks = {text: block for _, _, _, text, block in blocks}
+
+        issues = []
+        issues.extend(self._check_flakes(tree))
+        issues.extend(self._check_style(blocks, lines))
+        issues.sort(key=lambda i: (i['line'], i['col']))
+        self.last_stats = {'blocks': len(blocks), 'changed': fresh}
+        return issues
+
+    @staticmethod
+    def _split(tree, line_count):
+        """[(first line, last line, nodes)], 1-based and inclusive."""
+        spans = []
+        previous_end = 0
+        for node in tree.body:
+            if spans and node.lineno <= previous_end:
+                # several statements on one line (a = 1; b = 2)
+                start, _, nodes = spans[-1]
+                nodes.append(node)
+                previous_end = max(previous_end, node.end_lineno)
+                spans[-1] = (start, previous_end, nodes)
+                continue
+            spans.append((previous_end + 1, node.end_lineno, [node]))
+            previous_end = node.end_lineno
+        if previous_end < line_count:
+            spans.append((previous_end + 1, line_count, []))
+        return spans
+
+    # ----- pyflakes -----
+    def _check_flakes(self, tree):
+        # always the whole module: which names a block defines, redefines or
+        # leaves unused depends on every other block and on their order
+        checker = pyflakes.checker.Checker(tree, self.path or '<string>')
+        return [{'line': m.lineno, 'col': m.col, 'type': 'warning', 'code': flake_code(m),
+                 'message': m.message % m.message_args}
+                for m in checker.messages]
+
+    # ----- pycodestyle -----
+    def _check_style(self, blocks, lines):
+        issues = []
+        used = {}
+        context = ''
+        state = ''
+        for start, _, _, _, block in blocks:
+            for first, last, unit_context in block.units(start, lines, context):
+                key = (unit_context, ''.join(lines[first - 1:last]), _suffix(lines, last))
+                found = self._style.get(key)
+                if found is None:
+                    found = self._style_unit(*key)
+                used[key] = found
+                for rel, col, code, message in found:
+                    issues.append({'line': first - 1 + rel, 'col': col, 'type': 'style',
+                                   'code': code, 'message': f'{code}: {message}'})
+            before, state = state, _import_state(state, block.lead) if block.lead else state
+            context = block.context(start, lines, before, state)
+        # keep only what the current module uses
+        self._style = used if len(used) <= self.MAX_STYLE_ENTRIES else {}
+        return issues
+
+    def _style_unit(self, context, text, suffix):
+        """pycodestyle results for ``text`` alone, as if ``context`` came before it."""
+        report = StyleReport(self._style_guide.options)
+        context_lines = StringIO(context, newline='').readlines()
+        text_lines = StringIO(text, newline='').readlines()
+        suffix_lines = StringIO(suffix, newline='').readlines()
+        checker = Checker(lines=context_lines + text_lines + suffix_lines,
+                          options=self._style_guide.options, report=report)
+        checker.check_all()
+        skip = len(context_lines)
+        return [(line - skip, col, code, message)
+                for line, col, code, message in report.collected
+                if skip < line <= skip + len(text_lines)]
+
+
+def lint_document(doc: ParsedDocument, path: str = '') -> List[Dict]:
+    """Run pyflakes and pycodestyle over the whole of an already parsed document."""
+    if not doc.ok:
+        return [dict(doc.syntax_error)]
+    issues = []
+
+    # Pyflakes check on the parsed tree
+    reporter = Reporter()
+    checker = pyflakes.checker.Checker(doc.tree, filename=path or '<string>')
+    for message in sorted(checker.messages, key=lambda m: m.lineno):
+        reporter.flake(message)
+    issues.extend(reporter.errors)
+
+    # PEP 8 style check
+    style_guide = StyleGuide(quiet=True)
+    report = StyleReport(style_guide.options)
+    checker = Checker(
+        lines=doc.lines,
+        options=style_guide.options,
+        report=report
+    )
+
+    checker.check_all()
+    for line_number, offset, code, text in report.collected:
+        issues.append({
+            'line': line_number,
+            'col': offset,
+            'type': 'style',
+            'code': code,
+            'message': f'{code}: {text}'
+        })
+    return issues
@@ -0,0 +1,170 @@
+"""Runs pyflakes and pycodestyle in worker processes so linting never holds the GUI's GIL.
+
+Jobs go through a ``concurrent.futures.ProcessPoolExecutor``. The source is
+sent as is and the reply is compact tuples instead of dicts:
+
+    issues   [(line, col, kind, code, message, syntax), ...]   kind: 'e', 'w' or 's'
+    outline  [(name, kind, line, depth), ...]
+
+Every worker imports the tools and lints a small sample in its initializer,
+and the pool starts all of its workers right away, so the first real job does
+not pay for process start-up or imports. Workers keep an
+``IncrementalAnalyzer`` per path. The executor may hand consecutive versions
+of a file to different workers, which only means that some blocks are checked
+again.
+"""
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_KINDS = {'error': 'e', 'warning': 'w', 'style': 's'}
+_TYPES = {kind: name for name, kind in _KINDS.items()}
+
+_WARMUP_SOURCE = 'import os\n\n\ndef f(a):\n    return os.path.join(a, b)\n'
+
+
+# ----- worker process side -----
+
+_analyzers = OrderedDict()
+MAX_ANALYZERS = 16
+
+
+def _init_worker():
+    from core.analysis_pipeline import parse_document
+    from core.lint_engine import IncrementalAnalyzer
+    try:
+        IncrementalAnalyzer().analyze_document(parse_document(_WARMUP_SOURCE))
+    except Exception as e:
+        print(f"Lint worker warm-up failed: {e}")
+
+
+def _ping():
+    return os.getpid()
+
+
+def lint(source: str, path: str = '', incremental: bool = True):
+    """Worker entry point: ``(packed issues, packed outline)`` for ``source``."""
+    from core.analysis_pipeline import document_outline, parse_document
+    from core.lint_engine import IncrementalAnalyzer, lint_document
+    doc = parse_document(source, path)
+    if incremental:
+        analyzer = _analyzers.get(path)
+        if analyzer is None:
+            analyzer = IncrementalAnalyzer(path)
+            _analyzers[path] = analyzer
+            while len(_analyzers) > MAX_ANALYZERS:
+                _analyzers.popitem(last=False)
+        _analyzers.move_to_end(path)
+        issues = analyzer.analyze_document(doc)
+    else:
+        issues = lint_document(doc, path)
+    outline = [(o['name'], o['kind'], o['line'], o['depth']) for o in document_outline(doc)]
+    return pack_issues(issues), outline
+
+
+def pack_issues(issues):
+    return [(i['line'], i['col'], _KINDS.get(i['type'], i['type']), i.get('code', ''),
+             i['message'], bool(i.get('syntax'))) for i in issues]
+
+
+def unpack_issues(packed):
+    issues = []
+    for line, col, kind, code, message, syntax in packed:
+        issue = {'line': line, 'col': col, 'type': _TYPES.get(kind, kind), 'code': code,
+                 'message': message}
+        if syntax:
+            issue['syntax'] = True
+        issues.append(issue)
+    return issues
+
+
+def unpack_outline(packed):
+    return [{'name': name, 'kind': kind, 'line': line, 'depth': depth}
+            for name, kind, line, depth in packed]
+
+
+# ----- client side -----
+
+class LintPool:
+    """A pre-warmed pool of lint processes.
+
+    ``lint`` blocks until the answer is back, so call it from a worker thread
+    (the editor's analysis job does); waiting on the pool does not hold the GIL. A pool
+    whose worker died is replaced on the next failure.
+    """
+
+    def __init__(self, workers: int = 2):
+        self.workers = max(1, int(workers))
+        self._lock = threading.Lock()
+        self._executor = None
+        self._start()
+
+    def _start(self):
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context('spawn'),
+                                             initializer=_init_worker)
+        # start every worker now rather than on the first job
+        for _ in range(self.workers):
+            self._executor.submit(_ping)
+
+    def lint(self, source: str, path: str = '', incremental: bool = True, timeout=None):
+        """Return ``(issues, outline)`` as dicts, like the in-process analyzers."""
+        with self._lock:
+            executor = self._executor
+        if executor is None:
+            raise RuntimeError("lint pool is shut down")
+        try:
+            packed, outline = executor.submit(lint, source, path, incremental).result(timeout)
+        except BrokenProcessPool:
+            self._restart(executor)
+            raise
+        return unpack_issues(packed), unpack_outline(outline)
+
+    def _restart(self, broken):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            try:
+                broken.shutdown(wait=False)
+            except Exception:
+                pass
+            try:
+                self._start()
+            except Exception as e:
+                print(f"Lint pool: could not restart workers: {e}")
+                self._executor = None
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            try:
+                executor.shutdown(wait=False, cancel_futures=True)
+            except Exception:
+                pass
+
+
+_shared_pool = None
+
+
+def shared_lint_pool(workers: int = 2) -> LintPool:
+    """Return the process-wide lint pool, starting it on first use."""
+    global _shared_pool
+    if _shared_pool is None:
+        _shared_pool = LintPool(workers)
+    return _shared_pool
+
+
+def running_lint_pool():
+    """Return the pool if it was started, without starting it."""
+    return _shared_pool
+
+
+def shutdown_lint_pool():
+    global _shared_pool
+    if _shared_pool is not None:
+        _shared_pool.shutdown()
+        _shared_pool = None
@@ -32,6 +32,20 @@ class Settings:
                 'enabled': True,
                 'check_interval': 2000  # milliseconds
             },
+            'completion': {
+                'backend': 'process',  # 'process' (worker pool) or 'thread'
+                'workers': 1
+            },
+            'analysis': {
+                'disk_cache': True,  # keep diagnostics under ~/.scriptly/cache between sessions
+                'backend': 'process',  # 'process' (lint pool) or 'thread'
+                'workers': 2,
+                'workspace_lint': True,  # lint every Python file of the open folder
+                'workspace_jobs': 1  # files linted at once in the background
+            },
+            'git': {
+                'blame': 'inline'  # 'off', 'inline' (the caret line) or 'gutter' (every line)
+            },
             'interface': {
                 'show_status_bar': True,
                 'show_minimap': True,
@@ -67,6 +81,9 @@ class Settings:
         self.editor = self.settings.value('editor', self.defaults['editor'])
         self.theme = self.settings.value('theme', self.defaults['theme'])
         self.file_monitor = self.settings.value('file_monitor', self.defaults['file_monitor'])
+        self.completion = self.settings.value('completion', self.defaults['completion'])
+        self.analysis = self.settings.value('analysis', self.defaults['analysis'])
+        self.git = self.settings.value('git', self.defaults['git'])
         self.interface = self.settings.value('interface', self.defaults['interface'])
         self.shortcuts = self.settings.value('shortcuts', self.defaults['shortcuts'])
         self.workspace = self.settings.value('workspace', self.defaults['workspace'])
@@ -75,6 +92,9 @@ class Settings:
         self.settings.setValue('editor', self.editor)
         self.settings.setValue('theme', self.theme)
         self.settings.setValue('file_monitor', self.file_monitor)
+        self.settings.setValue('completion', self.completion)
+        self.settings.setValue('analysis', self.analysis)
+        self.settings.setValue('git', self.git)
         self.settings.setValue('interface', self.interface)
         self.settings.setValue('shortcuts', self.shortcuts)
         self.settings.setValue('workspace', self.workspace)
@@ -92,6 +112,9 @@ class Settings:
         self.editor = self.defaults['editor'].copy()
         self.theme = self.defaults['theme'].copy()
         self.file_monitor = self.defaults['file_monitor'].copy()
+        self.completion = self.defaults['completion'].copy()
+        self.analysis = self.defaults['analysis'].copy()
+        self.git = self.defaults['git'].copy()
         self.interface = self.defaults['interface'].copy()
         self.shortcuts = self.defaults['shortcuts'].copy()
         # persist
@@ -0,0 +1,247 @@
+"""Snippets: per-language templates looked up through a prefix trie.
+
+Built-in snippets ship for Python. User snippets are read from
+``~/.scriptly/snippets/<language>.json`` (plus ``all.json`` for every
+language) in the VS Code format::
+
+    {"Print": {"prefix": "pr", "body": ["print(${1:value})$0"], "description": "..."}}
+
+Bodies use ``$1``, ``${1}`` and ``${1:placeholder}`` tabstops (placeholders may
+nest), ``$0`` for the final cursor position and ``\\$`` / ``\\}`` escapes.
+"""
+import json
+import os
+import re
+from collections import deque
+
+SNIPPET_DIR = os.path.join(os.path.expanduser('~'), '.scriptly', 'snippets')
+
+BUILTIN_SNIPPETS = {
+    'python': {
+        'def': 'def ${1:function_name}(${2:parameters}):\n\t${3:pass}',
+        'class': 'class ${1:ClassName}:\n\t${2:pass}',
+        'if': 'if ${1:condition}:\n\t${2:pass}',
+        'for': 'for ${1:item} in ${2:iterable}:\n\t${3:pass}',
+        'while': 'while ${1:condition}:\n\t${2:pass}',
+        'try': 'try:\n\t${1:pass}\nexcept ${2:Exception} as ${3:e}:\n\t${4:pass}',
+        'with': 'with ${1:expression} as ${2:target}:\n\t${3:pass}',
+        'import': 'import ${1:module}',
+        'from': 'from ${1:module} import ${2:name}',
+        'print': 'print(${1:object})',
+        'return': 'return ${1:object}',
+    },
+}
+
+_TABSTOP_RE = re.compile(r'\$(\d+)|\$\{(\d+)([:}])')
+
+
+class Snippet:
+    __slots__ = ('prefix', 'body', 'description')
+
+    def __init__(self, prefix: str, body: str, description: str = ''):
+        self.prefix = prefix
+        self.body = body
+        self.description = description
+
+
+def parse_snippet(body: str):
+    """Expand a snippet body into ``(text, stops)``.
+
+    ``stops`` is a list of ``(start, end)`` character offsets into ``text`` in
+    visiting order: ``$1``, ``$2``, ... and finally ``$0`` (the end of the text
+    when the body has no ``$0``). A repeated tabstop copies the first one's text.
+    """
+    out = []
+    stops = {}
+
+    def walk(i, nested):
+        while i < len(body):
+            ch = body[i]
+            if ch == '\\' and i + 1 < len(body) and body[i + 1] in '$}\\':
+                out.append(body[i + 1])
+                i += 2
+                continue
+            if ch == '}' and nested:
+                return i + 1
+            match = _TABSTOP_RE.match(body, i) if ch == '$' else None
+            if match is None:
+                out.append(ch)
+                i += 1
+                continue
+            number = int(match.group(1) or match.group(2))
+            start = len(out)
+            if match.group(3) == ':':
+                i = walk(match.end(), True)
+            else:
+                i = match.end()
+                if number in stops:
+                    first, last = stops[number]
+                    out.extend(out[first:last])
+            stops.setdefault(number, (start, len(out)))
+        return i
+
+    walk(0, False)
+    text = ''.join(out)
+    final = stops.pop(0, (len(text), len(text)))
+    return text, [stops[n] for n in sorted(stops)] + [final]
+
+
+class SnippetTrie:
+    """Case-insensitive prefix trie of snippets."""
+
+    def __init__(self):
+        self._root = ({}, [])  # (children by character, snippets ending here)
+        self.size = 0
+
+    def insert(self, snippet: Snippet):
+        node = self._root
+        for ch in snippet.prefix.lower():
+            node = node[0].setdefault(ch, ({}, []))
+        node[1].append(snippet)
+        self.size += 1
+
+    def find(self, prefix: str, limit: int = 20):
+        """Snippets whose prefix starts with ``prefix``, shortest prefixes first."""
+        node = self._root
+        for ch in prefix.lower():
+            node = node[0].get(ch)
+            if node is None:
+                return []
+        found = []
+        queue = deque([node])
+        while queue and len(found) < limit:
+            children, snippets = queue.popleft()
+            found.extend(snippets)
+            queue.extend(children[ch] for ch in sorted(children))
+        return found[:limit]
+
+
+def _read_snippet_file(path: str):
+    with open(path, 'r', encoding='utf-8') as fh:
+        data = json.load(fh)
+    snippets = []
+    for name, entry in data.items():
+        if not isinstance(entry, dict) or 'body' not in entry:
+            continue
+        body = entry['body']
+        if isinstance(body, list):
+            body = '\n'.join(body)
+        prefixes = entry.get('prefix') or name
+        if isinstance(prefixes, str):
+            prefixes = [prefixes]
+        description = entry.get('description') or name
+        snippets.extend(Snippet(p, body, description) for p in prefixes if p)
+    return snippets
+
+
+class SnippetRegistry:
+    """Builds one trie per language on first use."""
+
+    def __init__(self, directory: str = SNIPPET_DIR):
+        self.directory = directory
+        self._tries = {}
+
+    def reload(self):
+        """Drop the loaded tries so snippet files are read again."""
+        self._tries.clear()
+
+    def trie_for(self, language: str) -> SnippetTrie:
+        trie = self._tries.get(language)
+        if trie is None:
+            trie = self._tries[language] = self._build(language)
+        return trie
+
+    def _build(self, language):
+        trie = SnippetTrie()
+        for prefix, body in BUILTIN_SNIPPETS.get(language, {}).items():
+            trie.insert(Snippet(prefix, body, prefix))
+        for name in ('all.json', f'{language}.json'):
+            path = os.path.join(self.directory, name)
+            if not os.path.exists(path):
+                continue
+            try:
+                for snippet in _read_snippet_file(path):
+                    trie.insert(snippet)
+            except Exception as e:
+                print(f"Could not load snippets from {path}: {e}")
+        return trie
+
+    def find(self, language: str, prefix: str, limit: int = 20):
+        if not language or not prefix:
+            return []
+        return self.trie_for(language).find(prefix, limit)
+
+
+_registry = None
+
+
+def shared_snippets() -> SnippetRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SnippetRegistry()
+    return _registry
+
+
+class SnippetSession:
+    """Tabstop navigation for one expanded snippet.
+
+    Stops are byte ranges in the document. They follow edits through
+    ``SCN_MODIFIED`` so typing into a placeholder (or anywhere before it)
+    keeps the later stops in place. The session ends after the last stop is
+    reached, or when the document is edited outside the snippet.
+    """
+
+    def __init__(self, editor, stops):
+        self.editor = editor
+        self.stops = [list(stop) for stop in stops]
+        self.index = -1
+        self.active = True
+        editor.SCN_MODIFIED.connect(self._on_modified)
+
+    def _on_modified(self, position, mod_type, text, length, *args):
+        from PyQt6.Qsci import QsciScintilla
+        if mod_type & QsciScintilla.SC_MOD_INSERTTEXT:
+            if position < self.stops[0][0] or position > max(s[1] for s in self.stops):
+                self.finish()
+                return
+            for i, stop in enumerate(self.stops):
+                if position < stop[0] or (position == stop[0] and i != self.index):
+                    stop[0] += length
+                    stop[1] += length
+                elif position <= stop[1]:
+                    stop[1] += length
+        elif mod_type & QsciScintilla.SC_MOD_DELETETEXT:
+            end = position + length
+            if end < self.stops[0][0] or position > max(s[1] for s in self.stops):
+                self.finish()
+                return
+            for stop in self.stops:
+                for k in (0, 1):
+                    if stop[k] >= end:
+                        stop[k] -= length
+                    elif stop[k] > position:
+                        stop[k] = position
+
+    def _select(self):
+        start, end = self.stops[self.index]
+        self.editor.SendScintilla(self.editor.SCI_SETSEL, start, end)
+
+    def next(self):
+        self.index = min(self.index + 1, len(self.stops) - 1)
+        self._select()
+        if self.index == len(self.stops) - 1:
+            self.finish()
+
+    def previous(self):
+        if self.index > 0:
+            self.index -= 1
+            self._select()
+
+    def finish(self):
+        if not self.active:
+            return
+        self.active = False
+        try:
+            self.editor.SCN_MODIFIED.disconnect(self._on_modified)
+        except Exception:
+            pass
@@ -0,0 +1,204 @@
+"""Incremental index of the words in open buffers, for non-Python completion.
+
+Each buffer keeps the tokens of every line, so an edit only re-tokenizes the
+lines it touched. Words are reference counted per language across all open
+buffers of that language, and a sorted array of ``lowercase\\0word`` keys
+answers prefix queries with a binary search.
+"""
+import re
+from bisect import bisect_left, insort
+
+_DEFAULT_WORD = r'[A-Za-z_$][\w$]*'
+
+# identifier rules per language
+WORD_PATTERNS = {
+    'css': r'-{0,2}[A-Za-z_][\w-]*',
+    'scss': r'[$@]?-{0,2}[A-Za-z_][\w-]*',
+    'html': r'[A-Za-z_][\w-]*',
+    'xml': r'[A-Za-z_][\w.:-]*',
+    'yaml': r'[A-Za-z_][\w-]*',
+    'markdown': r'[A-Za-z][\w-]*',
+    'shell': r'[A-Za-z_][\w]*',
+    'sql': r'[A-Za-z_][\w$]*',
+    'lua': r'[A-Za-z_][\w]*',
+    'php': r'\$?[A-Za-z_][\w]*',
+    'ruby': r'[@$]{0,2}[A-Za-z_][\w]*[?!]?',
+    'javascript': _DEFAULT_WORD,
+    'java': _DEFAULT_WORD,
+    'cpp': r'[A-Za-z_][\w]*',
+    'json': r'[A-Za-z_][\w-]*',
+}
+
+LANGUAGE_FOR_EXTENSION = {
+    'js': 'javascript', 'jsx': 'javascript', 'ts': 'javascript', 'tsx': 'javascript', 'mjs': 'javascript',
+    'css': 'css', 'scss': 'scss', 'less': 'scss',
+    'html': 'html', 'htm': 'html',
+    'xml': 'xml', 'svg': 'xml',
+    'yaml': 'yaml', 'yml': 'yaml',
+    'md': 'markdown', 'markdown': 'markdown',
+    'sh': 'shell', 'bash': 'shell', 'zsh': 'shell',
+    'sql': 'sql', 'lua': 'lua', 'php': 'php', 'rb': 'ruby',
+    'java': 'java', 'json': 'json',
+    'c': 'cpp', 'cpp': 'cpp', 'cc': 'cpp', 'h': 'cpp', 'hpp': 'cpp',
+}
+
+# characters besides letters, digits and '_' that may appear inside a word
+WORD_CHARS = {
+    'css': '-', 'scss': '-$@', 'html': '-', 'xml': '.:-', 'yaml': '-',
+    'markdown': '-', 'json': '-', 'php': '$', 'ruby': '@$',
+    'javascript': '$', 'java': '$', 'sql': '$',
+}
+
+MIN_WORD_LENGTH = 3
+
+_compiled = {}
+
+
+def language_for(extension: str):
+    """Return the word-index language for a file extension.
+
+    None means the buffer is left to jedi: Python files and buffers without
+    an extension yet.
+    """
+    ext = (extension or '').lower().lstrip('.')
+    if ext in ('py', 'pyw'):
+        return None
+    return LANGUAGE_FOR_EXTENSION.get(ext, ext or None)
+
+
+def word_start(language: str, text: str, column: int) -> int:
+    """Return the column where the word ending at ``column`` begins."""
+    extra = WORD_CHARS.get(language, '')
+    start = column
+    while start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'
+                         or text[start - 1] in extra):
+        start -= 1
+    return start
+
+
+def _pattern(language: str):
+    pattern = _compiled.get(language)
+    if pattern is None:
+        pattern = re.compile(WORD_PATTERNS.get(language, _DEFAULT_WORD))
+        _compiled[language] = pattern
+    return pattern
+
+
+def tokenize_line(language: str, line: str) -> tuple:
+    return tuple(w for w in _pattern(language).findall(line) if len(w) >= MIN_WORD_LENGTH)
+
+
+class _LanguageWords:
+    __slots__ = ('counts', 'keys')
+
+    def __init__(self):
+        self.counts = {}
+        self.keys = []  # sorted 'lower\0word'
+
+    def add(self, words):
+        counts = self.counts
+        new = []
+        for word in words:
+            n = counts.get(word, 0)
+            counts[word] = n + 1
+            if not n:
+                new.append(f'{word.lower()}\0{word}')
+        if len(new) > 16:
+            # bulk loads (a whole buffer) sort once instead of inserting one by one
+            self.keys.extend(new)
+            self.keys.sort()
+        else:
+            for key in new:
+                insort(self.keys, key)
+
+    def remove(self, words):
+        counts = self.counts
+        for word in words:
+            n = counts.get(word, 0)
+            if n > 1:
+                counts[word] = n - 1
+            elif n == 1:
+                del counts[word]
+                key = f'{word.lower()}\0{word}'
+                i = bisect_left(self.keys, key)
+                if i < len(self.keys) and self.keys[i] == key:
+                    del self.keys[i]
+
+
+class WordIndex:
+    """Words of all registered buffers, grouped by language."""
+
+    def __init__(self):
+        self._languages = {}
+        self._buffers = {}  # buffer id -> (language, [tokens per line])
+
+    def _words(self, language):
+        words = self._languages.get(language)
+        if words is None:
+            words = self._languages[language] = _LanguageWords()
+        return words
+
+    def has_buffer(self, buffer_id) -> bool:
+        return buffer_id in self._buffers
+
+    def set_buffer(self, buffer_id, language: str, text: str):
+        """(Re)index a whole buffer, e.g. after opening it."""
+        self.remove_buffer(buffer_id)
+        lines = [tokenize_line(language, line) for line in text.split('\n')]
+        self._words(language).add(word for tokens in lines for word in tokens)
+        self._buffers[buffer_id] = (language, lines)
+
+    def remove_buffer(self, buffer_id):
+        entry = self._buffers.pop(buffer_id, None)
+        if entry is None:
+            return
+        language, lines = entry
+        words = self._words(language)
+        for tokens in lines:
+            words.remove(tokens)
+
+    def update_lines(self, buffer_id, first_line: int, lines_added: int, new_lines):
+        """Re-index after an edit at ``first_line``.
+
+        ``lines_added`` is negative when lines were removed; ``new_lines`` is the
+        current text of lines ``first_line .. first_line + max(0, lines_added)``.
+        """
+        entry = self._buffers.get(buffer_id)
+        if entry is None:
+            return
+        language, lines = entry
+        old_end = min(len(lines), first_line + 1 + max(0, -lines_added))
+        words = self._words(language)
+        for tokens in lines[first_line:old_end]:
+            words.remove(tokens)
+        fresh = [tokenize_line(language, line) for line in new_lines]
+        for tokens in fresh:
+            words.add(tokens)
+        lines[first_line:old_end] = fresh
+
+    def query(self, language: str, prefix: str, limit: int = 50, exclude=None):
+        """Words starting with ``prefix`` (case-insensitive), exact case first."""
+        words = self._languages.get(language)
+        if words is None or not prefix:
+            return []
+        low = prefix.lower()
+        keys = words.keys
+        i = bisect_left(keys, low)
+        found = []
+        while i < len(keys) and len(found) < limit * 2 and keys[i].startswith(low):
+            word = keys[i].split('\0', 1)[1]
+            if word != exclude:
+                found.append(word)
+            i += 1
+        found.sort(key=lambda w: (not w.startswith(prefix), len(w)))
+        return found[:limit]
+
+
+_shared_index = None
+
+
+def shared_word_index() -> WordIndex:
+    global _shared_index
+    if _shared_index is None:
+        _shared_index = WordIndex()
+    return _shared_index
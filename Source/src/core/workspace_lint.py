@@ -0,0 +1,299 @@
+"""Lints every Python file of the open workspace in the background.
+
+The workspace is walked in a worker thread. Files are then linted on the
+service's own thread pool (``max_jobs`` threads at idle OS priority), through
+the diagnostics cache and the lint pool, in priority order:
+
+    0  the file in the visible editor
+    1  files the file monitor or a rescan reported as changed
+    2  everything else (the initial sweep)
+
+Background (priority 2) work only starts after ``IDLE_MS`` without typing.
+Files open in an editor are not read from disk; the editor reports the issues
+of its buffer through ``report`` instead.
+"""
+import heapq
+import itertools
+import os
+import time
+
+from PyQt6.QtCore import QObject, QRunnable, QThread, QThreadPool, QTimer, pyqtSignal
+
+SKIP_DIRS = {'.git', '.hg', '.svn', '__pycache__', 'node_modules', 'venv', 'env', 'build', 'dist'}
+PYTHON_EXTENSIONS = ('.py', '.pyw')
+MAX_FILE_BYTES = 1024 * 1024
+IDLE_MS = 1500
+RESCAN_DELAY_MS = 500
+RESCAN_INTERVAL_MS = 60000
+
+PRIORITY_VISIBLE = 0
+PRIORITY_CHANGED = 1
+PRIORITY_BACKGROUND = 2
+
+
+def scan_workspace(root: str):
+    """Return ``({python file: mtime}, [directories])`` under ``root``."""
+    files = {}
+    directories = []
+    for current, subdirs, names in os.walk(root):
+        subdirs[:] = [d for d in subdirs if d not in SKIP_DIRS and not d.startswith('.')]
+        directories.append(current)
+        for name in names:
+            if name.endswith(PYTHON_EXTENSIONS):
+                path = os.path.join(current, name)
+                try:
+                    files[path] = os.path.getmtime(path)
+                except OSError:
+                    pass
+    return files, directories
+
+
+class ScanSignals(QObject):
+    finished = pyqtSignal(int, dict, list)  # token, {path: mtime}, directories
+
+
+class _ScanJob(QRunnable):
+    def __init__(self, token, root):
+        super().__init__()
+        self.token = token
+        self.root = root
+        self.signals = ScanSignals()
+
+    def run(self):
+        try:
+            files, directories = scan_workspace(self.root)
+        except Exception as e:
+            print(f"Workspace scan error: {e}")
+            files, directories = {}, []
+        self.signals.finished.emit(self.token, files, directories)
+
+
+class LintSignals(QObject):
+    finished = pyqtSignal(int, str, float, object)  # token, path, mtime, issues (None: unreadable)
+
+
+class _LintFileJob(QRunnable):
+    def __init__(self, token, path, mtime):
+        super().__init__()
+        self.token = token
+        self.path = path
+        self.mtime = mtime
+        self.signals = LintSignals()
+
+    def run(self):
+        try:
+            QThread.currentThread().setPriority(QThread.Priority.IdlePriority)
+        except Exception:
+            pass
+        issues = None
+        try:
+            if os.path.getsize(self.path) <= MAX_FILE_BYTES:
+                with open(self.path, 'r', encoding='utf-8', errors='replace') as fh:
+                    source = fh.read()
+                from core.code_analyzer import analyze_source
+                from core.lint_pool import running_lint_pool
+                # the file is what is on disk, so its results may be persisted
+                issues, _ = analyze_source(source, self.path, pool=running_lint_pool(), persist=True)
+            else:
+                issues = []
+        except OSError:
+            pass
+        except Exception as e:
+            print(f"Workspace lint error in {self.path}: {e}")
+            issues = []
+        self.signals.finished.emit(self.token, self.path, self.mtime, issues)
+
+
+class WorkspaceLintService(QObject):
+    file_linted = pyqtSignal(str, list)  # path, issues
+    file_removed = pyqtSignal(str)
+    progress = pyqtSignal(int, int)  # files linted, files known
+
+    def __init__(self, max_jobs: int = 1, monitor=None, parent=None):
+        super().__init__(parent)
+        self.root = ''
+        self.monitor = monitor
+        self.issues = {}  # path -> last issues, from disk or an editor buffer
+        self._pool = QThreadPool()
+        self._pool.setMaxThreadCount(max(1, int(max_jobs)))
+        self._token = 0
+        self._mtimes = {}  # path -> mtime seen by the last scan
+        self._linted = {}  # path -> mtime of the version linted
+        self._heap = []
+        self._queued = {}  # path -> priority; heap entries that disagree are stale
+        self._order = itertools.count()
+        self._running = set()
+        self._again = set()
+        self._open = set()  # paths whose issues come from editor buffers
+        self._last_activity = 0.0
+
+        self._pump_timer = QTimer()
+        self._pump_timer.setSingleShot(True)
+        self._pump_timer.timeout.connect(self._pump)
+        self._rescan_timer = QTimer()
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.timeout.connect(self.rescan)
+        self._interval_timer = QTimer()
+        self._interval_timer.timeout.connect(self.rescan)
+
+        if monitor is not None:
+            monitor.file_changed.connect(self.notify_changed)
+            monitor.directory_changed.connect(lambda _path: self._rescan_timer.start(RESCAN_DELAY_MS))
+
+    @property
+    def max_jobs(self) -> int:
+        return self._pool.maxThreadCount()
+
+    def set_max_jobs(self, jobs: int):
+        self._pool.setMaxThreadCount(max(1, int(jobs)))
+        self._schedule()
+
+    # ----- workspace -----
+    def set_root(self, root: str):
+        """Start linting the workspace at ``root`` (an empty root stops the service)."""
+        self.stop()
+        for path in list(self.issues):
+            if path not in self._open:
+                self.issues.pop(path, None)
+                self.file_removed.emit(path)
+        self.root = os.path.abspath(root) if root else ''
+        if self.root:
+            self.rescan()
+            self._interval_timer.start(RESCAN_INTERVAL_MS)
+
+    def stop(self):
+        self._token += 1
+        self._heap = []
+        self._queued.clear()
+        self._again.clear()
+        self._mtimes = {}
+        self._linted = {}
+        self._pump_timer.stop()
+        self._rescan_timer.stop()
+        self._interval_timer.stop()
+
+    def rescan(self):
+        if not self.root:
+            return
+        job = _ScanJob(self._token, self.root)
+        job.signals.finished.connect(self._on_scanned)
+        self._pool.start(job)
+
+    def _on_scanned(self, token, files, directories):
+        if token != self._token:
+            return
+        first = not self._mtimes
+        for path in set(self._mtimes) - set(files):
+            self._queued.pop(path, None)
+            self._linted.pop(path, None)
+            if path not in self._open and self.issues.pop(path, None) is not None:
+                self.file_removed.emit(path)
+        for path, mtime in files.items():
+            if self._linted.get(path) != mtime:
+                self._enqueue(path, PRIORITY_BACKGROUND if first or path not in self._mtimes
+                              else PRIORITY_CHANGED)
+        self._mtimes = files
+        if self.monitor is not None:
+            for directory in directories:
+                try:
+                    self.monitor.add_directory(directory)
+                except Exception:
+                    pass
+        self.progress.emit(len(self._linted), len(self._mtimes))
+
+    def _in_workspace(self, path: str) -> bool:
+        return bool(self.root) and os.path.abspath(path).startswith(self.root + os.sep)
+
+    # ----- events -----
+    def notify_changed(self, path: str):
+        """A file changed on disk (file monitor event or save)."""
+        if not path.endswith(PYTHON_EXTENSIONS) or not self._in_workspace(path):
+            return
+        try:
+            self._mtimes[path] = os.path.getmtime(path)
+        except OSError:
+            self._rescan_timer.start(RESCAN_DELAY_MS)
+            return
+        self._enqueue(path, PRIORITY_CHANGED)
+
+    def note_activity(self):
+        """The user is typing; hold background work back for a while."""
+        self._last_activity = time.monotonic()
+
+    def set_visible(self, path: str):
+        if path and path in self._queued:
+            self._enqueue(path, PRIORITY_VISIBLE)
+
+    def report(self, path: str, issues):
+        """Issues of an editor buffer; they win over the file on disk while it is open."""
+        if not path:
+            return
+        self._open.add(path)
+        self._queued.pop(path, None)
+        self.issues[path] = list(issues)
+        self.file_linted.emit(path, self.issues[path])
+
+    def release(self, path: str):
+        """The editor of ``path`` was closed; go back to what is on disk."""
+        if path not in self._open:
+            return
+        self._open.discard(path)
+        self._linted.pop(path, None)
+        if path in self._mtimes or self._in_workspace(path):
+            self.notify_changed(path)
+        elif self.issues.pop(path, None) is not None:
+            self.file_removed.emit(path)
+
+    # ----- scheduling -----
+    def _enqueue(self, path, priority):
+        if path in self._open:
+            return
+        current = self._queued.get(path)
+        if current is not None and current <= priority:
+            return
+        self._queued[path] = priority
+        heapq.heappush(self._heap, (priority, next(self._order), path))
+        self._schedule()
+
+    def _schedule(self, delay=0):
+        if not self._pump_timer.isActive() or delay == 0:
+            self._pump_timer.start(delay)
+
+    def _pump(self):
+        while self._heap and len(self._running) < self.max_jobs:
+            priority, _, path = self._heap[0]
+            if self._queued.get(path) != priority:
+                heapq.heappop(self._heap)
+                continue
+            if priority == PRIORITY_BACKGROUND:
+                idle_for = (time.monotonic() - self._last_activity) * 1000
+                if idle_for < IDLE_MS:
+                    self._schedule(int(IDLE_MS - idle_for) + 1)
+                    return
+            heapq.heappop(self._heap)
+            del self._queued[path]
+            if path in self._running:
+                # lint it again once the current run is done
+                self._again.add(path)
+                continue
+            self._running.add(path)
+            job = _LintFileJob(self._token, path, self._mtimes.get(path, 0.0))
+            job.signals.finished.connect(self._on_linted)
+            self._pool.start(job)
+
+    def _on_linted(self, token, path, mtime, issues):
+        self._running.discard(path)
+        if token == self._token and path not in self._open:
+            self._linted[path] = mtime
+            if issues is None:
+                # gone or unreadable; the next scan sorts it out
+                if self.issues.pop(path, None) is not None:
+                    self.file_removed.emit(path)
+            else:
+                self.issues[path] = issues
+                self.file_linted.emit(path, issues)
+            self.progress.emit(len(self._linted), len(self._mtimes))
+        if path in self._again:
+            self._again.discard(path)
+            self._enqueue(path, PRIORITY_CHANGED)
+        self._schedule()
@@ -1,5 +1,6 @@
 import sys
 import os
+import multiprocessing
 from datetime import datetime
 from PyQt6.QtWebEngineWidgets import QWebEngineView  
 from PyQt6.QtWidgets import QApplication
@@ -73,4 +74,6 @@ def main():
         print(f" An unexpected error occurred: {e}")
 
 if __name__ == '__main__':
+    # completion worker processes are spawned from the frozen .exe as well
+    multiprocessing.freeze_support()
     main()
@@ -0,0 +1,80 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
+                             QPushButton, QLabel, QFileDialog, QHeaderView)
+from PyQt6.QtCore import Qt
+
+from core.completion_metrics import SPANS, shared_recorder
+
+
+class CompletionDiagnosticsDialog(QDialog):
+    """Completion latency percentiles per file type, from core.completion_metrics."""
+
+    COLUMNS = ['File type', 'Source', 'Span', 'p50 (ms)', 'p95 (ms)', 'p99 (ms)', 'Samples']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle('Completion Latency')
+        self.resize(720, 420)
+        self._build_ui()
+        self.refresh()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        self.info = QLabel()
+        layout.addWidget(self.info)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        buttons = QHBoxLayout()
+        refresh = QPushButton('Refresh')
+        refresh.clicked.connect(self.refresh)
+        clear = QPushButton('Clear')
+        clear.clicked.connect(self._clear)
+        export = QPushButton('Export JSON...')
+        export.clicked.connect(self._export)
+        close = QPushButton('Close')
+        close.clicked.connect(self.accept)
+        for button in (refresh, clear, export):
+            buttons.addWidget(button)
+        buttons.addStretch()
+        buttons.addWidget(close)
+        layout.addLayout(buttons)
+
+    def refresh(self):
+        recorder = shared_recorder()
+        summary = recorder.summary()
+        rows = []
+        for file_type in sorted(summary):
+            for source in sorted(summary[file_type]):
+                stats = summary[file_type][source]
+                for span in SPANS:
+                    if span in stats:
+                        rows.append((file_type, source, span, stats[span]))
+        self.table.setRowCount(len(rows))
+        for row, (file_type, source, span, stat) in enumerate(rows):
+            values = [file_type, source, span, f"{stat['p50']:.1f}", f"{stat['p95']:.1f}",
+                      f"{stat['p99']:.1f}", str(stat['count'])]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column >= 3:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, column, item)
+        self.info.setText(f"{len(recorder)} completion(s) recorded")
+
+    def _clear(self):
+        shared_recorder().clear()
+        self.refresh()
+
+    def _export(self):
+        path, _ = QFileDialog.getSaveFileName(self, 'Export Completion Latency',
+                                              'completion-latency.json', 'JSON (*.json)')
+        if not path:
+            return
+        try:
+            shared_recorder().export(path)
+            self.info.setText(f"Exported to {path}")
+        except Exception as e:
+            self.info.setText(f"Export failed: {e}")
@@ -1,6 +1,6 @@
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QDialog, QLineEdit, QPushButton, QLabel, QMenu
 from PyQt6.QtGui import QFont, QColor, QTextCharFormat, QKeySequence
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QThreadPool
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer
 from PyQt6.Qsci import (QsciScintilla, QsciLexerPython, QsciLexerJavaScript,
                        QsciLexerHTML, QsciLexerCSS, QsciLexerXML, QsciLexerSQL,
                        QsciLexerJSON, QsciLexerYAML, QsciLexerMarkdown)
@@ -23,12 +23,16 @@ try:
 except Exception:
     QsciLexerBash = None
 from core.autocomplete import AutoCompleter
+from core.code_info import CodeInfo
 from types import SimpleNamespace
 
 class EditorWidget(QsciScintilla):
     content_changed = pyqtSignal()
     cursor_position_changed = pyqtSignal(int, int)  # line, column
     selection_changed = pyqtSignal()
+    lines_changed = pyqtSignal(int, int)  # first line, lines added (negative when removed)
+    issues_changed = pyqtSignal(str, list)  # file path, issues of the buffer
+    outline_changed = pyqtSignal(list)  # [{'name', 'kind', 'line', 'depth'}] from the last parse
     
     LEXERS = {
         'py': QsciLexerPython,
@@ -89,16 +93,20 @@ class EditorWidget(QsciScintilla):
         self.auto_save_timer = QTimer()
         self.auto_save_timer.timeout.connect(self.auto_save)
         
-        self._syntax_timer = QTimer()
-        self._syntax_timer.setSingleShot(True)
-        self._syntax_timer.timeout.connect(self.check_syntax)
-        
-        self._format_timer = QTimer()
-        self._format_timer.setSingleShot(True)
-        self._format_timer.timeout.connect(self.format_code)
+        # everything that follows an edit is debounced and versioned here
+        from core.change_scheduler import ChangeScheduler
+        self.changes = ChangeScheduler(self)
+
+        self._persist_version = -1  # the buffer matches the file on disk at this version
+        self._loading = False  # a FileLoad is appending to the document
+        self.file_encoding = 'utf-8'
+        self.outline = []
+        self.git_repository = None  # shared per work tree, see setup_git_integration
+        self.git_manager = None
         
         # Setup core features
         self.setup_editor()
+        self.setup_edit_tracking()
         self.setup_autocomplete()
         self.setup_context_menu()
         self.setup_minimap()
@@ -106,21 +114,16 @@ class EditorWidget(QsciScintilla):
         self.setup_web_preview()
         
         # Initialize managers
-        from core.code_analyzer import CodeAnalyzer
-        from core.code_formatter import CodeFormatter
-        from core.git_manager import GitManager
+        from core.lint_engine import IncrementalAnalyzer
         from core.web_preview import WebPreviewManager
         
-        self.analyzer = CodeAnalyzer(self.text(), getattr(self, 'file_path', ''))
-        self.formatter = CodeFormatter(self.text())
-        self.git_manager = GitManager(os.path.dirname(getattr(self, 'file_path', '')))
+        self.incremental_analyzer = IncrementalAnalyzer(getattr(self, 'file_path', ''))
         self.web_preview = WebPreviewManager(self)
         
         # Connect signals
         self.textChanged.connect(self._on_text_changed)
-        self.analyzer.signals.issues_found.connect(self._on_issues_found)
-        self.formatter.signals.format_ready.connect(self._on_format_ready)
         self.web_preview.preview_updated.connect(self._on_preview_updated)
+        self.setup_change_consumers()
         
         # Apply initial settings
         self.apply_settings()
@@ -141,20 +144,33 @@ class EditorWidget(QsciScintilla):
 
     def setup_git_integration(self):
         """Set up Git integration features."""
-        if not hasattr(self, 'file_path'):
+        if not getattr(self, 'file_path', None):
             return
-            
-        # Create Git manager if in a git repo
-        self.git_manager = GitManager(os.path.dirname(self.file_path))
-        if self.git_manager.is_git_repo():
+        self.teardown_git_integration()
+
+        # every editor of a work tree shares its repository (one git.Repo, one status cache)
+        from core.git_repository import shared_repositories
+        self._git_path = self.file_path
+        self.git_repository = shared_repositories().subscribe(self._git_path, self._update_git_markers)
+        if self.git_repository is not None:
+            self.git_manager = self.git_repository.manager
             # Add git status markers in the margin
-            self.setMarginType(3, QsciScintilla.MarginType.SymbolMargin)
-            self.setMarginWidth(3, 10)
-            self.setMarginMarkerMask(3, 0xFF)
-            
-            # Update git status
-            self.git_manager.status_changed.connect(self._update_git_markers)
-            self.git_manager.get_status()
+            self.git_gutter.show_margin()
+            self.set_blame_mode(self.blame_mode())
+
+    def teardown_git_integration(self):
+        """Stop following the git state of the file (closed tab or renamed file)."""
+        if self.git_repository is None:
+            return
+        try:
+            from core.git_repository import shared_repositories
+            shared_repositories().unsubscribe(self._git_path, self._update_git_markers)
+            self.git_gutter.clear()
+            self.blame_view.set_blame(None)
+        except Exception:
+            pass
+        self.git_repository = None
+        self.git_manager = None
 
     def setup_web_preview(self):
         """Set up web preview for HTML/CSS/JS files."""
@@ -166,56 +182,127 @@ class EditorWidget(QsciScintilla):
             self.web_preview.set_editor(self)
 
     def _on_text_changed(self):
-        """Handle text changes."""
-        self.content_changed.emit()
-        
-        # Schedule syntax check
-        self._syntax_timer.start(1000)  # Check syntax after 1 second of inactivity
-        
-        # Schedule code formatting if enabled
-        if self.settings.editor.get('auto_format', True):
-            self._format_timer.start(2000)  # Format after 2 seconds of inactivity
-        
-        # Update web preview if active
-        if hasattr(self, 'web_preview') and self.web_preview:
-            self.web_preview.update_preview()
-            
-        # Update git status
-        if hasattr(self, 'git_manager') and self.git_manager.is_git_repo():
-            self.git_manager.get_status()
+        """Handle text changes: only bump the version; the consumers run debounced."""
+        if self._loading:
+            return
+        self.changes.notify()
+
+    # ----- loading (see core.file_loader) -----
+    def begin_load(self):
+        """Take the document for a ``FileLoad``: read-only, no undo, no change consumers."""
+        self._loading = True
+        self.changes.cancel()
+        self.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 0)
+        self.setReadOnly(True)
+
+    def is_loading(self):
+        return self._loading
+
+    def clear_loaded(self):
+        self.setReadOnly(False)
+        try:
+            self.clear()
+        finally:
+            self.setReadOnly(True)
+
+    def append_loaded(self, text):
+        self.setReadOnly(False)
+        try:
+            self.append(text)
+        finally:
+            self.setReadOnly(True)
+
+    def end_load(self, newline='', encoding='utf-8'):
+        """Give the document back after a load; it starts unmodified with an empty undo history."""
+        self.setReadOnly(False)
+        self.SendScintilla(QsciScintilla.SCI_EMPTYUNDOBUFFER)
+        self.SendScintilla(QsciScintilla.SCI_SETUNDOCOLLECTION, 1)
+        if newline:
+            self.setEolMode(QsciScintilla.EolMode.EolWindows if newline == '\r\n'
+                            else QsciScintilla.EolMode.EolUnix)
+        self.file_encoding = encoding
+        self.setModified(False)
+        self._loading = False
+        self.changes.notify()
+
+    def setup_change_consumers(self):
+        """Register the work that follows an edit, by debounce and priority."""
+        from core.code_analyzer import analyze_source
+        from core.code_formatter import format_source
+        from core.git_gutter import diff_against_base
+        changes = self.changes
+        changes.add('content', lambda version: self.content_changed.emit(), delay=100, priority=0)
+        # one parse for the syntax check, lint and outline; only edited blocks are re-checked
+        changes.add('analysis', job=lambda snapshot: analyze_source(*snapshot),
+                    snapshot=self._analysis_snapshot, delay=250, priority=1,
+                    done=self._on_analysis_done, enabled=self._is_python)
+        changes.add('preview', lambda version: self.web_preview.update_preview(), delay=300,
+                    priority=2, enabled=self._has_preview)
+        changes.add('gutter', lambda version: self._update_git_gutter(), delay=150, priority=1,
+                    enabled=lambda: self.git_repository is not None)
+        changes.add('gutter_base', job=diff_against_base, snapshot=self._gutter_snapshot, priority=1,
+                    done=lambda version, result: self._on_gutter_diff(*result),
+                    enabled=lambda: self.git_repository is not None)
+        # blame does not depend on the buffer: edits are mapped through the gutter's diff
+        changes.add('blame', job=lambda snapshot: snapshot[0].blame(*snapshot[1:]),
+                    snapshot=self._blame_snapshot, priority=5, versioned=False,
+                    done=lambda version, blame: self.blame_view.set_blame(blame),
+                    enabled=lambda: self.git_repository is not None and self.blame_view.mode != 'off')
+        changes.add('format', job=format_source, snapshot=self.text, delay=2000, priority=3,
+                    done=lambda version, formatted: self._on_format_ready(formatted),
+                    enabled=self._auto_format_enabled)
+
+    def _has_preview(self):
+        if not self.settings.editor.get('live_preview', True):
+            return False
+        path = getattr(self, 'file_path', '') or ''
+        return os.path.splitext(path)[1].lower() in ('.html', '.css', '.js')
+
+    def _auto_format_enabled(self):
+        path = getattr(self, 'file_path', '') or ''
+        return (self.settings.editor.get('auto_format', True)
+                and os.path.splitext(path)[1].lower() == '.py')
+
+    def _is_python(self):
+        path = getattr(self, 'file_path', '') or ''
+        return os.path.splitext(path)[1].lower() in ('.py', '.pyw')
+
+    def run_analysis(self, persist=False):
+        """Lint the buffer now rather than after the analysis debounce.
+
+        ``persist`` marks the buffer as identical to the file on disk (just
+        opened or saved), so the results are kept in the on-disk cache.
+        """
+        if persist:
+            self._persist_version = self.changes.version
+        self.changes.run_now('analysis')
+
+    def _analysis_snapshot(self):
+        # the lint pool, when running, does the checks in one of its processes
+        from core.lint_pool import running_lint_pool
+        self.incremental_analyzer.path = self.file_path
+        persist = self._persist_version == self.changes.version
+        return (self.text(), self.file_path, self.incremental_analyzer, running_lint_pool(),
+                persist)
+
+    def _on_analysis_done(self, version, result):
+        if result is None:
+            return
+        issues, outline = result
+        self._show_syntax_error(next((i for i in issues if i.get('syntax')), None))
+        self._on_issues_found(issues)
+        self.issues_changed.emit(self.file_path or '', issues)
+        if outline is not None:
+            self.outline = outline
+            self.outline_changed.emit(self.outline)
 
     def _on_issues_found(self, issues):
         """Handle found code issues."""
-        # Clear existing markers
-        self.clearIndicators(0)
-        self.clearIndicators(1)
-        self.clearIndicators(2)
-        
-        # Set up indicators
-        self.indicatorDefine(QsciScintilla.INDIC_SQUIGGLE, 0)  # Error
-        self.indicatorDefine(QsciScintilla.INDIC_SQUIGGLE, 1)  # Warning
-        self.indicatorDefine(QsciScintilla.INDIC_SQUIGGLE, 2)  # Style
-        
-        self.setIndicatorForegroundColor(QColor("#ff0000"), 0)
-        self.setIndicatorForegroundColor(QColor("#ffaa00"), 1)
-        self.setIndicatorForegroundColor(QColor("#00aa00"), 2)
-        
-        # Apply indicators
-        for issue in issues:
-            line = issue['line'] - 1
-            col = issue['col']
-            length = 1  # Default length
-            
-            # Determine indicator based on issue type
-            indicator = 0  # Default to error
-            if issue['type'] == 'warning':
-                indicator = 1
-            elif issue['type'] == 'style':
-                indicator = 2
-                
-            # Mark the issue
-            pos = self.positionFromLineIndex(line, col)
-            self.fillIndicatorRange(line, col, line, col + length, indicator)
+        # only the lines whose issues changed are redrawn
+        try:
+            self.diagnostics.set_issues(issues)
+        except Exception as e:
+            print(f"Could not show issues: {e}")
 
     def _on_format_ready(self, formatted_code):
         """Handle formatted code."""
@@ -228,37 +315,103 @@ class EditorWidget(QsciScintilla):
         """Handle web preview updates."""
         pass  # The preview widget updates itself
 
-    def _update_git_markers(self, status):
-        """Update Git status markers in the margin."""
-        self.markerDeleteAll()
-        
-        if 'modified' in status:
-            for file in status['modified']:
-                if os.path.basename(file) == os.path.basename(self.file_path):
-                    # Mark modified lines
-                    current = self.text().split('\n')
-                    original = open(self.file_path, 'r').read().split('\n')
-                    for i, (curr, orig) in enumerate(zip(current, original)):
-                        if curr != orig:
-                            self.markerAdd(i, 1)  # Use marker 1 for modifications
+    def _update_git_markers(self, state):
+        """Follow the git state of this file (see ``GitStatus.state``) in the gutter."""
+        if self.git_repository is None or state in ('untracked', 'ignored', 'conflicted'):
+            self.git_gutter.clear()
+            return
+        # a new index version: fetch it (cached per revision) and diff in the background
+        self.changes.run_now('gutter_base')
 
-    def format_code(self):
-        """Format the current code."""
-        if not self.settings.editor.get('auto_format', True):
+    def _update_git_gutter(self):
+        """Re-diff the lines edited since the last update against the index version."""
+        repository = self.git_repository
+        if repository is None:
             return
-            
-        # Get file extension
-        if not hasattr(self, 'file_path'):
+        gutter = self.git_gutter
+        if gutter.revision != repository.revision(self.file_path) or not gutter.update():
+            self.changes.run_now('gutter_base')
+        elif self.blame_view.mode != 'off':
+            self.blame_view.refresh()
+
+    def stage_hunks(self):
+        """Stage the changes of the selected lines (or of the caret line) from the buffer.
+
+        Only the hunks touched are staged; the rest of the index version and
+        the file on disk stay as they are. Returns False when there is
+        nothing to stage there.
+        """
+        repository = self.git_repository
+        if repository is None:
+            return False
+        gutter = self.git_gutter
+        if gutter.revision != repository.revision(self.file_path) or not gutter.update():
+            self.changes.run_now('gutter_base')
+            return False  # the diff is being rebuilt; the hunks are not known yet
+        if self.hasSelectedText():
+            first, _, last, last_index = self.getSelection()
+            last += 1 if last_index > 0 or last == first else 0
+        else:
+            first = self.getCursorPosition()[0]
+            last = first + 1
+        from core.git_gutter import split_lines
+        text = self.text()
+        lines = gutter.diff.with_hunks(split_lines(text), first, last)
+        if lines is None:
+            return False
+        # the rest of the index version is written back, so it must have decoded exactly
+        relative = repository.relative(self.file_path)
+        manager = repository.manager
+        if not repository.base_is_exact(relative, gutter.revision, self.file_encoding):
+            manager.error_occurred.emit(
+                f"The staged version of {os.path.basename(self.file_path)} is not valid "
+                f"{self.file_encoding}; stage the whole file instead.")
+            return False
+        eol = '\r\n' if '\r\n' in text else '\n'
+        try:
+            data = eol.join(lines).encode(self.file_encoding)
+        except UnicodeEncodeError as e:
+            manager.error_occurred.emit(f"Cannot stage as {self.file_encoding}: {e}")
+            return False
+        return manager.stage_contents(self.file_path, data)
+
+    def _gutter_snapshot(self):
+        repository = self.git_repository
+        return (repository, repository.relative(self.file_path),
+                repository.revision(self.file_path), self.text(), self.file_encoding)
+
+    def _on_gutter_diff(self, revision, diff):
+        self.git_gutter.set_diff(revision, diff)
+        self._request_blame()
+
+    def _blame_snapshot(self):
+        repository = self.git_repository
+        return (repository, repository.relative(self.file_path), self.git_gutter.revision,
+                self.file_encoding)
+
+    def _request_blame(self):
+        """Blame the revision the gutter diffs against, in the background, once per revision."""
+        view = self.blame_view
+        if view.mode == 'off' or self.git_repository is None or self.git_gutter.revision is None:
             return
-            
-        ext = os.path.splitext(self.file_path)[1].lower()
-        
-        # Only format Python files for now
-        if ext == '.py':
-            from core.code_formatter import CodeFormatter
-            formatter = CodeFormatter(self.text())
-            formatter.signals.format_ready.connect(self._on_format_ready)
-            QThreadPool.globalInstance().start(formatter)
+        if view.revision != self.git_gutter.revision:
+            self.changes.run_now('blame')
+        else:
+            view.refresh()
+
+    def blame_mode(self):
+        return (getattr(self.settings, 'git', None) or {}).get('blame', 'inline')
+
+    def set_blame_mode(self, mode):
+        """'off', 'inline' (the caret line) or 'gutter' (a margin with every line)."""
+        self.blame_view.set_mode(mode if self.git_repository is not None else 'off')
+        self._request_blame()
+
+    def format_code(self):
+        """Format the current code (in the background, dropped if the text changes meanwhile)."""
+        if not self._auto_format_enabled():
+            return
+        self.changes.run_now('format')
 
     def update_theme(self, theme=None):
         """Update editor colors and styles based on theme."""
@@ -450,20 +603,58 @@ class EditorWidget(QsciScintilla):
         self.setIndicatorForegroundColor(
             QColor("#FF0000"), self.error_indicator)
 
-    def setup_autocomplete(self):
-        self.autocompleter = AutoCompleter(self)
-        # We call update_completions via a small debounce on text change
+        # squiggles for errors, warnings and style issues
+        from core.diagnostic_indicators import DiagnosticIndicators
+        self.diagnostics = DiagnosticIndicators(self)
+
+        # added / modified / deleted lines against git's index
+        from core.git_gutter import GitGutter
+        self.git_gutter = GitGutter(self)
+
+        # who last changed a line, once a repository is known (see setup_git_integration)
+        from core.git_blame import BlameView
+        self.blame_view = BlameView(self, self.git_gutter, mode='off')
+
+    def setup_edit_tracking(self):
+        """Report which lines each insert/delete touched via ``lines_changed``."""
         try:
-            self.textChanged.connect(lambda: self.autocompleter.update_completions(120))
+            self.SCN_MODIFIED.connect(self._on_scn_modified)
         except Exception:
             pass
 
-    def _on_text_changed_debounced(self):
-        # start syntax check timer and notify content changed
+    def _on_scn_modified(self, position, mod_type, text, length, lines_added, *args):
+        if self._loading or not mod_type & (QsciScintilla.SC_MOD_INSERTTEXT | QsciScintilla.SC_MOD_DELETETEXT):
+            return
         try:
-            self._syntax_timer.start(600)
+            line = self.SendScintilla(QsciScintilla.SCI_LINEFROMPOSITION, position)
+            self.lines_changed.emit(line, lines_added)
         except Exception:
             pass
+
+    def keyPressEvent(self, event):
+        # Tab / Shift+Tab jump between the tabstops of an expanded snippet
+        completer = getattr(self, 'autocompleter', None)
+        if completer is not None and not self.isListActive():
+            try:
+                if completer.handle_snippet_key(event.key()):
+                    return
+            except Exception:
+                pass
+        super().keyPressEvent(event)
+
+    def setup_autocomplete(self):
+        self.autocompleter = AutoCompleter(self)
+        # the completer debounces itself (less while narrowing), so it is called on every change
+        try:
+            self.changes.add('complete', lambda version: self.autocompleter.update_completions(120))
+            self.lines_changed.connect(self.autocompleter.notify_edit)
+        except Exception:
+            pass
+        # signature help and hover share the completer's jobs and jedi cache
+        self.code_info = CodeInfo(self, self.autocompleter)
+
+    def _on_text_changed_debounced(self):
+        # notify content changed (the syntax check is scheduled in _on_text_changed)
         try:
             self.content_changed.emit()
         except Exception:
@@ -491,6 +682,10 @@ class EditorWidget(QsciScintilla):
             pass
 
     def apply_settings(self):
+        try:
+            self.set_blame_mode(self.blame_mode())
+        except Exception:
+            pass
         # apply font and tab settings
         try:
             # prefer a programming font if available
@@ -582,49 +777,31 @@ class EditorWidget(QsciScintilla):
     def auto_save(self):
         # placeholder for auto-save per-editor
         try:
-            if hasattr(self, 'file_path') and self.file_path:
-                with open(self.file_path, 'w', encoding='utf-8') as fh:
+            if hasattr(self, 'file_path') and self.file_path and not self._loading:
+                with open(self.file_path, 'w', encoding=self.file_encoding, newline='') as fh:
                     fh.write(self.text())
         except Exception:
             pass
 
     def check_syntax(self):
-        """Quick syntax check using ast.parse. Marks error lines with the error indicator."""
+        """Check the syntax of a Python buffer.
+
+        The syntax check shares one parse with pyflakes, the style checks and
+        the outline; see ``run_analysis``.
+        """
+        self.run_analysis()
+
+    def _show_syntax_error(self, issue):
+        """Mark the line of a syntax error (or nothing) with the error indicator."""
         try:
-            import ast
-            src = self.text()
-            # clear previous error indicators
-            try:
-                length = len(src)
-                self.clearIndicatorRange(0, length, self.error_indicator)
-            except Exception:
-                pass
-            try:
-                ast.parse(src)
-                return
-            except SyntaxError as e:
-                try:
-                    lineno = getattr(e, 'lineno', None)
-                    if lineno is None:
-                        return
-                    # mark the whole line as error
-                    start = self.positionFromLineIndex(lineno - 1, 0)
-                    # compute end as start of next line or end of doc
-                    try:
-                        end = self.positionFromLineIndex(lineno, 0)
-                    except Exception:
-                        end = len(src)
-                    length = max(1, end - start)
-                    try:
-                        self.fillIndicatorRange(start, length, self.error_indicator)
-                    except Exception:
-                        # older API may be indicatorFillRange
-                        try:
-                            self.indicatorFillRange(start, length)
-                        except Exception:
-                            pass
-                except Exception:
-                    pass
+            self.clearIndicatorRange(0, 0, self.lines(), 0, self.error_indicator)
+        except Exception:
+            pass
+        if not issue:
+            return
+        try:
+            line = max(0, int(issue.get('line') or 1) - 1)
+            self.fillIndicatorRange(line, 0, line, len(self.text(line)), self.error_indicator)
         except Exception:
             pass
 
@@ -641,6 +818,13 @@ class EditorWidget(QsciScintilla):
             if ext.startswith('.'):
                 ext = ext[1:]
             
+            # choose between jedi and the word index before the lexer lookup,
+            # so file types without a lexer still get word completions
+            try:
+                self.autocompleter.set_language(ext)
+            except Exception:
+                pass
+
             # Get appropriate lexer class
             LexerClass = self.LEXERS.get(ext)
             if not LexerClass:
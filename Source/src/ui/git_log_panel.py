@@ -0,0 +1,185 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeView, QHeaderView,
+                             QPlainTextEdit, QSplitter, QPushButton)
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt6.QtGui import QFont
+import time
+
+from core.git_log import CommitLog, SHA, PARENTS, AUTHOR, EMAIL, TIME, SUBJECT, PATHS
+
+
+class CommitLogModel(QAbstractTableModel):
+    """Rows of a ``CommitLog``; the view pulls more pages as it scrolls to the end.
+
+    Cells are formatted when the view asks for them, so only the rows on
+    screen cost anything, however long the history is.
+    """
+
+    COLUMNS = ['Commit', 'Message', 'Author', 'Date']
+
+    def __init__(self, log, parent=None):
+        super().__init__(parent)
+        self.log = log
+        self._rows = 0
+        log.reset.connect(self._on_reset)
+        log.commits_added.connect(self._on_added)
+
+    def _on_reset(self):
+        self.beginResetModel()
+        self._rows = 0
+        self.endResetModel()
+
+    def _on_added(self, first, last):
+        if first != self._rows:
+            self._on_reset()
+            first = 0
+        self.beginInsertRows(QModelIndex(), first, last)
+        self._rows = last + 1
+        self.endInsertRows()
+
+    def commit(self, index):
+        if index.isValid() and index.row() < self._rows:
+            return self.log.commits[index.row()]
+        return None
+
+    # ----- structure -----
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.log.can_fetch_more()
+
+    def fetchMore(self, parent=QModelIndex()):
+        # asynchronous: rows arrive through commits_added
+        self.log.fetch_more()
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    # ----- data -----
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        commit = self.commit(index)
+        if commit is None:
+            return None
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return commit[SHA][:8]
+            if column == 1:
+                return commit[SUBJECT]
+            if column == 2:
+                return commit[AUTHOR]
+            return time.strftime('%Y-%m-%d %H:%M', time.localtime(commit[TIME]))
+        if role == Qt.ItemDataRole.ToolTipRole:
+            merge = '  (merge)' if ' ' in commit[PARENTS] else ''
+            return f"{commit[SHA]}{merge}\n{commit[AUTHOR]} <{commit[EMAIL]}>\n\n{commit[SUBJECT]}"
+        return None
+
+
+class GitLogPanel(QWidget):
+    """History of the workspace repository or of one file; details load when a commit is selected."""
+
+    DETAILS_DELAY_MS = 80
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.log = CommitLog(self)
+        self.log.count_known.connect(self._update_info)
+        self.log.commits_added.connect(lambda first, last: self._update_info())
+        self.log.details_ready.connect(self._show_details)
+        self._selected = ''
+        self._selected_paths = ()
+        self._repository_root = ''
+        # arrow keys run through commits quickly; only read the one the selection stops on
+        self._details_timer = QTimer()
+        self._details_timer.setSingleShot(True)
+        self._details_timer.timeout.connect(self._request_details)
+        self._build_ui()
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        header = QHBoxLayout()
+        self.info = QLabel()
+        header.addWidget(self.info, 1)
+        self.repository_button = QPushButton("Repository History")
+        self.repository_button.clicked.connect(self.show_repository)
+        self.repository_button.setVisible(False)
+        header.addWidget(self.repository_button)
+        layout.addLayout(header)
+
+        self.model = CommitLogModel(self.log, self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.selectionModel().currentChanged.connect(self._on_current)
+
+        self.details = QPlainTextEdit()
+        self.details.setReadOnly(True)
+        self.details.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        font = QFont('Consolas')
+        font.setStyleHint(QFont.StyleHint.Monospace)
+        self.details.setFont(font)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        splitter.addWidget(self.tree)
+        splitter.addWidget(self.details)
+        splitter.setStretchFactor(0, 3)
+        splitter.setStretchFactor(1, 2)
+        layout.addWidget(splitter)
+
+    # ----- histories -----
+    def show_history(self, root, path=''):
+        """History of the repository at ``root``, or of ``path`` (relative to it)."""
+        self._repository_root = root
+        self._selected = ''
+        self.details.clear()
+        self.log.open(root, path)
+        self.repository_button.setVisible(bool(path))
+        self._update_info()
+
+    def show_repository(self):
+        if self._repository_root:
+            self.show_history(self._repository_root)
+
+    def _update_info(self, *args):
+        if not self.log.root:
+            self.info.setText("No repository")
+            return
+        label = self.log.path or self.log.root
+        loaded = len(self.log.commits)
+        total = self.log.total
+        if total >= 0 and loaded < total:
+            self.info.setText(f"{label}: {loaded} of {total} commits loaded")
+        else:
+            self.info.setText(f"{label}: {loaded} commits")
+
+    # ----- details -----
+    def _on_current(self, current, previous):
+        commit = self.model.commit(current)
+        if commit is None:
+            return
+        self._selected = commit[SHA]
+        self._selected_paths = commit[PATHS]
+        self._details_timer.start(self.DETAILS_DELAY_MS)
+
+    def _request_details(self):
+        if self._selected:
+            self.details.setPlainText(f"Loading {self._selected[:10]}...")
+            self.log.request_details(self._selected, self._selected_paths)
+
+    def _show_details(self, sha, text):
+        if sha == self._selected:
+            self.details.setPlainText(text)
+
+    def shutdown(self):
+        self._details_timer.stop()
+        self.log.shutdown()
@@ -147,6 +147,13 @@ def create_file_browser(window):
         except Exception:
             pass
 
+    # Several files can be selected (to stage them together, for instance)
+    try:
+        from PyQt6.QtWidgets import QAbstractItemView
+        window.tree_view.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+    except Exception:
+        pass
+
     # Context menu
     window.tree_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
     window.tree_view.customContextMenuRequested.connect(window.on_file_tree_context_menu)
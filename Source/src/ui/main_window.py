@@ -25,6 +25,12 @@ class MainWindow(QMainWindow):
         self.theme_manager = ThemeManager()
         self.file_monitor = FileMonitor(self.settings)
         self.file_monitor.file_changed.connect(self.handle_external_file_change)
+        from core.workspace_lint import WorkspaceLintService
+        self.workspace_lint = WorkspaceLintService(monitor=self.file_monitor, parent=self)
+        # git status is cached per repository and refreshed by file events and saves
+        from core.git_status import shared_git_status
+        shared_git_status().attach_monitor(self.file_monitor)
+        self.apply_analysis_settings()
         
         self.setup_ui()
         self.setup_menubar()
@@ -61,6 +67,7 @@ class MainWindow(QMainWindow):
         self.tab_widget.setMovable(True)
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
         self.tab_widget.currentChanged.connect(self.update_status_bar)
+        self.tab_widget.currentChanged.connect(self._on_current_tab_changed)
         
         # Apply modern styling to the main window
         self.setStyleSheet("""
@@ -140,7 +147,7 @@ class MainWindow(QMainWindow):
             for i in range(self.tab_widget.count()):
                 ed = self.tab_widget.widget(i)
                 try:
-                    if hasattr(ed, 'isModified') and ed.isModified():
+                    if hasattr(ed, 'isModified') and ed.isModified() and not ed.is_loading():
                         name = getattr(ed, 'file_path', None) or f'Untitled-{i+1}'
                         unsaved.append((i, name))
                 except Exception:
@@ -185,6 +192,51 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
 
+        # Drop queued edit follow-ups (formatting) of all editors and git status refreshes
+        try:
+            from core.change_scheduler import shutdown_change_executor
+            shutdown_change_executor()
+        except Exception:
+            pass
+        try:
+            from core.git_repository import shutdown_repositories
+            from core.git_status import shutdown_git_status
+            shutdown_repositories()
+            shutdown_git_status()
+            if hasattr(self, 'git_log_panel'):
+                self.git_log_panel.shutdown()
+        except Exception:
+            pass
+
+        # Stop reading files that are still opening
+        try:
+            for i in range(self.tab_widget.count()):
+                load = getattr(self.tab_widget.widget(i), 'file_load', None)
+                if load is not None:
+                    load.cancel()
+            from core.file_loader import shutdown_load_pool
+            shutdown_load_pool()
+        except Exception:
+            pass
+
+        # Stop completion worker processes
+        try:
+            from core.completion_server import shutdown_shared_server
+            shutdown_shared_server()
+        except Exception:
+            pass
+
+        # Stop lint worker processes
+        try:
+            self.workspace_lint.stop()
+        except Exception:
+            pass
+        try:
+            from core.lint_pool import shutdown_lint_pool
+            shutdown_lint_pool()
+        except Exception:
+            pass
+
         super().closeEvent(event)
 
     def setup_menubar(self):
@@ -236,6 +288,8 @@ class MainWindow(QMainWindow):
         tools_menu = menubar.addMenu("&Tools")
         run_action = tools_menu.addAction("Run/Debug Current File")
         run_action.triggered.connect(self.run_debug_current_file)
+        latency_action = tools_menu.addAction("Completion Latency...")
+        latency_action.triggered.connect(self.show_completion_diagnostics)
 
         # Terminal Menu
         terminal_menu = menubar.addMenu("&Terminal")
@@ -246,9 +300,22 @@ class MainWindow(QMainWindow):
         toggle_terminal_action = terminal_menu.addAction("Toggle Terminal")
         toggle_terminal_action.triggered.connect(self.toggle_terminal)
 
+        # Git Menu
+        git_menu = menubar.addMenu("&Git")
+        git_menu.addAction("Stage Current File", self.stage_current_file)
+        git_menu.addAction("Unstage Current File", self.unstage_current_file)
+        git_menu.addAction("Stage Selected Changes", self.stage_selected_hunks)
+        git_menu.addSeparator()
+        git_menu.addAction("History", self.show_git_history)
+        git_menu.addAction("History of Current File", self.show_file_history)
+
         # View Menu
         view_menu = menubar.addMenu("&View")
         view_menu.addAction("Toggle File Browser", self.toggle_file_browser)
+        view_menu.addAction("Toggle Problems", self.toggle_problems)
+        view_menu.addAction("Cycle Git Blame (Off / Inline / Gutter)", self.cycle_blame_mode)
+        view_menu.addAction("Git History", self.show_git_history)
+        view_menu.addAction("Git History of Current File", self.show_file_history)
 
         # Settings / Preferences (visible and discoverable)
         settings_menu = menubar.addMenu("&Settings")
@@ -305,6 +372,9 @@ class MainWindow(QMainWindow):
         # Fade in the window
         QTimer.singleShot(50, lambda: fade_in(self, duration=300))
 
+        # Warm jedi up once the window has settled
+        QTimer.singleShot(1500, self.start_completion_warmup)
+
         # If there is no workspace set in settings, just show the welcome tab
         try:
             ws = getattr(self.settings, 'workspace', {})
@@ -316,6 +386,16 @@ class MainWindow(QMainWindow):
         except Exception:
             pass
         
+    def start_completion_warmup(self):
+        """Pre-load jedi and the workspace's most imported modules in the background."""
+        try:
+            from core.completion_warmup import start_warmup
+            ws = getattr(self.settings, 'workspace', {}) or {}
+            root = getattr(self, 'workspace_root', None) or ws.get('last_workspace') or QDir.currentPath()
+            self._completion_warmup = start_warmup(root, self.settings)
+        except Exception as e:
+            print(f"Could not start completion warm-up: {e}")
+
     def apply_theme(self):
         """Apply the current theme from settings with proper paint handling."""
         theme = self.theme_manager.get_current_theme()
@@ -408,7 +488,13 @@ class MainWindow(QMainWindow):
         if file_path:
             self.load_file(file_path)
 
-    def load_file(self, file_path):
+    def load_file(self, file_path, line=0, encoding=None):
+        """Open a file in a new tab, or focus its tab; ``line`` (1-based) is shown once it is loaded.
+
+        The text is read in the background and appended in chunks (see
+        ``core.file_loader``); the tab shows the progress and closing it
+        cancels the load.
+        """
         try:
             # If already open, focus the existing tab instead of opening duplicate
             for i in range(self.tab_widget.count()):
@@ -419,6 +505,8 @@ class MainWindow(QMainWindow):
                         existing.setFocus()
                     except Exception:
                         pass
+                    if line:
+                        self._go_to_line(existing, line)
                     return
 
             # remove welcome tab if present
@@ -427,66 +515,159 @@ class MainWindow(QMainWindow):
             except Exception:
                 pass
 
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                editor = EditorWidget(self.settings)
-                editor.setText(content)
-                editor.file_path = file_path
-                # set lexer based on extension
-                try:
-                    ext = os.path.splitext(file_path)[1].lstrip('.')
-                    editor.set_lexer(ext)
-                except Exception:
-                    pass
-                # add file to monitor
-                try:
-                    self.file_monitor.add_file(file_path)
-                except Exception:
-                    pass
-                idx = self.tab_widget.addTab(editor, file_path.split('/')[-1])
-                # ensure the newly added tab is selected and focused
-                # apply custom close button if available
-                try:
-                    if self._close_icon:
-                        bar = self.tab_widget.tabBar()
-                        from PyQt6.QtWidgets import QPushButton
-                        btn = QPushButton()
-                        btn.setFlat(True)
-                        btn.setIcon(self._close_icon)
-                        btn.setCursor(bar.cursor())
-                        btn.setFixedSize(18, 18)
-                        bar.setTabButton(idx, bar.ButtonPosition.RightSide, btn)
-                        def _on_close():
-                            for j in range(self.tab_widget.count()):
-                                if bar.tabButton(j, bar.ButtonPosition.RightSide) is btn:
-                                    self.close_tab(j)
-                                    return
-                        btn.clicked.connect(_on_close)
-                except Exception:
-                    pass
-                self.tab_widget.setCurrentIndex(idx)
-                try:
-                    editor.setFocus()
-                except Exception:
-                    pass
-                # animate editor appearance
-                try:
-                    fade_in(editor, duration=260)
-                except Exception:
-                    pass
+            editor = EditorWidget(self.settings)
+            editor.file_path = file_path
+            idx = self.tab_widget.addTab(editor, os.path.basename(file_path))
+            # ensure the newly added tab is selected and focused
+            # apply custom close button if available
+            try:
+                if self._close_icon:
+                    bar = self.tab_widget.tabBar()
+                    from PyQt6.QtWidgets import QPushButton
+                    btn = QPushButton()
+                    btn.setFlat(True)
+                    btn.setIcon(self._close_icon)
+                    btn.setCursor(bar.cursor())
+                    btn.setFixedSize(18, 18)
+                    bar.setTabButton(idx, bar.ButtonPosition.RightSide, btn)
+                    def _on_close():
+                        for j in range(self.tab_widget.count()):
+                            if bar.tabButton(j, bar.ButtonPosition.RightSide) is btn:
+                                self.close_tab(j)
+                                return
+                    btn.clicked.connect(_on_close)
+            except Exception:
+                pass
+            self.tab_widget.setCurrentIndex(idx)
+            try:
+                editor.setFocus()
+            except Exception:
+                pass
+            # animate editor appearance
+            try:
+                fade_in(editor, duration=260)
+            except Exception:
+                pass
+            self._start_load(editor, file_path, line, encoding)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Could not open file: {str(e)}")
 
+    def _start_load(self, editor, file_path, line=0, encoding=None):
+        from core.file_loader import FileLoad
+        load = FileLoad(file_path, editor.append_loaded, editor.clear_loaded, encoding=encoding)
+        editor.file_load = load
+        editor.begin_load()
+        load.signals.progress.connect(lambda done, total: self._on_load_progress(editor, done, total))
+        load.signals.finished.connect(lambda error: self._on_load_finished(editor, load, error, line))
+        load.start()
+        self._update_load_button()
+
+    def _on_load_progress(self, editor, done, total):
+        index = self.tab_widget.indexOf(editor)
+        if index < 0:
+            return
+        name = os.path.basename(editor.file_path)
+        if total > 0:
+            self.tab_widget.setTabText(index, f"{name} ({min(100, done * 100 // total)}%)")
+
+    def _on_load_finished(self, editor, load, error, line):
+        if getattr(editor, 'file_load', None) is not load:
+            return  # the tab was closed, which cancelled the load
+        editor.file_load = None
+        self._update_load_button()
+        file_path = editor.file_path
+        if error == 'binary':
+            reply = QMessageBox.question(
+                self, "Binary File",
+                f"'{os.path.basename(file_path)}' looks like a binary file.\nOpen it as text anyway?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+                QMessageBox.StandardButton.No)
+            if reply == QMessageBox.StandardButton.Yes and self.tab_widget.indexOf(editor) >= 0:
+                self._start_load(editor, file_path, line, encoding='latin-1')
+                return
+        if error:
+            editor.end_load()
+            index = self.tab_widget.indexOf(editor)
+            if index >= 0:
+                self.close_tab(index)
+            if error not in ('binary', 'cancelled'):
+                QMessageBox.critical(self, "Error", f"Could not open file: {error}")
+            return
+
+        editor.end_load(load.newline, load.encoding)
+        index = self.tab_widget.indexOf(editor)
+        if index >= 0:
+            self.tab_widget.setTabText(index, os.path.basename(file_path))
+        # set lexer based on extension
+        try:
+            ext = os.path.splitext(file_path)[1].lstrip('.')
+            editor.set_lexer(ext)
+        except Exception:
+            pass
+        # the buffer's issues feed the problems panel
+        try:
+            editor.issues_changed.connect(self.workspace_lint.report)
+            editor.textChanged.connect(self.workspace_lint.note_activity)
+        except Exception:
+            pass
+        # diagnostics of an unchanged file come straight from the cache
+        try:
+            editor.run_analysis(persist=True)
+        except Exception:
+            pass
+        try:
+            editor.setup_git_integration()
+        except Exception:
+            pass
+        # add file to monitor
+        try:
+            self.file_monitor.add_file(file_path)
+        except Exception:
+            pass
+        if line:
+            self._go_to_line(editor, line)
+        self.update_status_bar()
+
+    def _go_to_line(self, editor, line):
+        try:
+            editor.setCursorPosition(line - 1, 0)
+            editor.ensureLineVisible(line - 1)
+            editor.setFocus()
+        except Exception:
+            pass
+
+    def cancel_loading(self):
+        """Stop opening the file of the current tab (and close the tab)."""
+        load = getattr(self.tab_widget.currentWidget(), 'file_load', None)
+        if load is not None:
+            load.cancel()
+
+    def _update_load_button(self):
+        loading = any(getattr(self.tab_widget.widget(i), 'file_load', None) is not None
+                      for i in range(self.tab_widget.count()))
+        if loading and not hasattr(self, 'cancel_load_button'):
+            from PyQt6.QtWidgets import QPushButton
+            self.cancel_load_button = QPushButton("Cancel Opening")
+            self.cancel_load_button.setFlat(True)
+            self.cancel_load_button.clicked.connect(self.cancel_loading)
+            self.status_bar.addPermanentWidget(self.cancel_load_button)
+        if hasattr(self, 'cancel_load_button'):
+            self.cancel_load_button.setVisible(loading)
+
     def save_file(self):
         editor = self.tab_widget.currentWidget()
         if editor and isinstance(editor, EditorWidget):
             if not hasattr(editor, 'file_path') or not editor.file_path:
                 self.save_file_as()
+            elif editor.is_loading():
+                self.status_bar.showMessage("The file is still opening", 2000)
             else:
                 try:
-                    with open(editor.file_path, 'w', encoding='utf-8') as file:
+                    with open(editor.file_path, 'w', encoding=editor.file_encoding, newline='') as file:
                         file.write(editor.text())
                     self.status_bar.showMessage("File saved successfully", 2000)
+                    editor.run_analysis(persist=True)
+                    self._invalidate_git_status(editor.file_path)
                 except Exception as e:
                     QMessageBox.critical(self, "Error", f"Could not save file: {str(e)}")
 
@@ -501,10 +682,37 @@ class MainWindow(QMainWindow):
                 editor.file_path = file_path
                 self.tab_widget.setTabText(self.tab_widget.currentIndex(), file_path.split('/')[-1])
                 self.save_file()
+                try:
+                    editor.setup_git_integration()
+                except Exception:
+                    pass
 
     def close_tab(self, index):
         # Add check for unsaved changes here
+        widget = self.tab_widget.widget(index)
         self.tab_widget.removeTab(index)
+        load = getattr(widget, 'file_load', None)
+        if load is not None:
+            widget.file_load = None
+            load.cancel()
+            self._update_load_button()
+        try:
+            widget.autocompleter.detach()
+        except Exception:
+            pass
+        try:
+            widget.changes.cancel()
+        except Exception:
+            pass
+        try:
+            widget.teardown_git_integration()
+        except Exception:
+            pass
+        try:
+            if getattr(widget, 'file_path', None):
+                self.workspace_lint.release(widget.file_path)
+        except Exception:
+            pass
         # If no tabs remain, show the welcome tab (instructions) rather than creating
         # a default untitled editor.
         if self.tab_widget.count() == 0:
@@ -573,6 +781,8 @@ class MainWindow(QMainWindow):
             line, col = editor.getCursorPosition()
             self.line_col_label.setText(f"Line: {line + 1}, Col: {col + 1}")
             
+            self.encoding_label.setText(getattr(editor, 'file_encoding', 'utf-8').upper())
+
             # Update syntax
             if hasattr(editor, 'lexer') and editor.lexer():
                 self.syntax_label.setText(editor.lexer().__class__.__name__[8:])
@@ -580,6 +790,15 @@ class MainWindow(QMainWindow):
                 self.syntax_label.setText("Plain Text")
                 
     def handle_external_file_change(self, file_path):
+        # cached jedi state may have imported the file that changed on disk
+        try:
+            from core.completion_engine import shared_engine
+            from core.completion_server import running_server
+            shared_engine().invalidate_path(file_path)
+            if running_server() is not None:
+                running_server().invalidate_path(file_path)
+        except Exception:
+            pass
         for i in range(self.tab_widget.count()):
             editor = self.tab_widget.widget(i)
             if hasattr(editor, 'file_path') and editor.file_path == file_path:
@@ -674,7 +893,38 @@ class MainWindow(QMainWindow):
             dialog.save_settings()
             self.apply_settings()
             
+    def apply_analysis_settings(self):
+        try:
+            from core.diagnostics_cache import shared_diagnostics_cache
+            analysis = getattr(self.settings, 'analysis', None) or {}
+            shared_diagnostics_cache().disk = bool(analysis.get('disk_cache', True))
+        except Exception as e:
+            print(f"Could not configure the diagnostics cache: {e}")
+        try:
+            analysis = getattr(self.settings, 'analysis', None) or {}
+            self.workspace_lint.set_max_jobs(int(analysis.get('workspace_jobs', 1)))
+            if not analysis.get('workspace_lint', True):
+                self.workspace_lint.set_root('')
+            elif getattr(self, 'workspace_root', None) and not self.workspace_lint.root:
+                self.workspace_lint.set_root(self.workspace_root)
+        except Exception as e:
+            print(f"Could not configure workspace lint: {e}")
+        try:
+            from core.lint_pool import running_lint_pool, shared_lint_pool, shutdown_lint_pool
+            analysis = getattr(self.settings, 'analysis', None) or {}
+            workers = int(analysis.get('workers', 2))
+            pool = running_lint_pool()
+            if analysis.get('backend', 'process') != 'process':
+                shutdown_lint_pool()
+            elif pool is None or pool.workers != workers:
+                shutdown_lint_pool()
+                # started now so the workers are warm by the first lint
+                shared_lint_pool(workers)
+        except Exception as e:
+            print(f"Could not start the lint pool: {e}")
+
     def apply_settings(self):
+        self.apply_analysis_settings()
         # Apply settings to all editors
         for i in range(self.tab_widget.count()):
             editor = self.tab_widget.widget(i)
@@ -772,6 +1022,15 @@ class MainWindow(QMainWindow):
                 self.tree_view.setModel(self.file_system)
             except Exception:
                 pass
+        # lint the whole folder in the background
+        try:
+            analysis = getattr(self.settings, 'analysis', None) or {}
+            if analysis.get('workspace_lint', True):
+                self.setup_problems_dock()
+                self.problems_panel.set_root(folder)
+                self.workspace_lint.set_root(folder)
+        except Exception as e:
+            print(f"Could not start workspace lint: {e}")
         # monitor folder files: add existing open files to monitor
         for i in range(self.tab_widget.count()):
             ed = self.tab_widget.widget(i)
@@ -808,11 +1067,28 @@ class MainWindow(QMainWindow):
             reveal_act = menu.addAction("Reveal in Explorer")
             rename_act = menu.addAction("Rename")
             delete_act = menu.addAction("Delete")
+        # stage / unstage act on the whole selection
+        selected = self._selected_browser_paths() or [path]
+        if path not in selected:
+            selected = [path]
+        manager = self._git_manager_for(path)
+        if manager is not None:
+            menu.addSeparator()
+            count = f" ({len(selected)} items)" if len(selected) > 1 else ""
+            stage_act = menu.addAction("Stage" + count)
+            unstage_act = menu.addAction("Unstage" + count)
 
         action = menu.exec(self.tree_view.viewport().mapToGlobal(pos))
         if action is None:
             return
         text = action.text()
+        if manager is not None and action in (stage_act, unstage_act):
+            # one index write and one status refresh for the whole selection
+            if action is stage_act:
+                manager.stage_files(selected)
+            else:
+                manager.unstage_files(selected)
+            return
         if text == "Open":
             if os.path.isdir(path):
                 # expand
@@ -855,6 +1131,68 @@ class MainWindow(QMainWindow):
             # open in file explorer
             os.startfile(os.path.dirname(path))
 
+    def _selected_browser_paths(self):
+        paths = []
+        try:
+            for index in self.tree_view.selectionModel().selectedRows(0):
+                if getattr(self, '_fs_model_type', 'native') == 'native':
+                    paths.append(self.file_system.filePath(index))
+                else:
+                    paths.append(self.file_system.itemFromIndex(index).data(Qt.ItemDataRole.UserRole))
+        except Exception:
+            pass
+        return [p for p in paths if p]
+
+    # ----- Git -----
+    def _git_manager_for(self, path):
+        """The shared ``GitManager`` of the repository containing ``path``, or None."""
+        if not path:
+            return None
+        try:
+            from core.git_repository import shared_repositories
+            repository = shared_repositories().repository(path)
+        except Exception:
+            return None
+        if repository is None:
+            return None
+        manager = repository.manager
+        if not manager.is_git_repo():
+            return None
+        if not getattr(manager, '_error_connected', False):
+            manager.error_occurred.connect(lambda message: QMessageBox.warning(self, "Git", message))
+            manager._error_connected = True
+        return manager
+
+    def _current_git_file(self):
+        editor = self.tab_widget.currentWidget()
+        path = getattr(editor, 'file_path', None)
+        manager = self._git_manager_for(path)
+        if manager is None:
+            self.status_bar.showMessage("The current file is not in a git repository", 2000)
+        return editor, path, manager
+
+    def stage_current_file(self):
+        editor, path, manager = self._current_git_file()
+        if manager is not None:
+            if editor.isModified():
+                self.save_file()
+            if manager.stage_file(path):
+                self.status_bar.showMessage(f"Staged {os.path.basename(path)}", 2000)
+
+    def unstage_current_file(self):
+        editor, path, manager = self._current_git_file()
+        if manager is not None and manager.unstage_file(path):
+            self.status_bar.showMessage(f"Unstaged {os.path.basename(path)}", 2000)
+
+    def stage_selected_hunks(self):
+        editor, path, manager = self._current_git_file()
+        if manager is None or not hasattr(editor, 'stage_hunks'):
+            return
+        if editor.stage_hunks():
+            self.status_bar.showMessage("Staged the selected changes", 2000)
+        else:
+            self.status_bar.showMessage("Nothing was staged from the selected lines", 2000)
+
     # ----- Terminal integration -----
     def setup_terminal_dock(self):
         # create terminal dock with tabbed terminals
@@ -951,6 +1289,91 @@ class MainWindow(QMainWindow):
         except Exception:
             self.terminal_dock.setVisible(not self.terminal_dock.isVisible())
 
+    # ----- Problems -----
+    def setup_problems_dock(self):
+        if hasattr(self, 'problems_dock'):
+            return
+        from .problems_panel import ProblemsPanel
+        self.problems_dock = QDockWidget("Problems", self)
+        self.problems_dock.setAllowedAreas(Qt.DockWidgetArea.BottomDockWidgetArea | Qt.DockWidgetArea.TopDockWidgetArea)
+        self.problems_panel = ProblemsPanel(getattr(self, 'workspace_root', ''))
+        self.problems_panel.file_selected.connect(self.open_problem)
+        self.problems_dock.setWidget(self.problems_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.problems_dock)
+        service = self.workspace_lint
+        for path, issues in list(service.issues.items()):
+            self.problems_panel.set_file_issues(path, issues)
+        service.file_linted.connect(self.problems_panel.set_file_issues)
+        service.file_removed.connect(self.problems_panel.remove_file)
+        service.progress.connect(self.problems_panel.set_progress)
+
+    def toggle_problems(self):
+        if not hasattr(self, 'problems_dock'):
+            self.setup_problems_dock()
+            self.problems_dock.setVisible(True)
+            return
+        self.problems_dock.setVisible(not self.problems_dock.isVisible())
+
+    def setup_git_log_dock(self):
+        if hasattr(self, 'git_log_dock'):
+            return
+        from .git_log_panel import GitLogPanel
+        self.git_log_dock = QDockWidget("Git History", self)
+        self.git_log_dock.setAllowedAreas(Qt.DockWidgetArea.BottomDockWidgetArea | Qt.DockWidgetArea.TopDockWidgetArea)
+        self.git_log_panel = GitLogPanel()
+        self.git_log_dock.setWidget(self.git_log_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.git_log_dock)
+
+    def show_git_history(self, path=None):
+        """History of the workspace repository, or of ``path`` alone."""
+        from core.git_status import shared_git_status
+        service = shared_git_status()
+        root = service.repo_root(path or getattr(self, 'workspace_root', None) or QDir.currentPath())
+        if not root:
+            self.status_bar.showMessage("Not in a git repository", 2000)
+            return
+        self.setup_git_log_dock()
+        relative = os.path.relpath(os.path.abspath(path), root).replace(os.sep, '/') if path else ''
+        self.git_log_panel.show_history(root, relative)
+        self.git_log_dock.setVisible(True)
+        self.git_log_dock.raise_()
+
+    def show_file_history(self):
+        editor = self.tab_widget.currentWidget()
+        path = getattr(editor, 'file_path', None)
+        if not path:
+            self.status_bar.showMessage("The current tab has no file", 2000)
+            return
+        self.show_git_history(path)
+
+    def cycle_blame_mode(self):
+        from core.git_blame import MODES
+        git = getattr(self.settings, 'git', None) or {}
+        mode = git.get('blame', 'inline')
+        git['blame'] = MODES[(MODES.index(mode) + 1) % len(MODES)] if mode in MODES else 'inline'
+        self.settings.git = git
+        try:
+            self.settings.save()
+        except Exception:
+            pass
+        for i in range(self.tab_widget.count()):
+            editor = self.tab_widget.widget(i)
+            if isinstance(editor, EditorWidget):
+                editor.set_blame_mode(git['blame'])
+        self.status_bar.showMessage(f"Git blame: {git['blame']}", 2000)
+
+    def open_problem(self, path, line):
+        self.load_file(path, line=line)
+
+    def _on_current_tab_changed(self, index):
+        try:
+            widget = self.tab_widget.widget(index)
+            path = getattr(widget, 'file_path', None)
+            if path:
+                self.workspace_lint.set_visible(path)
+        except Exception:
+            pass
+
     def _close_terminal_tab(self, index:int):
         # close tab and kill any running processes inside
         widget = self.terminal_tabs.widget(index)
@@ -1009,11 +1432,15 @@ class MainWindow(QMainWindow):
             path = getattr(dlg, 'selected_path', None)
             lineno = getattr(dlg, 'selected_line', None)
             if path:
-                self.load_file(path)
-                # navigate to line
-                ed = self.tab_widget.currentWidget()
-                if hasattr(ed, 'setCursorPosition') and lineno:
-                    ed.setCursorPosition(lineno - 1, 0)
+                # the line is shown once the file is loaded
+                self.load_file(path, line=lineno or 0)
+
+    def show_completion_diagnostics(self):
+        try:
+            from .completion_diagnostics import CompletionDiagnosticsDialog
+            CompletionDiagnosticsDialog(self).exec()
+        except Exception as e:
+            print(f"Could not open completion diagnostics: {e}")
 
     def show_quick_open(self):
         try:
@@ -1045,19 +1472,28 @@ class MainWindow(QMainWindow):
     # ----- Utilities -----
     def save_file_for_editor(self, editor):
         try:
-            if hasattr(editor, 'file_path') and editor.file_path:
-                with open(editor.file_path, 'w', encoding='utf-8') as fh:
+            if hasattr(editor, 'file_path') and editor.file_path and not editor.is_loading():
+                with open(editor.file_path, 'w', encoding=editor.file_encoding, newline='') as fh:
                     fh.write(editor.text())
                 # mark not modified
                 try:
                     editor.setModified(False)
+                    editor.run_analysis(persist=True)
                 except Exception:
                     pass
+                self._invalidate_git_status(editor.file_path)
                 return True
         except Exception as e:
             QMessageBox.critical(self, "Save error", str(e))
         return False
 
+    def _invalidate_git_status(self, file_path):
+        try:
+            from core.git_status import shared_git_status
+            shared_git_status().invalidate(file_path)
+        except Exception:
+            pass
+
     def increase_font_size(self):
         try:
             cur = int(self.settings.editor.get('font_size', 12))
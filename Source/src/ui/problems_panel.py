@@ -0,0 +1,332 @@
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeView, QHeaderView,
+                             QLineEdit, QCheckBox)
+from PyQt6.QtCore import Qt, QAbstractItemModel, QModelIndex, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor
+import os
+
+from core.issue_store import SEVERITIES, IssueStore, IssueView
+
+SEVERITY_COLORS = {'error': '#F14C4C', 'warning': '#CCA700', 'style': '#8A8A8A'}
+
+
+class _FileNode:
+    """internalPointer of issue rows: their file's row here and position in the view.
+
+    ``count`` is the number of issue rows the tree has been told about, None
+    until it asks.
+    """
+    __slots__ = ('row', 'position', 'count')
+
+    def __init__(self, row, position):
+        self.row = row
+        self.position = position
+        self.count = None
+
+
+_TOP = _FileNode(-1, -1)
+
+
+class ProblemsModel(QAbstractItemModel):
+    """Two-level model over an ``IssueView``: files, then their issues.
+
+    Rows are looked up in the view on demand, so the model holds nothing per
+    issue and the tree only asks for what is on screen. A new view is applied
+    as row removals, insertions and data changes, so the tree keeps its
+    scroll position, selection and expanded files.
+    """
+
+    COLUMNS = ['Problem', 'Code', 'Line']
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.view = IssueView()
+        self.root_path = ''
+        self._nodes = []
+        self._colors = {kind: QColor(color) for kind, color in SEVERITY_COLORS.items()}
+
+    def set_view(self, view):
+        old = self.view
+        root = QModelIndex()
+        shown = {entry.path: position for position, entry in enumerate(view.files)}
+        # drop the files no longer shown while the rows still describe the old view
+        row = len(self._nodes)
+        while row > 0:
+            row -= 1
+            if old.files[self._nodes[row].position].path in shown:
+                continue
+            last = row
+            while row > 0 and old.files[self._nodes[row - 1].position].path not in shown:
+                row -= 1
+            self.beginRemoveRows(root, row, last)
+            del self._nodes[row:last + 1]
+            self._renumber(row)
+            self.endRemoveRows()
+
+        same_query = view.same_query(old)
+        self.view = view
+        for node in self._nodes:
+            entry = old.files[node.position]
+            node.position = shown[entry.path]
+            if not same_query or view.files[node.position] is not entry:
+                self._update_issues(node)
+
+        # both views are sorted by path, so the kept rows are in order among the new ones
+        row = position = 0
+        while position < len(view.files):
+            if row < len(self._nodes) and self._nodes[row].position == position:
+                row += 1
+                position += 1
+                continue
+            end = position + 1
+            while end < len(view.files) and (row == len(self._nodes) or self._nodes[row].position != end):
+                end += 1
+            self.beginInsertRows(root, row, row + end - position - 1)
+            self._nodes[row:row] = [_FileNode(row + i, p) for i, p in enumerate(range(position, end))]
+            self._renumber(row + end - position)
+            self.endInsertRows()
+            row += end - position
+            position = end
+        if self._nodes:
+            # issue counts in the file labels
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._nodes) - 1, 0))
+
+    def _renumber(self, start):
+        for row in range(start, len(self._nodes)):
+            self._nodes[row].row = row
+
+    def _count(self, node):
+        if node.count is None:
+            node.count = len(self.view.indices(node.position))
+        return node.count
+
+    def _update_issues(self, node):
+        if node.count is None:
+            return
+        count = len(self.view.indices(node.position))
+        parent = self.createIndex(node.row, 0, _TOP)
+        if count < node.count:
+            self.beginRemoveRows(parent, count, node.count - 1)
+            node.count = count
+            self.endRemoveRows()
+        elif count > node.count:
+            self.beginInsertRows(parent, node.count, count - 1)
+            node.count = count
+            self.endInsertRows()
+        if count:
+            self.dataChanged.emit(self.index(0, 0, parent), self.index(count - 1, len(self.COLUMNS) - 1, parent))
+
+    def _issue(self, node, row):
+        indices = self.view.indices(node.position)
+        if row >= len(indices):
+            # a file whose rows are still being updated
+            return None
+        entry = self.view.files[node.position]
+        return entry.path, entry.issues[indices[row]]
+
+    def _label(self, path):
+        if self.root_path and path.startswith(self.root_path + os.sep):
+            return os.path.relpath(path, self.root_path)
+        return path
+
+    # ----- structure -----
+    def index(self, row, column, parent=QModelIndex()):
+        if not parent.isValid():
+            if 0 <= row < len(self._nodes):
+                return self.createIndex(row, column, _TOP)
+            return QModelIndex()
+        if parent.internalPointer() is not _TOP or parent.column() != 0:
+            return QModelIndex()
+        node = self._nodes[parent.row()]
+        if 0 <= row < self._count(node):
+            return self.createIndex(row, column, node)
+        return QModelIndex()
+
+    def parent(self, index=QModelIndex()):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        if node is _TOP:
+            return QModelIndex()
+        return self.createIndex(node.row, 0, _TOP)
+
+    def rowCount(self, parent=QModelIndex()):
+        if not parent.isValid():
+            return len(self._nodes)
+        if parent.internalPointer() is _TOP and parent.column() == 0:
+            return self._count(self._nodes[parent.row()])
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    # ----- data -----
+    def location(self, index):
+        """``(path, line)`` of a row; line 0 for file rows."""
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if node is _TOP:
+            return self.view.files[self._nodes[index.row()].position].path, 0
+        found = self._issue(node, index.row())
+        if found is None:
+            return None
+        path, issue = found
+        return path, issue[0]
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        column = index.column()
+        if node is _TOP:
+            node = self._nodes[index.row()]
+            entry = self.view.files[node.position]
+            if role == Qt.ItemDataRole.DisplayRole:
+                if column == 0:
+                    return f"{self._label(entry.path)}  ({self._count(node)})"
+                return None
+            if role == Qt.ItemDataRole.ToolTipRole:
+                errors, warnings, style = entry.counts
+                return f"{entry.path}\n{errors} errors, {warnings} warnings, {style} style issues"
+            return None
+        found = self._issue(node, index.row())
+        if found is None:
+            return None
+        line, col, severity, code, message = found[1]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return message
+            if column == 1:
+                return code
+            return f"{line}:{col}"
+        if role == Qt.ItemDataRole.ForegroundRole and column == 0:
+            return self._colors.get(severity)
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return f"{severity}: {message}"
+        return None
+
+
+class ProblemsPanel(QWidget):
+    """Workspace diagnostics from an indexed ``IssueStore``; click an issue to open it."""
+
+    file_selected = pyqtSignal(str, int)  # file path, line number
+
+    REFRESH_MS = 200
+
+    def __init__(self, root_path='', parent=None):
+        super().__init__(parent)
+        self.store = IssueStore()
+        self._progress = (0, 0)
+        self._expanded = set()  # paths of expanded file rows
+        self._refresh_timer = QTimer()
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self._build_ui()
+        self.set_root(root_path)
+
+    def _build_ui(self):
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+
+        filters = QHBoxLayout()
+        self.severity_boxes = {}
+        for severity, label in zip(SEVERITIES, ('Errors', 'Warnings', 'Style')):
+            box = QCheckBox(label)
+            box.setChecked(True)
+            box.toggled.connect(self.refresh)
+            self.severity_boxes[severity] = box
+            filters.addWidget(box)
+        self.code_filter = QLineEdit()
+        self.code_filter.setPlaceholderText("Codes, e.g. E5, F401")
+        self.code_filter.textChanged.connect(self.refresh)
+        filters.addWidget(self.code_filter)
+        self.path_filter = QLineEdit()
+        self.path_filter.setPlaceholderText("Path contains")
+        self.path_filter.textChanged.connect(self.refresh)
+        filters.addWidget(self.path_filter)
+        layout.addLayout(filters)
+
+        self.info = QLabel()
+        layout.addWidget(self.info)
+
+        self.model = ProblemsModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.model)
+        self.tree.setUniformRowHeights(True)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.expanded.connect(self._on_expanded)
+        self.tree.collapsed.connect(self._on_collapsed)
+        self.tree.clicked.connect(self._open_index)
+        self.tree.activated.connect(self._open_index)
+        layout.addWidget(self.tree)
+
+    def set_root(self, root_path):
+        self.model.root_path = root_path or ''
+        self.refresh()
+
+    # ----- updates from the lint service -----
+    def set_file_issues(self, path, issues):
+        self.store.set_file(path, issues)
+        self._schedule()
+
+    def remove_file(self, path):
+        self.store.remove_file(path)
+        self._schedule()
+
+    def clear(self):
+        self.store.clear()
+        self._expanded.clear()
+        self.refresh()
+
+    def set_progress(self, done, total):
+        self._progress = (done, total)
+        self._update_info()
+
+    def _schedule(self):
+        # results of a workspace sweep arrive file by file; redraw a few times a second
+        if not self._refresh_timer.isActive():
+            self._refresh_timer.start(self.REFRESH_MS)
+
+    def refresh(self, *args):
+        self._refresh_timer.stop()
+        severities = [s for s, box in self.severity_boxes.items() if box.isChecked()]
+        view = self.store.query(severities, self.code_filter.text(), self.path_filter.text())
+        self.model.set_view(view)
+        if self._expanded:
+            for row, entry in enumerate(view.files):
+                if entry.path in self._expanded:
+                    self.tree.setExpanded(self.model.index(row, 0), True)
+        self._update_info()
+
+    def _update_info(self):
+        errors, warnings, style = self.store.totals
+        text = f"{errors} errors, {warnings} warnings, {style} style issues"
+        shown = len(self.model.view)
+        if shown != len(self.store.paths()):
+            text += f"  ({shown} files shown)"
+        done, total = self._progress
+        if total and done < total:
+            text += f"  (linting workspace: {done}/{total})"
+        self.info.setText(text)
+
+    # ----- navigation -----
+    def _on_expanded(self, index):
+        location = self.model.location(index)
+        if location:
+            self._expanded.add(location[0])
+
+    def _on_collapsed(self, index):
+        location = self.model.location(index)
+        if location:
+            self._expanded.discard(location[0])
+
+    def _open_index(self, index):
+        location = self.model.location(index)
+        if location and location[1]:
+            self.file_selected.emit(*location)
@@ -0,0 +1,75 @@
+"""IncrementalAnalyzer must report exactly what a whole-document lint does."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.pardir, 'src'))
+
+from core.analysis_pipeline import parse_document  # noqa: E402
+from core.lint_engine import IncrementalAnalyzer, lint_document  # noqa: E402
+
+STDLIB = os.path.dirname(os.__file__)
+
+SOURCES = {
+    'one-liner classes': 'class A(Exception): pass\nclass B(A): pass\n',
+    'one-liner functions': 'def a(): pass\ndef b(): pass\n\n\nx = 1\n',
+    'one-liner methods': 'class C:\n    def a(self): pass\n    def b(self): pass\n    x = 1\n',
+    'trailing comment in a method': (
+        'class C:\n'
+        '    def f(self):\n'
+        '        for x in self:\n'
+        '            pass\n'
+        '            # end of loop\n'
+        '    def g(self):\n'
+        '        pass\n'),
+    'signature over two lines': (
+        'class C:\n'
+        '    def f(self):\n'
+        '        return 1\n'
+        '    def g(self, a,\n'
+        '          b):\n'
+        '        pass\n'),
+    'dedent after nested blocks': (
+        'class C:\n'
+        '    def f(self):\n'
+        '        self.x = 1\n'
+        '\n'
+        'I = C\n'),
+    'import after code': '"""Doc."""\nimport os\nx = 1\nimport sys\n',
+}
+
+STDLIB_FILES = ['ftplib.py', 'imaplib.py', '_collections_abc.py', 'fileinput.py', 'pickletools.py',
+                'configparser.py']
+
+
+def _issues(issues):
+    return sorted((i['line'], i['col'], i['code']) for i in issues)
+
+
+def _assert_same(analyzer, source):
+    doc = parse_document(source)
+    assert _issues(analyzer.analyze_document(doc)) == _issues(lint_document(doc))
+
+
+@pytest.mark.parametrize('name', sorted(SOURCES))
+def test_matches_whole_document(name):
+    _assert_same(IncrementalAnalyzer(), SOURCES[name])
+
+
+@pytest.mark.parametrize('name', STDLIB_FILES)
+def test_matches_whole_document_after_edits(name):
+    path = os.path.join(STDLIB, name)
+    if not os.path.exists(path):
+        pytest.skip(f'{name} is not in this Python')
+    with open(path, encoding='utf-8') as file:
+        lines = file.read().splitlines(True)
+    analyzer = IncrementalAnalyzer()
+    _assert_same(analyzer, ''.join(lines))
+    # edits that move code next to other code: blank lines removed and added, comments added
+    for index in range(len(lines) // 5, len(lines), len(lines) // 5):
+        edited = [line for i, line in enumerate(lines) if i != index or line.strip()]
+        edited.insert(index, '        # note\n')
+        if parse_document(''.join(edited)).ok:
+            lines = edited
+            _assert_same(analyzer, ''.join(lines))